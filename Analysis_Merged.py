@@ -1,66 +1,78 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
+from Lazy import lazy_import
+from Merged import load_merged
+from Plotting import draw_scatter, plot_job, render_plots, scatter_data
+from Telemetry import run, stage
+
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+
 # === Paths ===
-DATA_PATH = "processed/merged_global_migration_data.csv"
 PLOTS_DIR = "plots"
-os.makedirs(PLOTS_DIR, exist_ok=True)
-
-# === Load Data ===
-df = pd.read_csv(DATA_PATH)
-print(f"Loaded merged dataset: {df.shape[0]} rows")
-
-# --- Force numeric conversion ---
-for col in ["Migration", "GDP_per_capita", "HDI", "Urbanization"]:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-
-# --- Drop rows with missing or invalid values ---
-df = df.dropna(subset=["Migration", "GDP_per_capita", "HDI", "Urbanization"])
-print(f"After cleaning: {df.shape[0]} rows remain")
-
-# === Aggregate Migration per Country-Year ===
-df_agg = df.groupby(["Country", "Year"], as_index=False).agg({
-    "Migration": "sum",
-    "GDP_per_capita": "mean",
-    "HDI": "mean",
-    "Urbanization": "mean"
-})
-print(f"After aggregation: {df_agg.shape[0]} rows")
-
-# === Correlation Matrix ===
-corr = df_agg[["Migration", "GDP_per_capita", "HDI", "Urbanization"]].corr()
-print("\n=== Correlation Matrix ===")
-print(corr)
-
-plt.figure(figsize=(7,6))
-sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f")
-plt.title("Correlation Between Migration, GDP, HDI, and Urbanization")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "correlation_heatmap.png"))
-plt.close()
-
-# === Scatter Plots ===
-
-for col in ["GDP_per_capita", "HDI", "Urbanization"]:
-    plt.figure(figsize=(7,5))
-    sns.scatterplot(x=col, y="Migration", data=df_agg, alpha=0.6)
+
+
+# === Figures ===
+def plot_correlation(corr):
+    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f")
+    plt.title("Correlation Between Migration, GDP, HDI, and Urbanization")
+    plt.tight_layout()
+
+
+def plot_scatter(data, col):
+    # points, or a density image once the table outgrows a scatter plot
+    draw_scatter(data)
     plt.title(f"Migration vs {col}")
     plt.xlabel(col)
     plt.ylabel("Migration Stock")
     plt.tight_layout()
-    plt.savefig(os.path.join(PLOTS_DIR, f"migration_vs_{col.lower()}.png"))
-    plt.close()
 
-# === Yearly Trends ===
-plt.figure(figsize=(8,5))
-sns.lineplot(data=df_agg.groupby("Year")["Migration"].mean())
-plt.title("Average Global Trends (1990–2024)")
-plt.ylabel("Mean Value (scaled)")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "global_trends.png"))
-plt.close()
+
+def plot_trend(mean_by_year):
+    sns.lineplot(data=mean_by_year)
+    plt.title("Average Global Trends (1990–2024)")
+    plt.ylabel("Mean Value (scaled)")
+    plt.tight_layout()
+
+
+def run_analysis(df=None):
+    """Correlation and trend plots; pass the DataFrame from build_merged() to skip the CSV."""
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+
+    # === Load Data ===
+    if df is None:
+        # only the columns used below are read from the columnar file
+        with stage("load") as s:
+            df = load_merged(columns=["Year", "Migration", "GDP_per_capita", "HDI", "Urbanization"])
+            s["rows_out"] = len(df)
+
+    # Merged.py already sums migration per country-year, so rows are unique
+    df_agg = df
+    print(f"Country-year rows: {df_agg.shape[0]}")
+
+    # === Correlation Matrix ===
+    corr = df_agg[["Migration", "GDP_per_capita", "HDI", "Urbanization"]].corr()
+    print("\n=== Correlation Matrix ===")
+    print(corr)
+
+    jobs = [plot_job("correlation_heatmap.png", plot_correlation, corr, figsize=(7,6))]
+
+    # === Scatter Plots ===
+    for col in ["GDP_per_capita", "HDI", "Urbanization"]:
+        jobs.append(plot_job(f"migration_vs_{col.lower()}.png", plot_scatter,
+                             scatter_data(df_agg, col, "Migration"), col=col, figsize=(7,5)))
+
+    # === Yearly Trends ===
+    jobs.append(plot_job("global_trends.png", plot_trend,
+                         df_agg.groupby("Year")["Migration"].mean(), figsize=(8,5)))
+
+    with stage("plot", rows_in=len(jobs)):
+        render_plots(jobs)
+
+    print("Analysis complete! Cleaned and plots saved in 'plots/' folder.")
+    return corr
 
 
-print("Analysis complete! Cleaned and plots saved in 'plots/' folder.")
+if __name__ == "__main__":
+    with run("analyze"):
+        run_analysis()
@@ -0,0 +1,457 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+# === Paths ===
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = "benchmarks"
+WORK_DIR = os.path.join(BENCH_DIR, "work")        # generated inputs, one folder per shape
+RUNS_DIR = os.path.join(BENCH_DIR, "runs")        # one telemetry report per run and scale
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.csv")
+REPORT_NAME = "benchmark_report.json"
+
+# === Scale ===
+# Scale 1 is about the size of today's inputs: every country of the dimension
+# as a destination with ~100 origins each. Larger scales add synthetic
+# countries, so every source and the merged table grow with the scale.
+BASE_ORIGINS = 100
+WB_YEARS = list(range(1960, 2025))
+HDR_YEARS = [1990, 2000, 2010, 2015, 2020, 2021, 2022, 2023]
+EXCEL_MAX_ROWS = 1_048_576
+MAX_COUNTRIES = 32_767   # country_id is int16
+
+# Aggregate rows the real files mix in with the countries
+DESA_AGGREGATES = ["World", "Africa", "Asia", "Europe", "Latin America and the Caribbean",
+                   "Northern America", "Oceania", "More developed regions", "Less developed regions"]
+DESA_ORIGIN_AGGREGATES = ["World", "Africa", "Europe"]
+WB_AGGREGATES = [("World", "WLD"), ("Euro area", "EMU"), ("High income", "HIC"), ("Low income", "LIC")]
+HDR_GROUPS = ["Very high human development", "High human development",
+              "Medium human development", "Low human development"]
+
+# Stages above this many countries skip exact Ward linkage (O(n²) memory)
+EXACT_LINKAGE_MAX = 5000
+BOOTSTRAP_REPLICATES = 1000
+
+
+# === Minimal XLSX writer ===
+# openpyxl needs ~13 s per 30k rows; writing the sheet XML directly is
+# several times faster and lets the generator reach a million rows.
+_CONTENT_TYPES = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                  '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                  '<Default Extension="xml" ContentType="application/xml"/>'
+                  '<Override PartName="/xl/workbook.xml" '
+                  'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                  '<Override PartName="/xl/worksheets/sheet1.xml" '
+                  'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                  '</Types>')
+_RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" Target="xl/workbook.xml" '
+         'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+         '</Relationships>')
+_WORKBOOK = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+             'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+             '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets></workbook>')
+_WORKBOOK_RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                  '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+                  'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+                  '</Relationships>')
+
+
+def _column_letters(n):
+    letters = []
+    for i in range(n):
+        name, i = "", i + 1
+        while i:
+            i, r = divmod(i - 1, 26)
+            name = chr(65 + r) + name
+        letters.append(name)
+    return letters
+
+
+def _cell(ref, value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, str):
+        return f'<c r="{ref}" t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+    return f'<c r="{ref}"><v>{value}</v></c>'
+
+
+def write_xlsx(path, sheet, rows, width):
+    """One-sheet workbook with inline strings; rows is an iterable of lists."""
+    letters = _column_letters(width)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        z.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        z.writestr("_rels/.rels", _RELS)
+        z.writestr("xl/workbook.xml", _WORKBOOK.format(sheet=escape(sheet, {'"': "&quot;"})))
+        z.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with z.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            for r, row in enumerate(rows, 1):
+                cells = "".join(_cell(f"{letters[c]}{r}", v) for c, v in enumerate(row))
+                f.write(f'<row r="{r}">{cells}</row>'.encode("utf-8"))
+            f.write(b"</sheetData></worksheet>")
+
+
+# === Synthetic inputs ===
+def scale_shape(scale=1.0, countries=None, origins=None):
+    """(countries, origins per destination) for a scale, capped so the UN DESA
+    sheet fits in one Excel worksheet."""
+    base = len(pd.read_csv(os.path.join(ROOT, "data", "country_dimension.csv")))
+    countries = countries or max(10, int(round(base * scale)))
+    if countries > MAX_COUNTRIES:
+        raise ValueError(f"At most {MAX_COUNTRIES} countries (country_id is int16)")
+    destinations = countries + len(DESA_AGGREGATES)
+    fit = (EXCEL_MAX_ROWS - 20) // destinations - len(DESA_ORIGIN_AGGREGATES)
+    origins = min(origins or BASE_ORIGINS, countries, fit)
+    if origins < 1:
+        raise ValueError(f"{countries} countries do not fit in one worksheet")
+    return countries, origins
+
+
+def synthetic_countries(n):
+    """The real dimension and hierarchy, extended with synthetic countries."""
+    dim = pd.read_csv(os.path.join(ROOT, "data", "country_dimension.csv"), keep_default_na=False)
+    hierarchy = pd.read_csv(os.path.join(ROOT, "data", "country_hierarchy.csv"), keep_default_na=False)
+    real = dim.drop(columns=["country_id"]).merge(hierarchy, on="iso3")
+    extra = n - len(real)
+    if extra > 0:
+        k = np.arange(extra)
+        synthetic = real.iloc[k % len(real)].reset_index(drop=True).assign(
+            iso3=[f"X{i:05d}" for i in k], name=[f"Synthetic Country {i:05d}" for i in k])
+        real = pd.concat([real, synthetic], ignore_index=True)
+    countries = real.iloc[:n].reset_index(drop=True)
+    countries.insert(0, "country_id", np.arange(n))
+    return countries
+
+
+def _spellings(countries, aliases, rng):
+    """Per source, half of the countries that have an alias use it."""
+    first_alias = aliases.drop_duplicates("iso3").set_index("iso3")["alias"]
+    alias = countries["iso3"].map(first_alias)
+    use = alias.notna() & (rng.random(len(countries)) < 0.5)
+    return countries["name"].where(~use, alias).to_numpy()
+
+
+def _write_world_bank(path, names, iso3, values, indicator, code):
+    df = pd.DataFrame(values, columns=[str(y) for y in WB_YEARS])
+    df.insert(0, "Indicator Code", code)
+    df.insert(0, "Indicator Name", indicator)
+    df.insert(0, "Country Code", iso3)
+    df.insert(0, "Country Name", names)
+    df[""] = ""   # the real files end every line with a comma
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write('"Data Source","World Development Indicators",\r\n\r\n"Last Updated Date","2025-10-07",\r\n\r\n')
+        df.to_csv(f, index=False, quoting=csv.QUOTE_ALL, lineterminator="\r\n", float_format="%.10g")
+
+
+def generate(root, countries, origins, seed=42):
+    """Write a data/ folder with the layout of the real inputs at any size.
+
+    World Bank CSVs keep their four preamble lines (read with skiprows=4),
+    the HDR workbook keeps its title rows and spacer columns, and the UN
+    DESA "Table 1" keeps the header row after the titles, the location
+    code columns and the three (both sexes, male, female) year blocks.
+    The country dimension, aliases and hierarchy are written alongside so
+    synthetic countries resolve like real ones.
+    """
+    from Sources import GDP_PATH, URB_PATH, HDI_PATH, MIGRATION_PATH, MIGRATION_COLUMNS, MIGRATION_YEARS
+
+    rng = np.random.default_rng(seed)
+    data_dir = os.path.join(root, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    table = synthetic_countries(countries)
+    aliases = pd.read_csv(os.path.join(ROOT, "data", "country_aliases.csv"), keep_default_na=False)
+    aliases = aliases[aliases["iso3"].isin(table["iso3"])]
+    table[["country_id", "iso3", "name"]].to_csv(os.path.join(data_dir, "country_dimension.csv"), index=False)
+    aliases.to_csv(os.path.join(data_dir, "country_aliases.csv"), index=False)
+    table.drop(columns=["country_id", "name"]).to_csv(os.path.join(data_dir, "country_hierarchy.csv"), index=False)
+
+    n = len(table)
+    years = np.array(WB_YEARS)
+    missing = lambda shape, p: rng.random(shape) < p  # noqa: E731
+
+    # --- World Bank: GDP per capita and urban population % ---
+    names = np.append(_spellings(table, aliases, rng), [a for a, _ in WB_AGGREGATES])
+    iso3 = np.append(table["iso3"].to_numpy(), [c for _, c in WB_AGGREGATES])
+    m = len(names)
+    growth = rng.normal(0.02, 0.01, (m, 1))
+    gdp = np.exp(rng.normal(7.5, 1.2, (m, 1))) * (1 + growth) ** (years - 1960)
+    gdp[missing(gdp.shape, 0.1)] = np.nan
+    _write_world_bank(os.path.join(root, GDP_PATH), names, iso3, gdp,
+                      "GDP per capita (current US$)", "NY.GDP.PCAP.CD")
+    midpoint = rng.uniform(1950, 2060, (m, 1))
+    urban = 5 + 90 / (1 + np.exp(-(years - midpoint) / rng.uniform(15, 40, (m, 1))))
+    urban[missing(urban.shape, 0.05)] = np.nan
+    _write_world_bank(os.path.join(root, URB_PATH), names, iso3, urban,
+                      "Urban population (% of total population)", "SP.URB.TOTL.IN.ZS")
+
+    # --- HDR: HDI trends ---
+    hdi = np.clip(rng.uniform(0.25, 0.75, (n, 1)) + 0.004 * (np.array(HDR_YEARS) - 1990), 0, 0.99).round(3)
+    hdr_names = _spellings(table, aliases, rng)
+    header = ["HDI rank", "Country"]
+    for y in HDR_YEARS:
+        header += [y, None]
+    rank = pd.Series(hdi[:, -1]).rank(ascending=False, method="min").astype(int).to_numpy()
+    groups = np.array_split(np.argsort(-hdi[:, -1]), len(HDR_GROUPS))
+
+    def hdr_rows():
+        yield [None, "Table 2. Human Development Index trends, 1990-2023"]
+        yield []
+        yield [None, None, "HDI: Human Development Index (HDI)"]
+        yield [None, None, "Value"]
+        yield header
+        for group, members in zip(HDR_GROUPS, groups):
+            yield [None, group]
+            for i in members:
+                row = [int(rank[i]), hdr_names[i]]
+                for v in hdi[i]:
+                    row += [float(v) if rng.random() > 0.03 else "..", None]
+                yield row
+        yield [None, "World"] + [v for y in HDR_YEARS for v in (0.7, None)]
+    write_xlsx(os.path.join(root, HDI_PATH), "Table 2. HDI trends", hdr_rows(), len(header))
+
+    # --- UN DESA: destination x origin migrant stock ---
+    desa_names = _spellings(table, aliases, rng)
+    destinations = DESA_AGGREGATES + list(desa_names)
+    k = len(MIGRATION_YEARS)
+    desa_header = (["Index"] + MIGRATION_COLUMNS[:1] + ["Notes of destination", "Location code of destination",
+                                                       "Type of data of destination"]
+                   + MIGRATION_COLUMNS[1:2] + ["Location code of origin"] + MIGRATION_YEARS * 3)
+
+    def desa_rows():
+        yield ["International migrant stock at mid-year by sex and by region, country or area "
+               "of destination and origin, 1990-2024"]
+        for _ in range(9):
+            yield []
+        yield desa_header
+        index = 0
+        for d, destination in enumerate(destinations):
+            picked = rng.choice(n, size=origins, replace=False)
+            origin_names = DESA_ORIGIN_AGGREGATES + list(desa_names[picked])
+            both = np.exp(rng.normal(6, 2, (len(origin_names), 1))) * (1.02 ** (np.array(MIGRATION_YEARS) - 1990))
+            both = both.round()
+            male = (both * rng.uniform(0.4, 0.6, both.shape)).round()
+            both[missing(both.shape, 0.05)] = np.nan
+            for o, origin in enumerate(origin_names):
+                index += 1
+                values = np.concatenate([both[o], male[o], both[o] - male[o]])
+                yield ([index, destination, None, 900 + d, "B", origin, 900 + o]
+                       + [None if v != v else int(v) for v in values])
+    write_xlsx(os.path.join(root, MIGRATION_PATH), "Table 1", desa_rows(), len(desa_header))
+
+    rows = len(destinations) * (origins + len(DESA_ORIGIN_AGGREGATES))
+    with open(os.path.join(root, "generated.json"), "w", encoding="utf-8") as f:
+        json.dump({"countries": countries, "origins": origins, "seed": seed, "migration_rows": rows}, f)
+    print(f"Generated {root}: {countries} countries, {origins} origins each, {rows} UN DESA rows")
+    return rows
+
+
+# === Stages (run inside the generated folder) ===
+def run_stages():
+    """Time every stage on the data/ folder in the working directory.
+
+    Runs in its own process with GMP_TELEMETRY=1 and a fresh source cache,
+    so the first source build is a cold one, like a first pipeline run.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import statsmodels.api as sm
+    from scipy.cluster.hierarchy import linkage
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+
+    import Telemetry
+    from Analysis_Merged import plot_scatter
+    from Bootstrap import bootstrap_ols
+    from Clustering import cluster_rows
+    from Countries import resolve
+    from Ingestion import read_sheet
+    from Merged import build_merged, load_merged, VALUE_COLUMNS
+    from Modeling import ENSEMBLES, FEATURES, country_means, fit_ensembles
+    from ModelStore import data_hash
+    from PanelRegression import fit_fixed_effects
+    from Plotting import plot_job, render_plots, scatter_data
+    from Sources import (MIGRATION_PATH, MIGRATION_COLUMNS, MIGRATION_SHEET, HDI_PATH, HDI_COLUMNS, HDI_SHEET,
+                         HDI_YEARS, GDP_PATH, URB_PATH, EXCEL_ENGINE, clean_country_name,
+                         load_migration, load_gdp, load_urbanization, load_hdi)
+    from Telemetry import stage
+
+    Telemetry.reset()
+    with stage("benchmark"):
+        # --- Ingestion, melt and name cleaning, step by step ---
+        with stage("ingest_migration") as s:
+            wide, _ = read_sheet(MIGRATION_PATH, MIGRATION_COLUMNS, sheet=MIGRATION_SHEET, engine=EXCEL_ENGINE)
+            s["rows_out"] = len(wide)
+        with stage("ingest_world_bank") as s:
+            gdp_wide = pd.read_csv(GDP_PATH, skiprows=4)
+            urb_wide = pd.read_csv(URB_PATH, skiprows=4)
+            s["rows_out"] = len(gdp_wide) + len(urb_wide)
+        with stage("ingest_hdi") as s:
+            hdi_wide, _ = read_sheet(HDI_PATH, HDI_COLUMNS, sheet=HDI_SHEET, optional_columns=HDI_YEARS,
+                                     engine=EXCEL_ENGINE)
+            s["rows_out"] = len(hdi_wide)
+        with stage("melt", rows_in=len(wide)) as s:
+            wide.columns = ["Country", "Origin"] + list(wide.columns[2:])
+            long = wide.melt(id_vars=["Country", "Origin"], var_name="Year", value_name="Migration")
+            s["rows_out"] = len(long)
+        with stage("clean_names", rows_in=len(long)):
+            long["Country"] = long["Country"].map(clean_country_name)
+            long["Origin"] = long["Origin"].map(clean_country_name)
+        with stage("resolve_names", rows_in=len(long)):
+            resolve(long["Country"])
+            resolve(long["Origin"])
+        del wide, long, gdp_wide, urb_wide, hdi_wide
+
+        # --- The pipeline itself ---
+        with stage("build_sources") as s:
+            s["rows_out"] = sum(len(f()) for f in (load_migration, load_gdp, load_urbanization, load_hdi))
+        with stage("merge") as s:
+            build_merged(write_csv=True)
+        with stage("load_merged") as s:
+            df = load_merged()
+            s["rows_out"] = len(df)
+        with stage("aggregate", rows_in=len(df)) as s:
+            df_country = country_means(df)
+            s["rows_out"] = len(df_country)
+        with stage("correlation", rows_in=len(df)):
+            df[VALUE_COLUMNS].corr()
+
+        X, y = df_country[FEATURES].astype(float), df_country["Migration"].astype(float)
+        with stage("fit_ols", rows_in=len(X)):
+            sm.OLS(y, sm.add_constant(X)).fit()
+        with stage("bootstrap_ols", rows_in=len(X)):
+            bootstrap_ols(X, y, replicates=BOOTSTRAP_REPLICATES, x_new=X)
+        with stage("fit_fixed_effects", rows_in=len(df)):
+            fit_fixed_effects(df, "Migration", FEATURES, fixed_effects=("Country", "Year"), cluster="Country")
+        with stage("fit_ensembles", rows_in=len(X)):
+            fit_ensembles(X, y, data_hash(X, y, params={n: s[1] for n, s in ENSEMBLES.items()}))
+
+        scaled = StandardScaler().fit_transform(df_country[["Migration"] + FEATURES])
+        with stage("kmeans", rows_in=len(scaled)):
+            labels = KMeans(n_clusters=3, random_state=42).fit_predict(scaled)
+            silhouette_score(scaled, labels)
+        if len(scaled) <= EXACT_LINKAGE_MAX:
+            with stage("hierarchical", rows_in=len(scaled)):
+                linkage(scaled, method="ward")
+        with stage("cluster_panel", rows_in=len(df)):
+            cluster_rows(StandardScaler().fit_transform(df[["Migration"] + FEATURES]), k=3)
+        with stage("plot", rows_in=len(df)):
+            render_plots([plot_job("benchmark_scatter.png", plot_scatter,
+                                   scatter_data(df, "GDP_per_capita", "Migration", fit=True),
+                                   col="GDP_per_capita", figsize=(7, 5))], processes=1, force=True)
+
+    with open(REPORT_NAME, "w", encoding="utf-8") as f:
+        json.dump(Telemetry.report("benchmark"), f, indent=2)
+
+
+# === Runs and history ===
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def prepare(scale, countries=None, origins=None, regenerate=False):
+    """Folder with generated inputs for a shape, reused while its parameters match."""
+    countries, origins = scale_shape(scale, countries, origins)
+    root = os.path.abspath(os.path.join(WORK_DIR, f"c{countries}-o{origins}"))
+    marker = os.path.join(root, "generated.json")
+    if regenerate or not os.path.exists(marker):
+        generate(root, countries, origins)
+    with open(marker, encoding="utf-8") as f:
+        return root, json.load(f)
+
+
+def run_benchmarks(scales, countries=None, origins=None, regenerate=False):
+    """Benchmark every scale in a fresh process; returns the new result rows."""
+    from Telemetry import compare, format_comparison, format_report, load_report
+
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    commit = _git_commit()
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    rows = []
+    for scale in scales:
+        root, shape = prepare(scale, countries, origins, regenerate)
+        # outputs and caches from an earlier run would turn stages into cache hits
+        for sub in ("cache", "processed", "plots"):
+            shutil.rmtree(os.path.join(root, sub), ignore_errors=True)
+        env = dict(os.environ, GMP_TELEMETRY="1", GMP_CACHE_DIR=os.path.join(root, "cache"), MPLBACKEND="Agg")
+        print(f"\n=== Scale {scale}: {shape['countries']} countries, {shape['migration_rows']} UN DESA rows ===")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "stages"], cwd=root, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+        report = load_report(os.path.join(root, REPORT_NAME))
+        report.update(run_id=run_id, commit=commit, scale=scale, **shape)
+        print(format_report(report))
+        shape_tag = f"c{shape['countries']}-o{shape['origins']}"
+        previous = sorted(p for p in os.listdir(RUNS_DIR) if p.endswith(f"-{shape_tag}.json"))
+        path = os.path.join(RUNS_DIR, f"{run_id}-{shape_tag}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        if previous:
+            baseline = os.path.join(RUNS_DIR, previous[-1])
+            print(f"\nCompared with {baseline}:")
+            print(format_comparison(compare(report, load_report(baseline))))
+
+        for r in report["stages"]:
+            rows.append({"run_id": run_id, "commit": commit, "scale": scale, "countries": shape["countries"],
+                         "origins": shape["origins"], "migration_rows": shape["migration_rows"],
+                         "stage": r["stage"], "wall_s": round(r["wall_s"], 4), "cpu_s": round(r["cpu_s"], 4),
+                         "peak_mb": round(r["peak_mb"], 3), "rows_in": r["rows_in"], "rows_out": r["rows_out"]})
+
+    results = pd.DataFrame(rows)
+    results.to_csv(RESULTS_PATH, mode="a", header=not os.path.exists(RESULTS_PATH), index=False)
+    print(f"\nResults appended to {RESULTS_PATH}")
+    return results
+
+
+def history(stage_name=None):
+    """Wall time per stage (rows) for every stored run and scale (columns)."""
+    results = pd.read_csv(RESULTS_PATH)
+    if stage_name:
+        results = results[results["stage"] == stage_name]
+    return results.pivot_table(index="stage", columns=["run_id", "scale"], values="wall_s", sort=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic inputs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write synthetic inputs for one scale")
+    run = sub.add_parser("run", help="benchmark one or more scales and store the results")
+    for p in (gen, run):
+        p.add_argument("--countries", type=int, default=None, help="override the number of countries")
+        p.add_argument("--origins", type=int, default=None, help="origins per destination (default 100)")
+    gen.add_argument("--scale", type=float, default=1.0, help="size relative to today's inputs")
+    run.add_argument("--scale", type=float, nargs="+", default=[1.0], help="sizes relative to today's inputs")
+    run.add_argument("--regenerate", action="store_true", help="rewrite the synthetic inputs")
+    hist = sub.add_parser("history", help="print stored results")
+    hist.add_argument("--stage", default=None)
+    sub.add_parser("stages", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        prepare(args.scale, args.countries, args.origins, regenerate=True)
+    elif args.command == "run":
+        run_benchmarks(args.scale, args.countries, args.origins, args.regenerate)
+    elif args.command == "history":
+        print(history(args.stage).round(3).to_string())
+    else:
+        run_stages()
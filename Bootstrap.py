@@ -0,0 +1,122 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# === Settings ===
+REPLICATES = 10000
+CHUNK = 500          # resamples solved per batch; memory ~ CHUNK x rows
+CONFIDENCE = 0.95
+
+
+def _design(X):
+    """Intercept + standardized columns; the scaling keeps X'X well conditioned."""
+    X = np.asarray(X, dtype=float)
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1.0
+    return np.column_stack([np.ones(len(X)), (X - mean) / std]), mean, std
+
+
+def _unscale(beta, mean, std):
+    """Coefficients on the standardized design back to the original units."""
+    slopes = beta[:, 1:] / std
+    intercept = beta[:, 0] - slopes @ mean
+    return np.column_stack([intercept, slopes])
+
+
+def bootstrap_ols(X, y, replicates=REPLICATES, chunk=CHUNK, x_new=None, random_state=42):
+    """Pairs bootstrap of an OLS fit, solved as batched least squares.
+
+    A resample is the same as weighting each row by how often it was drawn,
+    so every chunk is a (chunk x rows) matrix of multinomial counts W and all
+    its normal equations X'WX b = X'Wy are built with two matrix products and
+    solved in one np.linalg.solve call.
+    Returns {"coef": (replicates, 1 + k), "r2": (replicates,),
+    "pred": (replicates, len(x_new)) or None}.
+    """
+    D, mean, std = _design(X)
+    y = np.asarray(y, dtype=float)
+    n, p = D.shape
+    rng = np.random.default_rng(random_state)
+    D_new = None
+    if x_new is not None:
+        x_new = np.asarray(x_new, dtype=float)
+        D_new = np.column_stack([np.ones(len(x_new)), (x_new - mean) / std])
+
+    coef = np.empty((replicates, p))
+    r2 = np.empty(replicates)
+    pred = None if D_new is None else np.empty((replicates, len(D_new)), dtype=np.float32)
+    # the p x p outer products of each row, so X'WX is a single (chunk x n) @ (n x p*p) product
+    outer = (D[:, :, None] * D[:, None, :]).reshape(n, p * p)
+
+    for lo in range(0, replicates, chunk):
+        hi = min(lo + chunk, replicates)
+        W = rng.multinomial(n, np.full(n, 1.0 / n), size=hi - lo).astype(float)
+
+        XtX = (W @ outer).reshape(-1, p, p)
+        Xty = W @ (D * y[:, None])
+        try:
+            beta = np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            # a resample that drew too few distinct rows; least-norm solution instead
+            beta = (np.linalg.pinv(XtX) @ Xty[:, :, None])[:, :, 0]
+
+        fitted = beta @ D.T
+        y_bar = (W @ y) / n
+        sse = (W * (y - fitted) ** 2).sum(axis=1)
+        sst = (W * (y - y_bar[:, None]) ** 2).sum(axis=1)
+
+        coef[lo:hi] = beta
+        r2[lo:hi] = 1 - sse / sst
+        if pred is not None:
+            pred[lo:hi] = beta @ D_new.T
+
+    return {"coef": _unscale(coef, mean, std), "r2": r2, "pred": pred}
+
+
+def confidence_table(samples, names, estimate=None, confidence=CONFIDENCE):
+    """Percentile intervals and bootstrap SE, one row per column of samples."""
+    alpha = (1 - confidence) / 2
+    samples = np.atleast_2d(np.asarray(samples, dtype=float).T).T
+    low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+    table = pd.DataFrame({
+        "Term": names,
+        "Boot_mean": np.nanmean(samples, axis=0),
+        "Boot_SE": np.nanstd(samples, axis=0, ddof=1),
+        "CI_low": low,
+        "CI_high": high,
+    })
+    if estimate is not None:
+        table.insert(1, "Estimate", np.asarray(estimate, dtype=float))
+    return table
+
+
+def bootstrap_summary(X, y, replicates=REPLICATES, chunk=CHUNK, confidence=CONFIDENCE):
+    """Coefficient and R² intervals for the OLS of y on X (with intercept)."""
+    X = pd.DataFrame(X)
+    y = np.asarray(y, dtype=float)
+    boot = bootstrap_ols(X, y, replicates=replicates, chunk=chunk)
+
+    # point estimates on the original sample
+    D = np.column_stack([np.ones(len(X)), X.to_numpy(dtype=float)])
+    beta, *_ = np.linalg.lstsq(D, y, rcond=None)
+    resid = y - D @ beta
+    r2 = 1 - (resid ** 2).sum() / ((y - y.mean()) ** 2).sum()
+    samples = np.column_stack([boot["coef"], boot["r2"]])
+    return confidence_table(samples, ["const"] + list(X.columns) + ["R2"],
+                            estimate=np.append(beta, r2), confidence=confidence)
+
+
+if __name__ == "__main__":
+    # Timing on the country-year panel: python Bootstrap.py [replicates]
+    from Merged import load_merged
+    from Modeling import FEATURES
+
+    replicates = int(sys.argv[1]) if len(sys.argv) > 1 else REPLICATES
+    df = load_merged()
+    start = time.perf_counter()
+    table = bootstrap_summary(df[FEATURES], df["Migration"], replicates=replicates)
+    print(f"\n{replicates} bootstrap replicates on {len(df)} country-year rows "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(table.to_string(index=False))
@@ -0,0 +1,151 @@
+import ast
+import hashlib
+import inspect
+import os
+import sys
+
+import pandas as pd
+
+# === Settings ===
+# Cleaned source tables are stored as Parquet files named
+# "<table>-<key>.parquet", where key hashes the raw input files together
+# with the version and source code of the function that cleans them, and
+# the source files of its module and every repo module it imports.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("GMP_CACHE_DIR", "cache")
+CACHE_MAX_MB = float(os.environ.get("GMP_CACHE_MAX_MB", "512"))
+CACHE_ENABLED = os.environ.get("GMP_CACHE", "1") != "0"
+
+_digest_memo = {}
+
+
+# === Keys ===
+def file_digest(path):
+    """SHA-256 of a raw file, memoised on (size, mtime) for the process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _digest_memo:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _digest_memo[memo_key] = h.hexdigest()
+    return _digest_memo[memo_key]
+
+
+def code_digest(func, version=""):
+    """Hash of a cleaning function's source plus an explicit version tag."""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, "__qualname__", repr(func))
+    return hashlib.sha256(f"{version}\n{source}".encode()).hexdigest()
+
+
+def local_modules(script, seen=None):
+    """The script plus every repo module it imports, followed recursively."""
+    seen = set() if seen is None else seen
+    path = os.path.join(ROOT, script)
+    if script in seen or not os.path.exists(path):
+        return seen
+    seen.add(script)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_modules(name.split(".")[0] + ".py", seen)
+    return seen
+
+
+def module_digest(func):
+    """Hash of the source files of func's module and the repo modules it
+    imports, so edits to shared helpers (name cleaning, sheet readers) count."""
+    module_file = getattr(sys.modules.get(func.__module__), "__file__", None)
+    h = hashlib.sha256()
+    if module_file:
+        for script in sorted(local_modules(os.path.basename(module_file))):
+            h.update(script.encode())
+            h.update(file_digest(os.path.join(ROOT, script)).encode())
+    return h.hexdigest()
+
+
+def cache_key(raw_paths, builder, version=""):
+    h = hashlib.sha256()
+    for path in raw_paths:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    h.update(code_digest(builder, version).encode())
+    h.update(module_digest(builder).encode())
+    return h.hexdigest()[:20]
+
+
+# === Load / store ===
+def cached_table(name, raw_paths, builder, version=""):
+    """Return builder()'s DataFrame, reusing a stored copy when inputs match.
+
+    A changed raw file, cleaning function or repo module it depends on
+    gives a new key, so stale entries are never read; they simply age out
+    through eviction.
+    """
+    if not CACHE_ENABLED:
+        return builder()
+
+    key = cache_key(raw_paths, builder, version)
+    path = os.path.join(CACHE_DIR, f"{name}-{key}.parquet")
+
+    if os.path.exists(path):
+        os.utime(path)  # mark as recently used for eviction
+        return pd.read_parquet(path)
+
+    df = builder()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    evict()
+    return df
+
+
+def cache_entries():
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for fname in os.listdir(CACHE_DIR):
+        if fname.endswith(".parquet"):
+            full = os.path.join(CACHE_DIR, fname)
+            stat = os.stat(full)
+            entries.append((stat.st_mtime, stat.st_size, full))
+    return entries
+
+
+def evict(max_mb=None):
+    """Drop least recently used entries until the cache fits in max_mb."""
+    max_bytes = (CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+    entries = sorted(cache_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, full in entries:
+        if total <= max_bytes:
+            break
+        os.remove(full)
+        total -= size
+        removed.append(full)
+    return removed
+
+
+def clear_cache():
+    return evict(max_mb=0)
+
+
+if __name__ == "__main__":
+    entries = sorted(cache_entries(), reverse=True)
+    total = sum(size for _, size, _ in entries)
+    print(f"Cache dir: {CACHE_DIR} ({len(entries)} entries, {total / 1e6:.2f} MB, limit {CACHE_MAX_MB:.0f} MB)")
+    for _, size, full in entries:
+        print(f"  {os.path.basename(full)}  {size / 1e3:.1f} kB")
@@ -0,0 +1,105 @@
+import time
+
+START = time.perf_counter()
+
+import argparse
+import importlib
+import os
+
+# === Subcommands ===
+# name: (module, function, run name for telemetry). Modules are imported only
+# when their subcommand runs; heavy libraries inside them load on first use.
+COMMANDS = {
+    "fetch": ("Sources", "fetch_raw", "fetch"),
+    "merge": ("Merged", "build_merged", "merge"),
+    "analyze": ("Analysis_Merged", "run_analysis", "analyze"),
+    "model": ("Modeling", "run_modeling", "model"),
+    "compare": ("Comparison", "run_comparison", "compare"),
+    "refresh": ("Refresh", "refresh", "refresh"),
+    "serve": ("Service", "serve", "serve"),
+}
+EDA = {
+    "gdp": ("EDA_GDP", "run_gdp_eda", "eda_gdp"),
+    "hdi": ("EDA_HDI", "run_hdi_eda", "eda_hdi"),
+    "migration": ("EDA_Migration", "run_migration_eda", "eda_migration"),
+    "urbanization": ("EDA_Urbanization", "run_urbanization_eda", "eda_urbanization"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python Cli.py",
+                                     description="Global migration patterns: one entry point for every stage.")
+    parser.add_argument("--timings", action="store_true", help="show import time versus work time")
+    parser.add_argument("--telemetry", action="store_true", help="write a per-stage time/memory report")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch = sub.add_parser("fetch", help="download the raw workbooks missing from data/")
+    fetch.add_argument("--force", action="store_true", help="download them even when present")
+    merge = sub.add_parser("merge", help="load, clean and join the sources")
+    merge.add_argument("--origins", action="store_true", help="also write the destination/origin breakdown")
+    merge.add_argument("--no-csv", action="store_true", help="do not write the merged files")
+    eda = sub.add_parser("eda", help="exploratory plots for one source")
+    eda.add_argument("source", choices=list(EDA))
+    sub.add_parser("analyze", help="correlation and trend plots of the merged table")
+    model = sub.add_parser("model", help="regressions, ensembles and clustering")
+    model.add_argument("--panel", action="store_true", help="also cluster the country-year rows")
+    model.add_argument("--no-csv", action="store_true", help="do not write the result tables")
+    sub.add_parser("compare", help="feature importance and cluster comparison figure")
+    refresh = sub.add_parser("refresh", help="update the merged table from changed sources only")
+    refresh.add_argument("--full", action="store_true", help="rebuild everything and take new snapshots")
+    serve = sub.add_parser("serve", help="HTTP/JSON top-N, percentile and time-series queries")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    return parser
+
+
+def _arguments(args):
+    if args.command == "fetch":
+        return {"force": args.force}
+    if args.command == "merge":
+        return {"write_csv": not args.no_csv, "write_origins": args.origins}
+    if args.command == "model":
+        return {"write_csv": not args.no_csv, "panel": args.panel}
+    if args.command == "refresh":
+        return {"full": args.full}
+    if args.command == "serve":
+        return {"host": args.host, "port": args.port}
+    return {}
+
+
+def print_timings(startup, imports, work, lazy):
+    lazy_total = sum(lazy.values())
+    print("\n=== Timings ===")
+    print(f"{'CLI start-up':32s} {startup:7.2f}s")
+    print(f"{'imports before work':32s} {imports:7.2f}s")
+    print(f"{'imports during work':32s} {lazy_total:7.2f}s")
+    for name, seconds in sorted(lazy.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:30s} {seconds:7.2f}s")
+    print(f"{'work':32s} {work - lazy_total:7.2f}s")
+    print(f"{'total (after interpreter start)':32s} {startup + imports + work:7.2f}s")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.telemetry:
+        os.environ["GMP_TELEMETRY"] = "1"
+    module_name, func_name, run_name = EDA[args.source] if args.command == "eda" else COMMANDS[args.command]
+
+    startup = time.perf_counter() - START
+    t0 = time.perf_counter()
+    module = importlib.import_module(module_name)
+    from Lazy import IMPORT_SECONDS
+    from Telemetry import run
+    imports = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with run(run_name):
+        getattr(module, func_name)(**_arguments(args))
+    work = time.perf_counter() - t0
+
+    if args.timings:
+        print_timings(startup, imports, work, dict(IMPORT_SECONDS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from Lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+hierarchy = lazy_import("scipy.cluster.hierarchy")
+sk_cluster = lazy_import("sklearn.cluster")
+sk_metrics = lazy_import("sklearn.metrics")
+
+# === Settings ===
+# Exact silhouette and Ward linkage need an n x n distance matrix, so above
+# these sizes the scalable versions below are used instead.
+SILHOUETTE_SAMPLE = 5000
+MAX_SUBCLUSTERS = 2000
+DENDROGRAM_LEAVES = 30
+
+
+# === Mini-batch k-means ===
+def minibatch_kmeans(scaled, k, batch_size=2048, random_state=42):
+    """K-means fitted on mini-batches; memory grows with batch_size, not rows."""
+    model = sk_cluster.MiniBatchKMeans(n_clusters=k, batch_size=batch_size, n_init=3, random_state=random_state)
+    return model.fit_predict(scaled), model
+
+
+# === BIRCH pre-clustering + Ward ===
+def birch_ward(scaled, k, threshold=0.5, max_subclusters=MAX_SUBCLUSTERS):
+    """Ward clustering of BIRCH subcluster centres.
+
+    BIRCH streams the rows into at most max_subclusters centres (the
+    threshold is widened until it fits), Ward's linkage runs on those centres
+    only, and every row inherits the cluster of its subcluster.
+    Returns (labels, linked, sizes) where sizes are the rows per subcluster.
+    """
+    while True:
+        birch = sk_cluster.Birch(threshold=threshold, n_clusters=None).fit(scaled)
+        centers = birch.subcluster_centers_
+        if len(centers) <= max_subclusters:
+            break
+        threshold *= 1.5
+
+    sizes = np.bincount(birch.labels_, minlength=len(centers))
+    if len(centers) < 2:
+        return np.zeros(len(scaled), dtype=int), None, sizes
+    linked = hierarchy.linkage(centers, method="ward")
+    sub_labels = hierarchy.fcluster(linked, k, criterion="maxclust") - 1
+    return sub_labels[birch.labels_], linked, sizes
+
+
+# === Scoring ===
+def sampled_silhouette(scaled, labels, sample_size=SILHOUETTE_SAMPLE, random_state=42):
+    """Silhouette on at most sample_size rows (exact below that)."""
+    if len(np.unique(labels)) < 2:
+        return np.nan
+    if len(scaled) <= sample_size:
+        return sk_metrics.silhouette_score(scaled, labels)
+    return sk_metrics.silhouette_score(scaled, labels, sample_size=sample_size, random_state=random_state)
+
+
+# === Truncated dendrogram ===
+def leaf_counts(linked, sizes):
+    """Rows under every node of a linkage built on weighted leaves."""
+    n = len(sizes)
+    counts = np.concatenate([sizes, np.zeros(len(linked), dtype=sizes.dtype)])
+    for j, (a, b) in enumerate(linked[:, :2].astype(int)):
+        counts[n + j] = counts[a] + counts[b]
+    return counts
+
+
+def plot_truncated_dendrogram(data, p=DENDROGRAM_LEAVES, title="Hierarchical Clustering Dendrogram (BIRCH + Ward)"):
+    """Only the last p merges; each leaf is labelled with the rows below it."""
+    counts = data["counts"]
+    hierarchy.dendrogram(data["linked"],
+                         truncate_mode="lastp",
+                         p=p,
+                         leaf_label_func=lambda i: f"({counts[i]})",
+                         leaf_rotation=90,
+                         leaf_font_size=11)
+    plt.title(title, fontsize=14)
+    plt.xlabel("Rows per branch", fontsize=12)
+    plt.ylabel("Distance", fontsize=12)
+    plt.tight_layout()
+
+
+def cluster_rows(scaled, k=3):
+    """Mini-batch k-means and BIRCH + Ward on many rows.
+
+    Returns a dict with both label arrays, their (sampled) silhouettes and
+    the data for plot_truncated_dendrogram.
+    """
+    kmeans_labels, kmeans = minibatch_kmeans(scaled, k)
+    hier_labels, linked, sizes = birch_ward(scaled, k)
+    return {
+        "kmeans": kmeans_labels,
+        "kmeans_silhouette": sampled_silhouette(scaled, kmeans_labels),
+        "kmeans_inertia": kmeans.inertia_,
+        "hier": hier_labels,
+        "hier_silhouette": sampled_silhouette(scaled, hier_labels),
+        "dendrogram": None if linked is None else {"linked": linked, "counts": leaf_counts(linked, sizes)},
+    }
+
+
+if __name__ == "__main__":
+    # Memory check on synthetic blobs: python Clustering.py [rows]
+    from sklearn.datasets import make_blobs
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    X, _ = make_blobs(n_samples=rows, n_features=4, centers=3, random_state=0)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = cluster_rows(X, k=3)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{rows} rows clustered in {seconds:.1f}s, peak {peak / 1e6:.1f} MB "
+          f"(an exact linkage would need {rows * (rows - 1) / 2 * 8 / 1e9:.1f} GB)")
+    print(f"Mini-batch k-means silhouette: {result['kmeans_silhouette']:.3f}")
+    print(f"BIRCH + Ward silhouette:      {result['hier_silhouette']:.3f}")
+    print(f"Subclusters fed to Ward:      {len(result['dendrogram']['linked']) + 1}")
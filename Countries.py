@@ -0,0 +1,111 @@
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# === Paths ===
+DATA_DIR = "data"
+DIMENSION_PATH = os.path.join(DATA_DIR, "country_dimension.csv")
+ALIASES_PATH = os.path.join(DATA_DIR, "country_aliases.csv")
+
+UNMATCHED = -1
+
+# Words that mark a region/income/development group rather than a country,
+# used only to label the unmatched-names report.
+AGGREGATE_WORDS = ("world", "income", "region", "develop", "countries", "area", "total",
+                   "other", "union", "states", "africa", "asia", "europe", "america",
+                   "caribbean", "pacific", "oceania", "ida", "ibrd", "dividend", "oecd",
+                   "euro", "small", "fragile", "indebted", "classified", "sdg", "arab")
+
+
+# === Name normalisation ===
+def normalize_name(name):
+    """Casefolded, accent- and punctuation-free key used for matching."""
+    name = unicodedata.normalize("NFKD", str(name))
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = name.casefold().replace("&", " and ")
+    name = re.sub(r"[^0-9a-z ]+", "", name)
+    return " ".join(name.split())
+
+
+# === Dimension ===
+@lru_cache(maxsize=1)
+def load_dimension():
+    """country_id (int16), iso3 and canonical name for every country."""
+    dim = pd.read_csv(DIMENSION_PATH, keep_default_na=False, encoding="utf-8")
+    dim["country_id"] = dim["country_id"].astype("int16")
+    return dim
+
+
+@lru_cache(maxsize=1)
+def _lookup():
+    dim = load_dimension()
+    aliases = pd.read_csv(ALIASES_PATH, keep_default_na=False, encoding="utf-8")
+    id_by_iso3 = dict(zip(dim["iso3"], dim["country_id"]))
+
+    table = {}
+    for name, iso3 in zip(dim["name"], dim["iso3"]):
+        table[normalize_name(name)] = id_by_iso3[iso3]
+        table[normalize_name(iso3)] = id_by_iso3[iso3]
+    for alias, iso3 in zip(aliases["alias"], aliases["iso3"]):
+        table[normalize_name(alias)] = id_by_iso3[iso3]
+    return table
+
+
+@lru_cache(maxsize=None)
+def resolve_one(name):
+    """country_id for a single spelling, or UNMATCHED. Memoised per spelling."""
+    if not isinstance(name, str):
+        return UNMATCHED
+    return int(_lookup().get(normalize_name(name), UNMATCHED))
+
+
+def resolve(names):
+    """Map a Series of names to int16 country ids in one vectorised pass.
+
+    Only the distinct spellings go through resolve_one; the result is then
+    broadcast back to every row with a single take().
+    """
+    codes, uniques = pd.factorize(pd.Series(names), use_na_sentinel=True)
+    ids = np.fromiter((resolve_one(u) for u in uniques), dtype=np.int16, count=len(uniques))
+    ids = np.append(ids, np.int16(UNMATCHED))  # code -1 (missing name) -> UNMATCHED
+    return ids[codes]
+
+
+def attach_country_id(df, column="Country", name="country_id"):
+    df = df.copy()
+    df[name] = resolve(df[column])
+    return df
+
+
+def country_names(ids):
+    """Canonical names for an array of country ids."""
+    names = load_dimension()["name"].to_numpy()
+    return names[np.asarray(ids, dtype=np.int64)]
+
+
+def is_country(names):
+    """True where a name is a country, False for regions, development and
+    income groups ("World", "Europe", "Least developed countries") or blanks."""
+    return resolve(names) != UNMATCHED
+
+
+# === Unmatched-name report ===
+def unmatched_report(sources):
+    """Rows per unmatched spelling for a {source: Series of names} mapping."""
+    rows = []
+    for source, names in sources.items():
+        counts = pd.Series(names).dropna().value_counts()
+        for name, n in counts.items():
+            if resolve_one(name) == UNMATCHED:
+                key = normalize_name(name)
+                rows.append({
+                    "Source": source,
+                    "Name": name,
+                    "Rows": int(n),
+                    "Likely_aggregate": any(word.startswith(w) for word in key.split() for w in AGGREGATE_WORDS),
+                })
+    return pd.DataFrame(rows, columns=["Source", "Name", "Rows", "Likely_aggregate"])
@@ -1,53 +1,82 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
-DATA_PATH = "data/undesa_pd_2024_ims_stock_by_sex_destination_and_origin.xlsx"
+from Lazy import lazy_import
+from Countries import is_country
+from Hierarchy import migration_totals
+from Sources import load_migration
+from Plotting import plot_job, render_plots
+from Telemetry import run, stage
+
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+
 PLOTS_DIR = "plots"
-os.makedirs(PLOTS_DIR, exist_ok=True)
-
-xls = pd.ExcelFile(DATA_PATH)
-df = pd.read_excel(xls, sheet_name="Table 1", header=10)
-
-# Keeping only relevant columns
-df = df[['Region, development group, country or area of destination',
-         'Region, development group, country or area of origin',
-         1990, 1995, 2000, 2005, 2010, 2015, 2020, 2024]]
-
-df.columns = ['Destination', 'Origin', '1990', '1995', '2000', '2005', '2010', '2015', '2020', '2024']
-
-# Basic overview
-print(f"Data Loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-
-# Global trend of total migration
-df_years = df.loc[:, '1990':'2024'].sum()
-plt.figure(figsize=(8,5))
-sns.lineplot(x=df_years.index, y=df_years.values, marker="o")
-plt.title("Global International Migrant Stock (1990–2024)")
-plt.xlabel("Year")
-plt.ylabel("Total Migrants")
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(f"{PLOTS_DIR}/migration_global_trend.png")
-plt.close()
-
-# Top 10 destination countries (2024)
-top_dest = df.groupby('Destination')['2024'].sum().sort_values(ascending=False).head(10)
-plt.figure(figsize=(8,5))
-sns.barplot(x=top_dest.values, y=top_dest.index, palette="crest")
-plt.title("Top 10 Destination Countries (2024)")
-plt.xlabel("Migrant Stock")
-plt.tight_layout()
-plt.savefig(f"{PLOTS_DIR}/migration_top_destinations_2024.png")
-plt.close()
-
-# Top 10 origin countries (2024)
-top_orig = df.groupby('Origin')['2024'].sum().sort_values(ascending=False).head(10)
-plt.figure(figsize=(8,5))
-sns.barplot(x=top_orig.values, y=top_orig.index, palette="mako")
-plt.title("Top 10 Origin Countries (2024)")
-plt.xlabel("Migrant Stock")
-plt.tight_layout()
-plt.savefig(f"{PLOTS_DIR}/migration_top_origins_2024.png")
-plt.close()
+
+
+# === Figures ===
+def plot_global_trend(df_years):
+    sns.lineplot(x=df_years.index, y=df_years.values, marker="o")
+    plt.title("Global International Migrant Stock (1990–2024)")
+    plt.xlabel("Year")
+    plt.ylabel("Total Migrants")
+    plt.grid(True)
+    plt.tight_layout()
+
+
+def plot_region_trend(df_regions):
+    df_regions.plot(marker="o", ax=plt.gca())
+    plt.title("International Migrant Stock by Region of Destination")
+    plt.xlabel("Year")
+    plt.ylabel("Total Migrants")
+    plt.grid(True)
+    plt.tight_layout()
+
+
+def plot_top10(values, title, palette):
+    sns.barplot(x=values.values, y=values.index, palette=palette)
+    plt.title(title)
+    plt.xlabel("Migrant Stock")
+    plt.tight_layout()
+
+
+def run_migration_eda():
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+
+    # Long format: Country (destination), Origin, Year, Migration (cached)
+    with stage("load") as s:
+        df = load_migration().rename(columns={'Country': 'Destination'})
+        s["rows_out"] = len(df)
+
+    # Basic overview
+    print(f"Data Loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+
+    # Destination and origin columns mix countries with regions and development
+    # groups ("World", "Europe", ...); summing those would count migrants twice,
+    # so totals come from the hierarchy rollup and top-10 lists use countries only
+    with stage("filter_countries", rows_in=len(df)) as s:
+        df = df[is_country(df['Destination']) & is_country(df['Origin'])]
+        s["rows_out"] = len(df)
+
+    # Global trend of total migration
+    with stage("rollup"):
+        df_years = migration_totals("World")["World"]
+        df_regions = migration_totals("Region")
+
+    # Top 10 destination / origin countries (2024)
+    top_dest = df[df['Year'] == 2024].groupby('Destination')['Migration'].sum().sort_values(ascending=False).head(10)
+    top_orig = df[df['Year'] == 2024].groupby('Origin')['Migration'].sum().sort_values(ascending=False).head(10)
+
+    with stage("plot"):
+        render_plots([
+            plot_job("migration_global_trend.png", plot_global_trend, df_years, figsize=(8,5)),
+            plot_job("migration_by_region.png", plot_region_trend, df_regions, figsize=(8,5)),
+            plot_job("migration_top_destinations_2024.png", plot_top10, top_dest,
+                     title="Top 10 Destination Countries (2024)", palette="crest", figsize=(8,5)),
+            plot_job("migration_top_origins_2024.png", plot_top10, top_orig,
+                     title="Top 10 Origin Countries (2024)", palette="mako", figsize=(8,5)),
+        ])
+
+
+if __name__ == "__main__":
+    with run("eda_migration"):
+        run_migration_eda()
@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Lazy import lazy_import
+from ModelStore import has_table, load_table, save_table
+
+plt = lazy_import("matplotlib.pyplot")
+
+# === Settings ===
+REPEATS = 10
+GRID_POINTS = 20
+EXPLAIN_JOBS = int(os.environ.get("GMP_EXPLAIN_JOBS", "0")) or os.cpu_count() or 1
+
+
+def _r2(y, pred):
+    """R² of each row of pred (repeats x n) against y."""
+    sst = ((y - y.mean()) ** 2).sum()
+    return 1 - ((pred - y) ** 2).sum(axis=-1) / sst
+
+
+# === Stacked inputs ===
+# Every permuted copy (or grid copy) of X for one feature is stacked into a
+# single matrix, so a model is asked for predictions once per feature instead
+# of once per repeat or grid value.
+def _permuted_stack(X, j, repeats, rng):
+    n = len(X)
+    stack = np.tile(X, (repeats, 1))
+    stack[:, j] = np.concatenate([X[rng.permutation(n), j] for _ in range(repeats)])
+    return stack
+
+
+def _grid_stack(X, j, grid):
+    stack = np.tile(X, (len(grid), 1))
+    stack[:, j] = np.repeat(grid, len(X))
+    return stack
+
+
+def feature_grid(X, grid_points=GRID_POINTS):
+    """Quantile grid per feature (5th to 95th percentile)."""
+    return [np.unique(np.quantile(X[:, j], np.linspace(0.05, 0.95, grid_points))) for j in range(X.shape[1])]
+
+
+def _explain_feature(model, X, y, baseline_r2, j, grid, repeats, seed, columns):
+    n = len(X)
+    rng = np.random.default_rng(seed)
+    # one predict for all repeats, one for the whole grid
+    permuted = model.predict(pd.DataFrame(_permuted_stack(X, j, repeats, rng), columns=columns)).reshape(repeats, n)
+    drops = baseline_r2 - _r2(y, permuted)
+    pd_curve = model.predict(pd.DataFrame(_grid_stack(X, j, grid), columns=columns)).reshape(len(grid), n).mean(axis=1)
+    return drops, pd_curve
+
+
+def explain_models(models, X, y, repeats=REPEATS, grid_points=GRID_POINTS, jobs=None, random_state=42):
+    """Permutation importance and partial dependence for every model.
+
+    models: {label: fitted regressor}; X: DataFrame of features; y: target.
+    Each model's baseline prediction is made once and reused for every
+    feature. (model, feature) pairs run in a thread pool: tree prediction
+    releases the GIL, and the stacked matrices are shared, not copied.
+    Returns (importance, dependence) long tables.
+    """
+    features = list(X.columns)
+    Xv = X.to_numpy(dtype=float)
+    yv = np.asarray(y, dtype=float)
+    grids = feature_grid(Xv, grid_points)
+    baseline = {label: _r2(yv, model.predict(X)) for label, model in models.items()}
+
+    tasks = [(label, j) for label in models for j in range(len(features))]
+    with ThreadPoolExecutor(max_workers=jobs or EXPLAIN_JOBS) as pool:
+        futures = {(label, j): pool.submit(_explain_feature, models[label], Xv, yv, baseline[label],
+                                           j, grids[j], repeats, random_state + j, features)
+                   for label, j in tasks}
+        results = {task: f.result() for task, f in futures.items()}
+
+    importance, dependence = [], []
+    for (label, j), (drops, curve) in results.items():
+        importance.append({"Model": label, "Feature": features[j], "Baseline_R2": baseline[label],
+                           "Importance": drops.mean(), "Importance_std": drops.std(ddof=1)})
+        dependence.append(pd.DataFrame({"Model": label, "Feature": features[j],
+                                        "Value": grids[j], "Partial_Dependence": curve}))
+    return pd.DataFrame(importance), pd.concat(dependence, ignore_index=True)
+
+
+def cached_explanations(key, models, X, y, repeats=REPEATS, grid_points=GRID_POINTS, random_state=42, **kwargs):
+    """explain_models() results stored next to the fitted models under key.
+
+    The settings that change the results are part of the table names, so
+    other repeats, grid sizes or seeds are computed and stored separately.
+    """
+    suffix = f"r{repeats}_g{grid_points}_s{random_state}"
+    imp_name, dep_name = f"permutation_importance_{suffix}", f"partial_dependence_{suffix}"
+    if has_table(key, imp_name) and has_table(key, dep_name):
+        print(f"Loaded permutation importance and partial dependence from model store ({key}, {suffix})")
+        return load_table(key, imp_name), load_table(key, dep_name)
+    importance, dependence = explain_models(models, X, y, repeats=repeats, grid_points=grid_points,
+                                            random_state=random_state, **kwargs)
+    save_table(key, imp_name, importance)
+    save_table(key, dep_name, dependence)
+    return importance, dependence
+
+
+# === Figures ===
+def plot_permutation_importance(importance):
+    wide = importance.pivot(index="Feature", columns="Model", values="Importance")
+    err = importance.pivot(index="Feature", columns="Model", values="Importance_std")
+    wide.plot(kind="bar", yerr=err, ax=plt.gca(), capsize=3, rot=0)
+    plt.title("Permutation Importance (drop in R² when a feature is shuffled)")
+    plt.ylabel("Mean R² drop")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+    plt.tight_layout()
+
+
+def plot_partial_dependence(dependence):
+    features = list(dict.fromkeys(dependence["Feature"]))
+    axes = plt.gcf().subplots(1, len(features), sharey=True)
+    for ax, feature in zip(np.atleast_1d(axes), features):
+        for label, curve in dependence[dependence["Feature"] == feature].groupby("Model", sort=False):
+            ax.plot(curve["Value"], curve["Partial_Dependence"], label=label)
+        ax.set_xlabel(feature)
+        ax.grid(True, linestyle="--", alpha=0.5)
+    np.atleast_1d(axes)[0].set_ylabel("Predicted Migration")
+    np.atleast_1d(axes)[0].legend()
+    plt.suptitle("Partial Dependence")
+    plt.tight_layout()
+
+
+if __name__ == "__main__":
+    import time
+    from Merged import load_merged
+    from Modeling import ENSEMBLES, FEATURES, country_means, fit_ensembles
+    from ModelStore import data_hash
+
+    df_country = country_means(load_merged())
+    X, y = df_country[FEATURES], df_country["Migration"]
+    key = data_hash(X, y, params={n: s[1] for n, s in ENSEMBLES.items()})
+    models = fit_ensembles(X, y, key)
+    labelled = {ENSEMBLES[name][2]: model for name, model in models.items()}
+
+    start = time.perf_counter()
+    importance, dependence = explain_models(labelled, X, y)
+    print(f"Explained {len(labelled)} models in {time.perf_counter() - start:.2f}s")
+    print(importance.to_string(index=False))
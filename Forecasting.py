@@ -0,0 +1,225 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Lazy import lazy_import
+from PanelCube import load_cube
+from Plotting import plot_job, render_plots
+
+plt = lazy_import("matplotlib.pyplot")
+
+# === Paths ===
+FORECAST_PATH = "processed/migration_forecast.csv"
+BACKTEST_PATH = "processed/forecast_backtest.csv"
+
+# === Settings ===
+COVARIATES = ["GDP_per_capita", "HDI", "Urbanization"]
+FORECAST_YEARS = list(range(2025, 2031))
+# Weight of an observation falls by DISCOUNT per year of age. Discounted least
+# squares on a linear trend is Brown's double exponential smoothing; the
+# covariates enter the same weighted fit.
+DISCOUNT = 0.9
+RIDGE = 1.0           # shrinks the slopes; countries have only a handful of points
+MIN_OBS = 4           # fewer migration observations than this -> no forecast
+BACKTEST_HORIZON = 10  # years ahead scored from each cut-off
+
+
+# === Data ===
+def panel_arrays(cube=None):
+    """Country x year arrays from the panel cube: log migration and covariates."""
+    cube = cube if cube is not None else load_cube()
+    k = {name: i for i, name in enumerate(cube.indicators)}
+    values = np.asarray(cube.values)
+    covariates = np.stack([values[k[c]] for c in COVARIATES], axis=-1)  # (countries, years, 3)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariates[..., 0] = np.log(covariates[..., 0])
+        migration = np.log1p(values[k["Migration"]])
+    return {"countries": cube.countries, "years": cube.years.astype(int),
+            "migration": migration, "covariates": covariates}
+
+
+# === Batched weighted least squares ===
+def _solve(X, y, w, ridge=RIDGE):
+    """One weighted ridge fit per country: X (c, t, p), y and w (c, t).
+
+    Every country's normal equations are built with two einsums and solved
+    in a single np.linalg.solve call. The intercept (column 0) is not shrunk.
+    """
+    y = np.where(w > 0, y, 0.0)
+    X = np.where(w[..., None] > 0, X, 0.0)
+    Xw = X * w[..., None]
+    A = np.einsum("ctp,ctq->cpq", Xw, X)
+    # a tiny floor keeps countries without data solvable; they are masked later
+    penalty = np.full(X.shape[-1], max(ridge, 1e-9))
+    penalty[0] = 1e-9
+    A += np.diag(penalty)
+    b = np.einsum("ctp,ct->cp", Xw, y)
+    return np.linalg.solve(A, b[..., None])[..., 0]
+
+
+def _trend_design(years, cutoff, n_countries):
+    t = (np.asarray(years, dtype=float) - cutoff) / 10.0
+    design = np.stack([np.ones_like(t), t], axis=-1)
+    return np.broadcast_to(design, (n_countries,) + design.shape)
+
+
+def fit_predict(data, cutoff, target_years, discount=DISCOUNT, ridge=RIDGE):
+    """Forecast migration for target_years using only years <= cutoff.
+
+    Covariates after the cut-off are not known either, so each one is
+    extrapolated with its own discounted trend first. Returns a
+    (countries, len(target_years)) array of migrant stocks.
+    """
+    years = data["years"]
+    train = years <= cutoff
+    n = len(data["countries"])
+    decay = np.where(train, discount ** np.clip(cutoff - years, 0, None), 0.0)
+
+    # --- Covariates: per-country discounted linear trend ---
+    X_hist = _trend_design(years, cutoff, n)
+    X_future = _trend_design(target_years, cutoff, n)
+    cov = data["covariates"]
+    cov_future = np.empty((n, len(target_years), cov.shape[-1]))
+    cov_ok = np.ones(n, dtype=bool)
+    for j in range(cov.shape[-1]):
+        w = decay * ~np.isnan(cov[..., j])
+        cov_ok &= (w > 0).sum(axis=1) >= 2
+        beta = _solve(X_hist, cov[..., j], w, ridge=0.0)
+        cov_future[..., j] = np.einsum("ctp,cp->ct", X_future, beta)
+
+    # --- Standardize covariates on the training cells ---
+    observed = train[None, :, None] & ~np.isnan(cov)
+    mean = np.nanmean(np.where(observed, cov, np.nan), axis=(0, 1))
+    std = np.nanstd(np.where(observed, cov, np.nan), axis=(0, 1))
+    std[~(std > 0)] = 1.0
+
+    # --- Migration: trend + covariates ---
+    X = np.concatenate([X_hist, (cov - mean) / std], axis=-1)
+    Xf = np.concatenate([X_future, (cov_future - mean) / std], axis=-1)
+    y = data["migration"]
+    w = decay * ~np.isnan(y) * ~np.isnan(cov).any(axis=-1)
+    beta = _solve(X, y, w, ridge=ridge)
+
+    pred = np.expm1(np.einsum("ctp,cp->ct", Xf, beta))
+    pred[((w > 0).sum(axis=1) < MIN_OBS) | ~cov_ok] = np.nan
+    return np.clip(pred, 0, None)
+
+
+def forecast(data=None, years=FORECAST_YEARS):
+    """Country x year forecast table from the latest data."""
+    data = data if data is not None else panel_arrays()
+    cutoff = int(data["years"][~np.isnan(data["migration"]).all(axis=0)].max())
+    pred = fit_predict(data, cutoff, years)
+    df = pd.DataFrame(pred, index=data["countries"], columns=years).rename_axis("Country")
+    return df.dropna(how="all").reset_index().melt(id_vars="Country", var_name="Year", value_name="Forecast")
+
+
+# === Rolling-origin backtest ===
+_shared = {}
+
+
+def _init_worker(data):
+    _shared["data"] = data
+
+
+def _backtest_cutoff(cutoff):
+    """Errors of the forecast made at one cut-off, for every later observed year."""
+    data = _shared["data"]
+    years = data["years"]
+    observed_years = years[~np.isnan(data["migration"]).all(axis=0)]
+    targets = observed_years[(observed_years > cutoff) & (observed_years <= cutoff + BACKTEST_HORIZON)]
+    if len(targets) == 0:
+        return None
+
+    pred = fit_predict(data, cutoff, targets)
+    actual = np.expm1(data["migration"][:, np.searchsorted(years, targets)])
+    # naive baseline: the last value observed before the cut-off
+    hist = np.where(years <= cutoff, data["migration"], np.nan)
+    last_idx = np.where(~np.isnan(hist), np.arange(len(years)), -1).max(axis=1)
+    naive = np.expm1(hist[np.arange(len(hist)), np.clip(last_idx, 0, None)])
+    naive[last_idx < 0] = np.nan
+
+    c, t = np.nonzero(~np.isnan(pred) & ~np.isnan(actual))
+    return pd.DataFrame({"Country": data["countries"][c], "Cutoff": cutoff, "Year": targets[t],
+                         "Actual": actual[c, t], "Forecast": pred[c, t], "Naive": naive[c]})
+
+
+def backtest(data=None, jobs=None):
+    """Rolling-origin evaluation, one process per cut-off year.
+
+    Returns (errors, metrics): every scored forecast, and MAE / RMSE / MAPE
+    per country next to the MAPE of the naive last-value forecast.
+    """
+    data = data if data is not None else panel_arrays()
+    observed_years = data["years"][~np.isnan(data["migration"]).all(axis=0)]
+    cutoffs = [int(y) for y in observed_years[MIN_OBS - 1:-1]]
+    print(f"Backtesting {len(cutoffs)} cut-offs: {cutoffs}")
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(jobs, len(cutoffs)) or 1,
+                             initializer=_init_worker, initargs=(data,)) as pool:
+        parts = [p for p in pool.map(_backtest_cutoff, cutoffs) if p is not None]
+    if not parts:
+        raise ValueError(f"Not enough migration years to backtest (need more than {MIN_OBS})")
+    errors = pd.concat(parts, ignore_index=True)
+
+    err = errors["Forecast"] - errors["Actual"]
+    actual = errors["Actual"].where(errors["Actual"] > 0)
+    errors["AbsError"] = err.abs()
+    errors["SqError"] = err ** 2
+    errors["APE"] = err.abs() / actual
+    errors["Naive_APE"] = (errors["Naive"] - errors["Actual"]).abs() / actual
+
+    metrics = errors.groupby("Country").agg(
+        Forecasts=("Forecast", "size"),
+        MAE=("AbsError", "mean"),
+        RMSE=("SqError", lambda s: np.sqrt(s.mean())),
+        MAPE=("APE", "mean"),
+        Naive_MAPE=("Naive_APE", "mean"),
+    ).reset_index()
+    return errors, metrics
+
+
+# === Figures ===
+def plot_global_forecast(data):
+    plt.plot(data["history"].index, data["history"].values, marker="o", label="Observed")
+    plt.plot(data["forecast"].index, data["forecast"].values, marker="o", linestyle="--", label="Forecast")
+    plt.title("Global Migrant Stock: History and Forecast")
+    plt.xlabel("Year")
+    plt.ylabel("Total Migrants")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+
+
+def run_forecasting(jobs=None, write_csv=True):
+    data = panel_arrays()
+    fc = forecast(data)
+    print(f"Forecast: {fc['Country'].nunique()} countries, {FORECAST_YEARS[0]}–{FORECAST_YEARS[-1]}")
+
+    errors, metrics = backtest(data, jobs=jobs)
+    print(f"\nBacktest ({len(errors)} scored forecasts):")
+    print(f"  median MAPE {metrics['MAPE'].median():.3f} vs naive {metrics['Naive_MAPE'].median():.3f}")
+    print(metrics.sort_values("MAPE").head(10).to_string(index=False))
+
+    if write_csv:
+        fc.to_csv(FORECAST_PATH, index=False)
+        metrics.to_csv(BACKTEST_PATH, index=False)
+        print(f"\nForecast saved in {FORECAST_PATH}, backtest metrics in {BACKTEST_PATH}")
+
+    # Totals over the countries that have a forecast
+    history = pd.DataFrame(np.expm1(data["migration"]), index=data["countries"], columns=data["years"])
+    history = history.loc[fc["Country"].unique()].sum(axis=0, min_count=1).dropna()
+    render_plots([
+        plot_job("migration_forecast_global.png", plot_global_forecast,
+                 {"history": history, "forecast": fc.groupby("Year")["Forecast"].sum()}, figsize=(8,5)),
+    ])
+    return fc, metrics
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[sys.argv.index("--jobs") + 1]) if "--jobs" in sys.argv else None
+    run_forecasting(jobs=jobs)
@@ -0,0 +1,170 @@
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from Cache import cached_table
+from Countries import DATA_DIR, DIMENSION_PATH, ALIASES_PATH, load_dimension, resolve, is_country, UNMATCHED
+
+# === Paths ===
+HIERARCHY_PATH = os.path.join(DATA_DIR, "country_hierarchy.csv")
+ROLLUP_VERSION = "1"
+
+# Rollup levels, from the top; development groups sit beside the geography
+LEVELS = ["World", "Region", "Subregion", "Development group", "Country"]
+LEAST_DEVELOPED = "Least developed countries"
+
+
+# === Location hierarchy ===
+@lru_cache(maxsize=1)
+def load_hierarchy():
+    """Country dimension plus M49 subregion/region and UN development group."""
+    hierarchy = pd.read_csv(HIERARCHY_PATH, keep_default_na=False, encoding="utf-8")
+    df = load_dimension().merge(hierarchy, on="iso3", how="left", validate="one_to_one")
+    missing = df.loc[df["region"].isna() | (df["region"] == ""), "iso3"].tolist()
+    if missing:
+        raise ValueError(f"{HIERARCHY_PATH} has no region for: {', '.join(missing)}")
+    df["least_developed"] = df["least_developed"].astype(bool)
+    return df.sort_values("country_id", ignore_index=True)
+
+
+@lru_cache(maxsize=1)
+def locations():
+    """(nodes, membership): every rollup location and which countries it holds.
+
+    nodes has Location, Level and Parent; membership is a sparse
+    (locations x countries) 0/1 matrix, so one product rolls a country
+    table up to every level at once. Countries are their own node.
+    """
+    h = load_hierarchy()
+    n = len(h)
+    ids = h["country_id"].to_numpy()
+    nodes, rows, cols = [], [], []
+
+    def add(location, level, parent, members):
+        rows.extend([len(nodes)] * len(members))
+        cols.extend(members)
+        nodes.append((location, level, parent))
+
+    add("World", "World", "", ids)
+    for region, g in h.groupby("region", sort=True):
+        add(region, "Region", "World", g["country_id"].to_numpy())
+    for (region, subregion), g in h.groupby(["region", "subregion"], sort=True):
+        add(subregion, "Subregion", region, g["country_id"].to_numpy())
+    for group, g in h.groupby("development_group", sort=True):
+        add(group, "Development group", "World", g["country_id"].to_numpy())
+    ldc = h.loc[h["least_developed"], "country_id"].to_numpy()
+    add(LEAST_DEVELOPED, "Development group", "Less developed regions", ldc)
+    for cid, name, subregion in zip(ids, h["name"], h["subregion"]):
+        add(name, "Country", subregion, [cid])
+
+    membership = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(nodes), n))
+    return pd.DataFrame(nodes, columns=["Location", "Level", "Parent"]), membership
+
+
+# === Rollup engine ===
+def rollup(df, value, by=("Year",), country="Country", levels=None):
+    """Sum `value` to every level of the hierarchy in one pass.
+
+    Rows whose `country` is not a country (regions, "World", development
+    groups already present in the source) are ignored and recomputed from
+    the countries, so nothing is counted twice. The country x group table
+    is built once as a sparse matrix and multiplied by the membership
+    matrix. Returns Location, Level, Parent, *by, value, Countries (how many
+    countries reported).
+    """
+    by = list(by)
+    ids = resolve(df[country])
+    keep = ids != UNMATCHED
+    values = pd.to_numeric(df[value], errors="coerce").to_numpy(dtype=float)
+    keep &= ~np.isnan(values)
+    group_codes, groups = pd.MultiIndex.from_frame(df[by]).factorize() if len(by) > 1 else pd.factorize(df[by[0]])
+    keep &= group_codes >= 0
+
+    nodes, membership = locations()
+    shape = (membership.shape[1], len(groups))
+    # duplicates (one row per origin, say) are summed by the COO -> CSR conversion
+    table = sparse.coo_matrix((values[keep], (ids[keep], group_codes[keep])), shape=shape).tocsr()
+    reported = sparse.coo_matrix((np.ones(keep.sum()), (ids[keep], group_codes[keep])), shape=shape).tocsr()
+    reported.data[:] = 1.0
+
+    totals = (membership @ table).toarray()
+    counts = (membership @ reported).toarray()
+
+    node_idx, group_idx = np.nonzero(counts)
+    out = nodes.iloc[node_idx].reset_index(drop=True)
+    group_frame = (groups.to_frame(index=False) if isinstance(groups, pd.MultiIndex)
+                   else pd.DataFrame({by[0]: groups}))
+    out = pd.concat([out, group_frame.iloc[group_idx].reset_index(drop=True)], axis=1)
+    out[value] = totals[node_idx, group_idx]
+    out["Countries"] = counts[node_idx, group_idx].astype(int)
+    if levels is not None:
+        out = out[out["Level"].isin(levels)].reset_index(drop=True)
+    return out
+
+
+def rollup_od(od, year, level="Region"):
+    """Destination x origin stock between the locations of one level (M A M').
+
+    od is an ODMatrix (countries only); its nodes are re-indexed by
+    country_id before the two products.
+    """
+    nodes, membership = locations()
+    ids = resolve(od.countries)
+    keep = np.flatnonzero(ids != UNMATCHED)
+    A = od.matrices[year][keep][:, keep].tocoo()
+    n = membership.shape[1]
+    A = sparse.csr_matrix((A.data, (ids[keep][A.row], ids[keep][A.col])), shape=(n, n))
+
+    pick = np.flatnonzero(nodes["Level"].to_numpy() == level)
+    M = membership[pick]
+    labels = nodes["Location"].to_numpy()[pick]
+    return pd.DataFrame((M @ A @ M.T).toarray(), index=labels, columns=labels).rename_axis(
+        index="Destination", columns="Origin")
+
+
+# === Cached migration rollups ===
+def _build_migration_rollup():
+    from Sources import load_migration
+    df = load_migration()
+    # only country-to-country rows: "World"/regional rows repeat the same migrants
+    df = df[is_country(df["Country"]) & is_country(df["Origin"])]
+    destination = rollup(df, "Migration", by=["Year"], country="Country").assign(Side="Destination")
+    origin = rollup(df, "Migration", by=["Year"], country="Origin").assign(Side="Origin")
+    return pd.concat([destination, origin], ignore_index=True)
+
+
+@lru_cache(maxsize=1)
+def migration_rollup():
+    """Migrant stock by destination and by origin at every level, per year.
+
+    Stored in the source cache and keyed on the raw workbook, the country
+    tables and this file's builder, so regional queries never rescan the
+    origin-level table.
+    """
+    from Sources import MIGRATION_PATH
+    return cached_table("migration_rollup",
+                        [MIGRATION_PATH, DIMENSION_PATH, ALIASES_PATH, HIERARCHY_PATH],
+                        _build_migration_rollup, ROLLUP_VERSION)
+
+
+def migration_totals(level="World", side="Destination", location=None):
+    """Year x location table of migrant stock from the cached rollup."""
+    r = migration_rollup()
+    r = r[(r["Level"] == level) & (r["Side"] == side)]
+    if location is not None:
+        r = r[r["Location"] == location]
+    return r.pivot(index="Year", columns="Location", values="Migration")
+
+
+if __name__ == "__main__":
+    level = sys.argv[1] if len(sys.argv) > 1 else "Region"
+    if level not in LEVELS:
+        sys.exit(f"Unknown level '{level}'. Choices: {', '.join(LEVELS)}")
+    print(f"Migrant stock by {level.lower()} of destination:")
+    print(migration_totals(level).round(0).to_string())
+    print(f"\nMigrant stock by {level.lower()} of origin:")
+    print(migration_totals(level, side="Origin").round(0).to_string())
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+# === Engines ===
+# "openpyxl" streams rows from a read-only workbook and never builds the full
+# sheet. "calamine" (pip install python-calamine) parses with a Rust reader and
+# is several times faster on big workbooks. "auto" prefers calamine.
+ENGINES = ("auto", "openpyxl", "calamine")
+
+
+def _has_calamine():
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pick_sheet(names, sheet):
+    if sheet is None:
+        return names[0]
+    if callable(sheet):
+        matches = [s for s in names if sheet(s)]
+        if not matches:
+            raise ValueError(f"No sheet matches the given rule. Sheets: {names}")
+        return matches[0]
+    if sheet not in names:
+        raise ValueError(f"Sheet '{sheet}' not found. Sheets: {names}")
+    return sheet
+
+
+def _iter_openpyxl(path, sheet):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[_pick_sheet(wb.sheetnames, sheet)]
+        yield ws.title
+        for row in ws.iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def _iter_calamine(path, sheet):
+    from python_calamine import CalamineWorkbook
+
+    wb = CalamineWorkbook.from_path(path)
+    name = _pick_sheet(wb.sheet_names, sheet)
+    ws = wb.get_sheet_by_name(name)
+    yield name
+    rows = ws.iter_rows() if hasattr(ws, "iter_rows") else ws.to_python(skip_empty_area=False)
+    for row in rows:
+        # calamine returns "" for empty cells where openpyxl returns None
+        yield [None if v == "" else v for v in row]
+
+
+def _label(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() if value is not None else ""
+
+
+# === Reader ===
+def read_sheet(path, columns, sheet=None, optional_columns=(), engine="auto",
+               max_header_scan=30, trace_memory=False):
+    """Read only the wanted columns of one worksheet in a single pass.
+
+    The header row is the first row (within max_header_scan) holding every
+    label in `columns`; labels in `optional_columns` are kept when present.
+    When a label repeats (e.g. the male/female year blocks in UN DESA),
+    the first occurrence wins. Returns (DataFrame, report).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from {ENGINES}")
+    if engine == "auto":
+        engine = "calamine" if _has_calamine() else "openpyxl"
+
+    wanted = [str(c).strip() for c in columns]
+    optional = [str(c).strip() for c in optional_columns]
+
+    if trace_memory:
+        # import the reader first so module objects don't count towards the peak
+        __import__("python_calamine" if engine == "calamine" else "openpyxl")
+        tracemalloc.start()
+    start = time.perf_counter()
+
+    rows = _iter_calamine(path, sheet) if engine == "calamine" else _iter_openpyxl(path, sheet)
+    sheet_name = next(rows)
+
+    header_row, picks, data = None, None, None
+    for i, row in enumerate(rows):
+        if picks is None:
+            if i >= max_header_scan:
+                break
+            labels = [_label(v) for v in row]
+            if not all(c in labels for c in wanted):
+                continue
+            header_row = i
+            picks = [(c, labels.index(c)) for c in wanted + [o for o in optional if o in labels]]
+            data = {c: [] for c, _ in picks}
+            continue
+        width = len(row)
+        for c, j in picks:
+            data[c].append(row[j] if j < width else None)
+    rows.close()
+
+    if picks is None:
+        raise ValueError(f"Could not find a header row with {wanted} in '{sheet_name}' of {path}")
+
+    df = pd.DataFrame(data)
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    report = {
+        "path": path,
+        "sheet": sheet_name,
+        "engine": engine,
+        "header_row": header_row,
+        "rows": len(df),
+        "columns": len(df.columns),
+        "seconds": round(seconds, 3),
+        "peak_mb": None if peak_mb is None else round(peak_mb, 1),
+    }
+    return df, report
+
+
+def format_report(report):
+    line = (f"Read '{report['sheet']}' [{report['engine']}]: {report['rows']} rows x "
+            f"{report['columns']} cols in {report['seconds']:.2f}s")
+    if report["peak_mb"] is not None:
+        line += f", peak {report['peak_mb']:.1f} MB"
+    return line
+
+
+# === Compare against a full pandas read ===
+def compare_with_pandas(path, columns, sheet=None, optional_columns=(), engine="auto"):
+    _, report = read_sheet(path, columns, sheet=sheet, optional_columns=optional_columns,
+                           engine=engine, trace_memory=True)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    xls = pd.ExcelFile(path)
+    name = _pick_sheet(xls.sheet_names, sheet)
+    pd.read_excel(xls, sheet_name=name, header=None)
+    baseline = {"seconds": round(time.perf_counter() - start, 3),
+                "peak_mb": round(tracemalloc.get_traced_memory()[1] / 1e6, 1)}
+    tracemalloc.stop()
+    return report, baseline
+
+
+if __name__ == "__main__":
+    # python Ingestion.py <workbook> [engine]
+    from Sources import MIGRATION_PATH, HDI_PATH, MIGRATION_COLUMNS, HDI_COLUMNS, MIGRATION_SHEET, HDI_SHEET
+
+    path = sys.argv[1] if len(sys.argv) > 1 else MIGRATION_PATH
+    engine = sys.argv[2] if len(sys.argv) > 2 else "auto"
+    if os.path.basename(path) == os.path.basename(HDI_PATH):
+        columns, sheet, optional = HDI_COLUMNS, HDI_SHEET, [str(y) for y in range(1990, 2024)]
+    else:
+        columns, sheet, optional = MIGRATION_COLUMNS, MIGRATION_SHEET, ()
+
+    report, baseline = compare_with_pandas(path, columns, sheet=sheet, optional_columns=optional, engine=engine)
+    print(format_report(report))
+    print(f"pandas.read_excel (full sheet): {baseline['seconds']:.2f}s, peak {baseline['peak_mb']:.1f} MB")
+    print(f"Speed-up: {baseline['seconds'] / max(report['seconds'], 1e-9):.1f}x, "
+          f"memory: {baseline['peak_mb'] / max(report['peak_mb'], 1e-9):.1f}x less")
@@ -0,0 +1,39 @@
+import importlib
+import sys
+import time
+
+# module name -> seconds its first import took, for Cli.py --timings
+IMPORT_SECONDS = {}
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Lets scripts keep `plt.title(...)`, `sns.lineplot(...)` and friends at
+    module level while matplotlib, seaborn, sklearn or statsmodels load
+    only once a figure is drawn or a model is fitted.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            fresh = self._name not in sys.modules
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            if fresh:
+                IMPORT_SECONDS[self._name] = time.perf_counter() - start
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
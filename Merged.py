@@ -1,104 +1,188 @@
-import pandas as pd
 import os
+import sys
+
+import pandas as pd
+
+from Countries import resolve, is_country, load_dimension, unmatched_report, UNMATCHED
+from Sources import load_migration, load_gdp, load_urbanization, load_hdi
+from Storage import arrow_path, read_table, write_table
+from Telemetry import run, stage
 
 # === Paths ===
-DATA_DIR = "data"
 OUTPUT_DIR = "processed"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# === Load Migration Data ===
-print("Loading Migration Data...")
-migration_path = os.path.join(DATA_DIR, "undesa_pd_2024_ims_stock_by_sex_destination_and_origin.xlsx")
-xls = pd.ExcelFile(migration_path)
-migration_df = pd.read_excel(xls, sheet_name="Table 1", header=10)
-
-migration_df = migration_df[['Region, development group, country or area of destination',
-                             'Region, development group, country or area of origin',
-                             1990, 1995, 2000, 2005, 2010, 2015, 2020, 2024]]
-
-migration_df.columns = ['Destination', 'Origin', '1990', '1995', '2000', '2005', '2010', '2015', '2020', '2024']
-migration_df = migration_df.rename(columns={'Destination': 'Country'})
-migration_df = migration_df.drop(columns=['Origin'])
-
-# Convert to long format
-migration_long = migration_df.melt(id_vars=['Country'], var_name='Year', value_name='Migration')
-migration_long['Year'] = pd.to_numeric(migration_long['Year'])
-print(f"Migration data shape: {migration_long.shape}")
-
-# === Load GDP Data ===
-print("Loading GDP Data...")
-gdp_path = os.path.join(DATA_DIR, "API_NY.GDP.PCAP.CD_DS2_en_csv_v2_24794.csv")
-gdp_df = pd.read_csv(gdp_path, skiprows=4)
-gdp_df = gdp_df.drop(columns=["Indicator Name", "Indicator Code"], errors="ignore")
-gdp_df = gdp_df.melt(id_vars=["Country Name", "Country Code"], var_name="Year", value_name="GDP_per_capita")
-gdp_df["Year"] = pd.to_numeric(gdp_df["Year"], errors="coerce")
-gdp_df = gdp_df.dropna(subset=["GDP_per_capita", "Year"])
-gdp_df = gdp_df.rename(columns={"Country Name": "Country"})
-print(f"GDP data shape: {gdp_df.shape}")
-
-# === Load Urbanization Data ===
-print("Loading Urbanization Data...")
-urb_path = os.path.join(DATA_DIR, "API_SP.URB.TOTL.IN.ZS_DS2_en_csv_v2_129596.csv")
-urb_df = pd.read_csv(urb_path, skiprows=4)
-urb_df = urb_df.drop(columns=["Indicator Name", "Indicator Code"], errors="ignore")
-urb_df = urb_df.melt(id_vars=["Country Name", "Country Code"], var_name="Year", value_name="Urbanization")
-urb_df["Year"] = pd.to_numeric(urb_df["Year"], errors="coerce")
-urb_df = urb_df.dropna(subset=["Urbanization", "Year"])
-urb_df = urb_df.rename(columns={"Country Name": "Country"})
-print(f"Urbanization data shape: {urb_df.shape}")
-
-# === Load HDI Data ===
-print("Loading HDI Data...")
-hdi_path = os.path.join(DATA_DIR, "HDR25_Statistical_Annex_HDI_Trends_Table.xlsx")
-xls = pd.ExcelFile(hdi_path)
-sheet_name = [s for s in xls.sheet_names if "HDI" in s or "Table 2" in s][0]
-hdi_df = pd.read_excel(hdi_path, sheet_name=sheet_name, header=None)
-
-header_row = None
-for i in range(10):
-    if "Country" in hdi_df.iloc[i].astype(str).values:
-        header_row = i
-        break
-
-hdi_df = pd.read_excel(hdi_path, sheet_name=sheet_name, header=header_row)
-hdi_df.columns = hdi_df.columns.map(str)
-country_col = [c for c in hdi_df.columns if "Country" in c][0]
-
-years = [str(y) for y in range(1990, 2024) if str(y) in hdi_df.columns]
-hdi_df = hdi_df[[country_col] + years]
-hdi_df = hdi_df.rename(columns={country_col: "Country"})
-hdi_df = hdi_df.melt(id_vars=["Country"], var_name="Year", value_name="HDI")
-hdi_df["Year"] = pd.to_numeric(hdi_df["Year"], errors="coerce")
-hdi_df = hdi_df.dropna(subset=["HDI"])
-print(f"HDI data shape: {hdi_df.shape}")
-
-# === Clean Country Names ===
-def clean_country_name(name):
-    if isinstance(name, str):
-        return name.strip().replace("*", "").replace("...", "")
-    return name
-
-for df in [migration_long, gdp_df, hdi_df, urb_df]:
-    df["Country"] = df["Country"].apply(clean_country_name)
-
-# === Merge datasets ===
-print("Merging datasets...")
-merged_df = migration_long.merge(gdp_df, on=["Country", "Year"], how="inner")
-merged_df = merged_df.merge(hdi_df, on=["Country", "Year"], how="inner")
-merged_df = merged_df.merge(urb_df, on=["Country", "Year"], how="inner")
-
-print(f"Merged data shape: {merged_df.shape}")
-
-# === Remove missing ===
-missing_before = merged_df.isna().sum().sum()
-merged_df = merged_df.dropna(subset=["Migration", "GDP_per_capita", "HDI", "Urbanization"])
-missing_after = merged_df.isna().sum().sum()
-print(f"Missing removed: {missing_before - missing_after}")
-
-# === Save final merged file ===
-output_file = os.path.join(OUTPUT_DIR, "merged_global_migration_data.csv")
-merged_df.to_csv(output_file, index=False)
-print(f"Merged dataset saved at: {output_file}")
-
-print("\nSample:")
-print(merged_df.head())
+MERGED_PATH = os.path.join(OUTPUT_DIR, "merged_global_migration_data.csv")
+# Columnar copy (dictionary-encoded Country, int16 Year, float32 HDI/urbanization)
+MERGED_ARROW = arrow_path(MERGED_PATH)
+# Per-country means (Modeling.py's input), kept up to date by Refresh.py
+COUNTRY_MEANS_ARROW = os.path.join(OUTPUT_DIR, "country_means.arrow")
+
+VALUE_COLUMNS = ["Migration", "GDP_per_capita", "HDI", "Urbanization"]
+
+
+def to_keys(df, value):
+    keyed = df[["Year", value]].assign(country_id=resolve(df["Country"]))
+    return keyed[keyed["country_id"] != UNMATCHED]
+
+
+def build_merged(write_csv=True, write_origins=False):
+    """Load, clean and join all sources; returns the country-year table.
+
+    The returned frame is already typed (numeric indicators, int Year) and
+    free of missing values, so later stages can use it as-is. Writing the
+    CSV is only needed when another process will read it.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # === Load Migration Data ===
+    print("Loading Migration Data...")
+    with stage("load_migration") as s:
+        migration_long = load_migration()
+        s["rows_out"] = len(migration_long)
+    print(f"Migration data shape: {migration_long.shape}")
+
+    # === Load GDP Data ===
+    print("Loading GDP Data...")
+    with stage("load_gdp") as s:
+        gdp_df = load_gdp().drop(columns=["Country Code"])
+        s["rows_out"] = len(gdp_df)
+    print(f"GDP data shape: {gdp_df.shape}")
+
+    # === Load Urbanization Data ===
+    print("Loading Urbanization Data...")
+    with stage("load_urbanization") as s:
+        urb_df = load_urbanization().drop(columns=["Country Code"])
+        s["rows_out"] = len(urb_df)
+    print(f"Urbanization data shape: {urb_df.shape}")
+
+    # === Load HDI Data ===
+    # Country names are cleaned once when the source tables are built and cached
+    print("Loading HDI Data...")
+    with stage("load_hdi") as s:
+        hdi_df = load_hdi()
+        s["rows_out"] = len(hdi_df)
+    print(f"HDI data shape: {hdi_df.shape}")
+
+    # === Resolve country names to integer ids ===
+    # Every source spells some countries differently ("Viet Nam" / "Vietnam",
+    # "Korea, Rep." / "Korea (Republic of)"), so map all of them onto the
+    # country dimension and join on (country_id, Year) integers instead of names.
+    print("Resolving country names...")
+    with stage("resolve_names") as s:
+        unmatched = unmatched_report({
+            "migration": migration_long["Country"],
+            "gdp": gdp_df["Country"],
+            "hdi": hdi_df["Country"],
+            "urbanization": urb_df["Country"],
+        })
+        s["rows_out"] = len(unmatched)
+    unmatched_file = os.path.join(OUTPUT_DIR, "unmatched_country_names.csv")
+    unmatched.to_csv(unmatched_file, index=False)
+    n_countries = (~unmatched["Likely_aggregate"]).sum()
+    print(f"Unmatched names: {len(unmatched)} ({n_countries} not aggregates) -> {unmatched_file}")
+
+    # One row per destination/origin pair would repeat every GDP/HDI/urbanization
+    # value once per origin after the join, so sum to a country-year fact table first.
+    # Only country origins are summed: the "World" and regional origin rows hold
+    # the same migrants again.
+    with stage("aggregate_migration", rows_in=len(migration_long)) as s:
+        country_origins = migration_long[is_country(migration_long["Origin"])]
+        migration_cy = (to_keys(country_origins, "Migration")
+                        .groupby(["country_id", "Year"], as_index=False)["Migration"].sum(min_count=1))
+        s["rows_out"] = len(migration_cy)
+    print(f"Migration country-year table: {migration_cy.shape}")
+
+    # === Merge datasets ===
+    print("Merging datasets...")
+    with stage("merge", rows_in=len(migration_cy)) as s:
+        merged_df = migration_cy.merge(to_keys(gdp_df, "GDP_per_capita"), on=["country_id", "Year"], how="inner")
+        merged_df = merged_df.merge(to_keys(hdi_df, "HDI"), on=["country_id", "Year"], how="inner")
+        merged_df = merged_df.merge(to_keys(urb_df, "Urbanization"), on=["country_id", "Year"], how="inner")
+
+        # Canonical name and ISO3 code from the country dimension
+        dimension = load_dimension().set_index("country_id")
+        merged_df.insert(0, "Country", dimension["name"].reindex(merged_df["country_id"]).to_numpy())
+        merged_df.insert(4, "Country Code", dimension["iso3"].reindex(merged_df["country_id"]).to_numpy())
+        merged_df = merged_df.drop(columns=["country_id"]).sort_values(["Country", "Year"], ignore_index=True)
+        s["rows_out"] = len(merged_df)
+
+    print(f"Merged data shape: {merged_df.shape}")
+
+    # === Remove missing ===
+    with stage("clean", rows_in=len(merged_df)) as s:
+        missing_before = merged_df.isna().sum().sum()
+        merged_df = merged_df.dropna(subset=VALUE_COLUMNS).reset_index(drop=True)
+        missing_after = merged_df.isna().sum().sum()
+        s["rows_out"] = len(merged_df)
+    print(f"Missing removed: {missing_before - missing_after}")
+
+    # === Save final merged file ===
+    # The CSV stays for people; later stages read the Arrow file
+    if write_csv:
+        with stage("write", rows_in=len(merged_df)):
+            merged_df.to_csv(MERGED_PATH, index=False)
+            write_table(merged_df, MERGED_ARROW)
+        print(f"Merged dataset saved at: {MERGED_PATH} and {MERGED_ARROW}")
+
+    # === Optional origin breakdown (destination, origin, year) ===
+    if write_origins:
+        origin_file = os.path.join(OUTPUT_DIR, "migration_origin_breakdown.csv")
+        migration_long.dropna(subset=["Migration"]).to_csv(origin_file, index=False)
+        print(f"Origin breakdown saved at: {origin_file}")
+
+    return merged_df
+
+
+def load_merged(path=None, columns=None, years=None, countries=None):
+    """Read the merged table written by another process.
+
+    The Arrow file is preferred: it is memory-mapped, only the requested
+    columns are read, and a years filter skips whole record batches.
+    Country comes back as a categorical. Without it (or when the CSV is
+    newer) the CSV is parsed and its types restored.
+    """
+    if path is None:
+        # a CSV written after the Arrow file (by hand, say) wins
+        fresh = (os.path.exists(MERGED_ARROW) and
+                 (not os.path.exists(MERGED_PATH) or os.path.getmtime(MERGED_ARROW) >= os.path.getmtime(MERGED_PATH)))
+        path = MERGED_ARROW if fresh else MERGED_PATH
+    if path.endswith(".arrow"):
+        df = read_table(path, columns=columns, years=years, countries=countries)
+        print(f"Loaded merged dataset: {df.shape[0]} rows ({path})")
+        return df
+
+    df = pd.read_csv(path, usecols=columns)
+    print(f"Loaded merged dataset: {df.shape[0]} rows")
+    if years is not None:
+        df = df[df["Year"].isin(pd.Series(years).astype(int))]
+    if countries is not None:
+        df = df[df["Country"].isin(pd.Series(countries))]
+
+    # --- Force numeric conversion ---
+    values = [c for c in VALUE_COLUMNS if c in df.columns]
+    for col in values:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # --- Drop rows with missing or invalid values ---
+    df = df.dropna(subset=values)
+    print(f"After cleaning: {df.shape[0]} rows remain")
+    return df
+
+
+def load_country_means():
+    """The per-country means written by Refresh.py, or None when they are
+    missing or older than the merged table."""
+    if not (os.path.exists(COUNTRY_MEANS_ARROW) and os.path.exists(MERGED_ARROW)):
+        return None
+    if os.path.getmtime(COUNTRY_MEANS_ARROW) < os.path.getmtime(MERGED_ARROW):
+        return None
+    return read_table(COUNTRY_MEANS_ARROW)
+
+
+if __name__ == "__main__":
+    # Pass --origins to also write the destination/origin breakdown
+    # Pass --telemetry (or set GMP_TELEMETRY=1) for a per-stage time/memory report
+    with run("merge"):
+        merged_df = build_merged(write_origins="--origins" in sys.argv)
+
+    print("\nSample:")
+    print(merged_df.head())
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from Lazy import lazy_import
+
+joblib = lazy_import("joblib")
+
+# === Paths ===
+MODELS_DIR = os.path.join("processed", "models")
+LATEST_PATH = os.path.join(MODELS_DIR, "latest.json")
+
+# Bump when the way models are trained changes without the data changing
+ARTIFACT_VERSION = "1"
+
+
+# === Keys ===
+def data_hash(*frames, params=None):
+    """Hash of the training data (values, columns, index) plus model parameters."""
+    h = hashlib.sha256(ARTIFACT_VERSION.encode())
+    for frame in frames:
+        obj = frame if isinstance(frame, (pd.DataFrame, pd.Series)) else pd.DataFrame(frame)
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:16]
+
+
+def artifact_dir(key):
+    return os.path.join(MODELS_DIR, key)
+
+
+# === Fitted models ===
+def load_models(key, names):
+    """The fitted models saved under key, or None if any is missing."""
+    paths = {n: os.path.join(artifact_dir(key), f"{n}.joblib") for n in names}
+    if not all(os.path.exists(p) for p in paths.values()):
+        return None
+    return {n: joblib.load(p) for n, p in paths.items()}
+
+
+def save_models(key, models, meta=None):
+    os.makedirs(artifact_dir(key), exist_ok=True)
+    for name, model in models.items():
+        joblib.dump(model, os.path.join(artifact_dir(key), f"{name}.joblib"))
+    import sklearn
+    info = {"key": key, "version": ARTIFACT_VERSION, "sklearn": sklearn.__version__,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"), "models": sorted(models)}
+    info.update(meta or {})
+    with open(os.path.join(artifact_dir(key), "meta.json"), "w") as f:
+        json.dump(info, f, indent=2, default=str)
+
+
+# === Result tables (importances, cluster summaries) ===
+def save_table(key, name, df):
+    os.makedirs(artifact_dir(key), exist_ok=True)
+    df.to_csv(os.path.join(artifact_dir(key), f"{name}.csv"), index=False)
+
+
+def has_table(key, name):
+    return os.path.exists(os.path.join(artifact_dir(key), f"{name}.csv"))
+
+
+def load_table(key, name):
+    return pd.read_csv(os.path.join(artifact_dir(key), f"{name}.csv"))
+
+
+def mark_latest(key):
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    with open(LATEST_PATH, "w") as f:
+        json.dump({"key": key}, f)
+
+
+def latest_key():
+    if not os.path.exists(LATEST_PATH):
+        raise FileNotFoundError(f"No model artifacts in {MODELS_DIR}. Run Modeling.py first.")
+    with open(LATEST_PATH) as f:
+        return json.load(f)["key"]
@@ -1,214 +1,354 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 import os
-from sklearn.cluster import KMeans, AgglomerativeClustering
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor, GradientBoostingRegressor
-import statsmodels.api as sm
-from scipy.cluster.hierarchy import dendrogram, linkage
-from sklearn.metrics import silhouette_score
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from Lazy import lazy_import
+from Bootstrap import bootstrap_ols, confidence_table
+from Clustering import cluster_rows, plot_truncated_dendrogram
+from Explain import cached_explanations, plot_permutation_importance, plot_partial_dependence
+from Merged import load_country_means, load_merged
+from PanelRegression import fit_fixed_effects, format_result
+from ModelStore import data_hash, load_models, save_models, save_table, mark_latest
+from Plotting import draw_scatter, plot_job, render_plots, scatter_data
+from Storage import arrow_path, write_table
+from Telemetry import run, stage
+
+# Heavy libraries load on first use, so importing this module stays cheap
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+sm = lazy_import("statsmodels.api")
+hierarchy = lazy_import("scipy.cluster.hierarchy")
+sk_cluster = lazy_import("sklearn.cluster")
+sk_ensemble = lazy_import("sklearn.ensemble")
+sk_metrics = lazy_import("sklearn.metrics")
+sk_preprocessing = lazy_import("sklearn.preprocessing")
 
 # === Paths ===
-DATA_PATH = "processed/merged_global_migration_data.csv"
 PLOTS_DIR = "plots"
-os.makedirs(PLOTS_DIR, exist_ok=True)
-
-# === Load Cleaned Data ===
-df = pd.read_csv(DATA_PATH)
-print(f"Loaded merged dataset: {df.shape[0]} rows")
-
-# Convert to numeric and drop missing
-for col in ["Migration", "GDP_per_capita", "HDI", "Urbanization"]:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-df = df.dropna(subset=["Migration", "GDP_per_capita", "HDI", "Urbanization"])
-
-# === Aggregate Data (Average per Country) ===
-df_country = df.groupby("Country", as_index=False).agg({
-    "Migration": "mean",
-    "GDP_per_capita": "mean",
-    "HDI": "mean",
-    "Urbanization": "mean"
-})
-print(f"Aggregated dataset: {df_country.shape[0]} countries")
-
-
-# ======================================================
-# 1. OLS REGRESSION (CLASSICAL STATISTICAL ANALYSIS)
-# ======================================================
-print("\nRunning OLS Regression...")
-
-X = df_country[["GDP_per_capita", "HDI", "Urbanization"]]
-y = df_country["Migration"]
-
-X = sm.add_constant(X)
-ols_model = sm.OLS(y, X).fit()
-print(ols_model.summary())
-
-# === Regression Plots ===
-sns.regplot(x="GDP_per_capita", y="Migration", data=df_country, scatter_kws={'alpha':0.6})
-plt.title("Regression: Migration vs GDP per Capita")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "regression_migration_gdp.png"))
-plt.close()
-
-sns.regplot(x="HDI", y="Migration", data=df_country, scatter_kws={'alpha':0.6})
-plt.title("Regression: Migration vs HDI")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "regression_migration_hdi.png"))
-plt.close()
-
-sns.regplot(x="Urbanization", y="Migration", data=df_country, scatter_kws={'alpha':0.6})
-plt.title("Regression: Migration vs Urbanization")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "regression_migration_urbanization.png"))
-plt.close()
-
-
-# ======================================================
-# 2. RANDOM FOREST FEATURE IMPORTANCE
-# ======================================================
-print("\nRunning Random Forest...")
-
-rf_model = RandomForestRegressor(n_estimators=300, random_state=42)
-rf_model.fit(X[["GDP_per_capita", "HDI", "Urbanization"]], y)
-
-rf_imp = pd.DataFrame({
-    "Feature": ["GDP_per_capita", "HDI", "Urbanization"],
-    "Importance": rf_model.feature_importances_
-})
-print("\nRandom Forest – Feature Importance:")
-print(rf_imp.sort_values(by="Importance", ascending=False))
-
-plt.figure(figsize=(6,4))
-sns.barplot(data=rf_imp, x="Feature", y="Importance")
-plt.title("Random Forest Feature Importance")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "rf_feature_importance.png"))
-plt.close()
-
-
-# ======================================================
-# 2B. EXTRA TREES FEATURE IMPORTANCE
-# ======================================================
-print("\nRunning Extra Trees...")
-
-et_model = ExtraTreesRegressor(n_estimators=300, random_state=42)
-et_model.fit(X[["GDP_per_capita", "HDI", "Urbanization"]], y)
-
-et_imp = pd.DataFrame({
-    "Feature": ["GDP_per_capita", "HDI", "Urbanization"],
-    "Importance": et_model.feature_importances_
-})
-print("\nExtra Trees – Feature Importance:")
-print(et_imp.sort_values(by="Importance", ascending=False))
-
-plt.figure(figsize=(6,4))
-sns.barplot(data=et_imp, x="Feature", y="Importance")
-plt.title("Extra Trees Feature Importance")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "extratrees_feature_importance.png"))
-plt.close()
-
-
-# ======================================================
-# 2C. GRADIENT BOOSTING FEATURE IMPORTANCE
-# ======================================================
-print("\nRunning Gradient Boosting...")
-
-gb_model = GradientBoostingRegressor(
-    n_estimators=300,
-    learning_rate=0.05,
-    max_depth=3,
-    random_state=42
-)
-gb_model.fit(X[["GDP_per_capita", "HDI", "Urbanization"]], y)
-
-gb_imp = pd.DataFrame({
-    "Feature": ["GDP_per_capita", "HDI", "Urbanization"],
-    "Importance": gb_model.feature_importances_
-})
-print("\nGradient Boosting – Feature Importance:")
-print(gb_imp.sort_values(by="Importance", ascending=False))
-
-plt.figure(figsize=(6,4))
-sns.barplot(data=gb_imp, x="Feature", y="Importance")
-plt.title("Gradient Boosting Feature Importance")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "gradientboosting_feature_importance.png"))
-plt.close()
-
-
-# ======================================================
-# 3. K-MEANS CLUSTERING
-# ======================================================
-print("\nRunning K-Means Clustering...")
-
-features = df_country[["Migration", "GDP_per_capita", "HDI", "Urbanization"]]
-scaler = StandardScaler()
-scaled = scaler.fit_transform(features)
-
-kmeans = KMeans(n_clusters=3, random_state=42)
-df_country["KMeans_Cluster"] = kmeans.fit_predict(scaled)
-
-silhouette = silhouette_score(scaled, df_country["KMeans_Cluster"])
-print("\nK-Means Silhouette Score:", silhouette)
-
-print("\nCluster Means:")
-print(df_country.groupby("KMeans_Cluster")[["Migration", "GDP_per_capita", "HDI", "Urbanization"]].mean())
-
-# Visualization
-plt.figure(figsize=(7,5))
-sns.scatterplot(x="GDP_per_capita", y="Migration", hue="KMeans_Cluster",
-                data=df_country, s=60, palette="viridis")
-plt.title("K-Means Clusters: GDP vs Migration")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "kmeans_clusters_gdp_migration.png"))
-plt.close()
-
-plt.figure(figsize=(7,5))
-sns.scatterplot(x="Urbanization", y="Migration", hue="KMeans_Cluster",
-                data=df_country, s=60, palette="viridis")
-plt.title("K-Means Clusters: Urbanization vs Migration")
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "kmeans_clusters_urbanization_migration.png"))
-plt.close()
-
-
-# ======================================================
-# 4. HIERARCHICAL CLUSTERING
-# ======================================================
-print("\nRunning Hierarchical Clustering...")
-
-linked = linkage(scaled, method='ward')
-
-plt.figure(figsize=(26, 10))
-dendrogram(linked,
-           labels=df_country["Country"].values,
-           leaf_rotation=90,
-           leaf_font_size=13)
-plt.title("Hierarchical Clustering Dendrogram (Ward)", fontsize=16)
-plt.xlabel("Countries", fontsize=14)
-plt.ylabel("Distance", fontsize=14)
-
-plt.tight_layout()
-plt.savefig(os.path.join(PLOTS_DIR, "hierarchical_dendrogram.png"))
-plt.close()
-
-hc = AgglomerativeClustering(n_clusters=3, linkage='ward')
-df_country["HierCluster"] = hc.fit_predict(scaled)
-
-print("\nHierarchical Cluster Means:")
-print(df_country.groupby("HierCluster")[["Migration", "GDP_per_capita", "HDI", "Urbanization"]].mean())
-
-
-
-# ======================================================
-# SAVE RESULTS
-# ======================================================
-df_country.to_csv("processed/model_results_country_level.csv", index=False)
-
-print("\nAll Modeling Complete!")
-print("Plots saved in 'plots/' folder.")
-print("Model results saved in processed/model_results_country_level.csv")
+RESULTS_PATH = "processed/model_results_country_level.csv"
+RESULTS_ARROW = arrow_path(RESULTS_PATH)
+PANEL_RESULTS_PATH = "processed/model_results_country_year.csv"
+OLS_BOOTSTRAP_PATH = "processed/ols_bootstrap_ci.csv"
+PANEL_FE_PATH = "processed/panel_fixed_effects.csv"
+
+BOOTSTRAP_REPLICATES = 10000
+
+FEATURES = ["GDP_per_capita", "HDI", "Urbanization"]
+CLUSTER_COLUMNS = ["Migration", "GDP_per_capita", "HDI", "Urbanization"]
+
+# name: (sklearn.ensemble estimator, parameters, label, importance plot)
+# RF and Extra Trees build their trees on all cores (n_jobs=-1); boosting is
+# sequential by nature, so it runs alongside them in its own thread.
+ENSEMBLES = {
+    "random_forest": ("RandomForestRegressor",
+                      dict(n_estimators=300, random_state=42, n_jobs=-1),
+                      "Random Forest", "rf_feature_importance.png"),
+    "extra_trees": ("ExtraTreesRegressor",
+                    dict(n_estimators=300, random_state=42, n_jobs=-1),
+                    "Extra Trees", "extratrees_feature_importance.png"),
+    "gradient_boosting": ("GradientBoostingRegressor",
+                          dict(n_estimators=300, learning_rate=0.05, max_depth=3, random_state=42),
+                          "Gradient Boosting", "gradientboosting_feature_importance.png"),
+}
+
+
+def make_estimator(name, **params):
+    """Unfitted ENSEMBLES[name] estimator; params override the defaults."""
+    est, base, _, _ = ENSEMBLES[name]
+    return getattr(sk_ensemble, est)(**dict(base, **params))
+
+
+def fit_ensembles(X, y, key):
+    """Fitted ENSEMBLES for (X, y): loaded from processed/models/<key>/ if
+    present, otherwise trained concurrently and saved there."""
+    models = load_models(key, ENSEMBLES)
+    if models is not None:
+        print(f"\nLoaded fitted ensembles from model store ({key})")
+        return models
+
+    print("\nTraining Random Forest, Extra Trees and Gradient Boosting concurrently...")
+    # sklearn's tree building releases the GIL, so threads overlap the fits
+    # without copying X/y into worker processes
+    with ThreadPoolExecutor(max_workers=len(ENSEMBLES)) as pool:
+        futures = {name: pool.submit(make_estimator(name).fit, X, y) for name in ENSEMBLES}
+        models = {name: f.result() for name, f in futures.items()}
+
+    save_models(key, models, meta={"features": list(X.columns), "rows": len(X)})
+    return models
+
+
+def country_means(df):
+    # Country is categorical when read from the Arrow file
+    return df.groupby("Country", as_index=False, observed=True).agg({
+        "Migration": "mean",
+        "GDP_per_capita": "mean",
+        "HDI": "mean",
+        "Urbanization": "mean"
+    })
+
+
+# === Figures ===
+def plot_regression(data, title):
+    # closed-form fit line and band; points become a density image for many countries
+    draw_scatter(data)
+    plt.title(title)
+    plt.tight_layout()
+
+
+def plot_importance(imp, title):
+    sns.barplot(data=imp, x="Feature", y="Importance")
+    plt.title(title)
+    plt.tight_layout()
+
+
+def plot_clusters(df_country, x, title):
+    sns.scatterplot(x=x, y="Migration", hue="KMeans_Cluster",
+                    data=df_country, s=60, palette="viridis")
+    plt.title(title)
+    plt.tight_layout()
+
+
+def plot_dendrogram(data):
+    hierarchy.dendrogram(data["linked"],
+                         labels=data["labels"],
+                         leaf_rotation=90,
+                         leaf_font_size=13)
+    plt.title("Hierarchical Clustering Dendrogram (Ward)", fontsize=16)
+    plt.xlabel("Countries", fontsize=14)
+    plt.ylabel("Distance", fontsize=14)
+
+    plt.tight_layout()
+
+
+def run_modeling(df=None, write_csv=True, panel=False):
+    """Regression, tree ensembles and clustering on the country-level means.
+
+    Pass the DataFrame from build_merged() to skip re-reading the CSV.
+    With panel=True the country-year rows are also clustered, using the
+    bounded-memory methods from Clustering.py.
+    Returns the country table with cluster labels.
+    """
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+
+    # === Load Cleaned Data ===
+    stored_means = None
+    if df is None:
+        with stage("load") as s:
+            df = load_merged(columns=["Country", "Year"] + FEATURES + ["Migration"])
+            # kept current by Refresh.py, which recomputes only the revised countries
+            stored_means = load_country_means()
+            s["rows_out"] = len(df)
+
+    # Figures are collected here and rendered together at the end
+    jobs = []
+
+    # === Aggregate Data (Average per Country) ===
+    with stage("aggregate", rows_in=len(df)) as s:
+        df_country = stored_means if stored_means is not None else country_means(df)
+        s["rows_out"] = len(df_country)
+    print(f"Aggregated dataset: {df_country.shape[0]} countries")
+
+
+    # ======================================================
+    # 1. OLS REGRESSION (CLASSICAL STATISTICAL ANALYSIS)
+    # ======================================================
+    print("\nRunning OLS Regression...")
+
+    X = df_country[["GDP_per_capita", "HDI", "Urbanization"]]
+    y = df_country["Migration"]
+
+    X = sm.add_constant(X)
+    with stage("fit_ols", rows_in=len(X)):
+        ols_model = sm.OLS(y, X).fit()
+    print(ols_model.summary())
+
+    # === Bootstrap confidence intervals (coefficients, R², fitted values) ===
+    # All resamples are solved as one batched least-squares problem per chunk
+    print(f"\nBootstrapping OLS ({BOOTSTRAP_REPLICATES} resamples)...")
+    with stage("bootstrap_ols", rows_in=len(X)):
+        boot = bootstrap_ols(X[FEATURES], y, replicates=BOOTSTRAP_REPLICATES, x_new=X[FEATURES])
+    ols_ci = confidence_table(np.column_stack([boot["coef"], boot["r2"]]), ["const"] + FEATURES + ["R2"],
+                              estimate=np.append(ols_model.params.to_numpy(), ols_model.rsquared))
+    print(ols_ci.to_string(index=False))
+
+    df_country["OLS_Fitted"] = ols_model.fittedvalues.to_numpy()
+    df_country["OLS_Fitted_low"], df_country["OLS_Fitted_high"] = np.quantile(boot["pred"], [0.025, 0.975], axis=0)
+    if write_csv:
+        ols_ci.to_csv(OLS_BOOTSTRAP_PATH, index=False)
+
+    # === Fixed-effects panel regression (country-year rows) ===
+    # Averaging per country drops the time dimension; here country and year
+    # effects are absorbed by demeaning and errors are clustered by country.
+    print("\nRunning two-way fixed-effects panel regression...")
+    with stage("fit_fixed_effects", rows_in=len(df)) as s:
+        fe_result = fit_fixed_effects(df, "Migration", FEATURES, fixed_effects=("Country", "Year"), cluster="Country")
+        s["rows_out"] = fe_result.nobs
+    print(format_result(fe_result))
+    if write_csv:
+        fe_result.table.to_csv(PANEL_FE_PATH, index=False)
+
+    # === Regression Plots ===
+    jobs += [
+        plot_job("regression_migration_gdp.png", plot_regression,
+                 scatter_data(df_country, "GDP_per_capita", "Migration", fit=True),
+                 title="Regression: Migration vs GDP per Capita"),
+        plot_job("regression_migration_hdi.png", plot_regression,
+                 scatter_data(df_country, "HDI", "Migration", fit=True),
+                 title="Regression: Migration vs HDI"),
+        plot_job("regression_migration_urbanization.png", plot_regression,
+                 scatter_data(df_country, "Urbanization", "Migration", fit=True),
+                 title="Regression: Migration vs Urbanization"),
+    ]
+
+
+    # ======================================================
+    # 2. TREE ENSEMBLES: RF / EXTRA TREES / GRADIENT BOOSTING
+    # ======================================================
+    # The three models are trained at the same time (see fit_ensembles) and
+    # stored under a hash of the training data, so a rerun on unchanged data
+    # loads them instead of retraining.
+    X_feat = X[FEATURES]
+    key = data_hash(X_feat, y, params={n: s[1] for n, s in ENSEMBLES.items()})
+    with stage("fit_ensembles", rows_in=len(X_feat)):
+        models = fit_ensembles(X_feat, y, key)
+
+    importances = pd.DataFrame({"Feature": FEATURES})
+    for name, (_, _, label, plot_file) in ENSEMBLES.items():
+        imp = pd.DataFrame({
+            "Feature": FEATURES,
+            "Importance": models[name].feature_importances_
+        })
+        importances[label] = imp["Importance"]
+        print(f"\n{label} – Feature Importance:")
+        print(imp.sort_values(by="Importance", ascending=False))
+
+        jobs.append(plot_job(plot_file, plot_importance, imp,
+                             title=f"{label} Feature Importance", figsize=(6,4)))
+
+    save_table(key, "feature_importance", importances)
+
+    # --- Permutation importance and partial dependence ---
+    # Impurity importances are biased towards high-cardinality features and
+    # disagree between models; these are computed on the predictions instead.
+    print("\nComputing permutation importance and partial dependence...")
+    with stage("explain", rows_in=len(X_feat)):
+        perm_imp, part_dep = cached_explanations(
+            key, {label: models[name] for name, (_, _, label, _) in ENSEMBLES.items()}, X_feat, y)
+    print(perm_imp[["Model", "Feature", "Importance", "Importance_std"]].to_string(index=False))
+    jobs += [
+        plot_job("permutation_importance.png", plot_permutation_importance, perm_imp, figsize=(9,5)),
+        plot_job("partial_dependence.png", plot_partial_dependence, part_dep, figsize=(15,5)),
+    ]
+
+
+    # ======================================================
+    # 3. K-MEANS CLUSTERING
+    # ======================================================
+    print("\nRunning K-Means Clustering...")
+
+    features = df_country[["Migration", "GDP_per_capita", "HDI", "Urbanization"]]
+    scaler = sk_preprocessing.StandardScaler()
+    scaled = scaler.fit_transform(features)
+
+    with stage("kmeans", rows_in=len(scaled)):
+        kmeans = sk_cluster.KMeans(n_clusters=3, random_state=42)
+        df_country["KMeans_Cluster"] = kmeans.fit_predict(scaled)
+        silhouette = sk_metrics.silhouette_score(scaled, df_country["KMeans_Cluster"])
+    print("\nK-Means Silhouette Score:", silhouette)
+
+    kmeans_means = df_country.groupby("KMeans_Cluster")[CLUSTER_COLUMNS].mean()
+    print("\nCluster Means:")
+    print(kmeans_means)
+
+    # Visualization
+    cluster_data = df_country[["GDP_per_capita", "Urbanization", "Migration", "KMeans_Cluster"]]
+    jobs += [
+        plot_job("kmeans_clusters_gdp_migration.png", plot_clusters, cluster_data,
+                 x="GDP_per_capita", title="K-Means Clusters: GDP vs Migration", figsize=(7,5)),
+        plot_job("kmeans_clusters_urbanization_migration.png", plot_clusters, cluster_data,
+                 x="Urbanization", title="K-Means Clusters: Urbanization vs Migration", figsize=(7,5)),
+    ]
+
+
+    # ======================================================
+    # 4. HIERARCHICAL CLUSTERING
+    # ======================================================
+    print("\nRunning Hierarchical Clustering...")
+
+    with stage("hierarchical", rows_in=len(scaled)):
+        linked = hierarchy.linkage(scaled, method='ward')
+        hc = sk_cluster.AgglomerativeClustering(n_clusters=3, linkage='ward')
+        df_country["HierCluster"] = hc.fit_predict(scaled)
+
+    jobs.append(plot_job("hierarchical_dendrogram.png", plot_dendrogram,
+                         {"linked": linked, "labels": df_country["Country"].to_numpy()}, figsize=(26, 10)))
+
+    hier_means = df_country.groupby("HierCluster")[CLUSTER_COLUMNS].mean()
+    print("\nHierarchical Cluster Means:")
+    print(hier_means)
+
+    # --- Cluster summary for Comparison.py ---
+    cluster_means = pd.concat([
+        kmeans_means.set_axis([f"KMeans {c}" for c in kmeans_means.index]),
+        hier_means.set_axis([f"Hier {c}" for c in hier_means.index]),
+    ]).rename_axis("Cluster").reset_index()
+    save_table(key, "cluster_means", cluster_means)
+    mark_latest(key)
+
+
+    # ======================================================
+    # 5. COUNTRY-YEAR CLUSTERING (SCALABLE, OPTIONAL)
+    # ======================================================
+    # Exact Ward linkage and silhouette are O(n^2) in memory, so the
+    # country-year rows use mini-batch k-means, BIRCH + Ward and a sampled
+    # silhouette instead.
+    df_panel = None
+    if panel:
+        print("\nRunning scalable clustering on country-year rows...")
+        df_panel = df[["Country", "Year"] + CLUSTER_COLUMNS].reset_index(drop=True)
+        panel_scaled = sk_preprocessing.StandardScaler().fit_transform(df_panel[CLUSTER_COLUMNS])
+        with stage("panel_clustering", rows_in=len(panel_scaled)):
+            result = cluster_rows(panel_scaled, k=3)
+        df_panel["KMeans_Cluster"] = result["kmeans"]
+        df_panel["HierCluster"] = result["hier"]
+
+        print(f"\nMini-batch K-Means Silhouette (sampled): {result['kmeans_silhouette']}")
+        print(df_panel.groupby("KMeans_Cluster")[CLUSTER_COLUMNS].mean())
+        print(f"\nBIRCH + Ward Silhouette (sampled): {result['hier_silhouette']}")
+        print(df_panel.groupby("HierCluster")[CLUSTER_COLUMNS].mean())
+
+        if result["dendrogram"] is not None:
+            jobs.append(plot_job("hierarchical_dendrogram_country_year.png", plot_truncated_dendrogram,
+                                 result["dendrogram"], figsize=(14, 7)))
+
+
+    # ======================================================
+    # RENDER FIGURES (in parallel, only those whose inputs changed)
+    # ======================================================
+    with stage("plot", rows_in=len(jobs)):
+        render_plots(jobs)
+
+    # ======================================================
+    # SAVE RESULTS
+    # ======================================================
+    if write_csv:
+        with stage("write", rows_in=len(df_country)):
+            df_country.to_csv(RESULTS_PATH, index=False)
+            write_table(df_country, RESULTS_ARROW)
+            if df_panel is not None:
+                df_panel.to_csv(PANEL_RESULTS_PATH, index=False)
+
+    print("\nAll Modeling Complete!")
+    print("Plots saved in 'plots/' folder.")
+    if write_csv:
+        print(f"Model results saved in {RESULTS_PATH}")
+    return df_country
+
+
+if __name__ == "__main__":
+    # Pass --panel to also cluster the country-year rows, --telemetry for a
+    # per-stage time/memory report
+    with run("model"):
+        run_modeling(panel="--panel" in sys.argv)
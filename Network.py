@@ -0,0 +1,200 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Lazy import lazy_import
+from Countries import resolve, load_dimension, UNMATCHED
+from ODMatrix import load_od_matrix
+from Plotting import plot_job, render_plots
+
+plt = lazy_import("matplotlib.pyplot")
+sparse = lazy_import("scipy.sparse")
+sk_metrics = lazy_import("sklearn.metrics")
+
+# === Paths ===
+OUTPUT_DIR = "processed"
+METRICS_PATH = os.path.join(OUTPUT_DIR, "network_metrics.csv")
+SUMMARY_PATH = os.path.join(OUTPUT_DIR, "network_summary.csv")
+
+# === Settings ===
+DAMPING = 0.85
+TOLERANCE = 1e-10
+MAX_ITER = 200
+
+
+# === Graphs ===
+def country_graphs(od):
+    """{year: W} with W[o, d] = migrants born in o living in d, over countries only.
+
+    The UN DESA rows also hold regions and development groups ("World",
+    "Europe", ...); those would be hubs of every graph, so only names that
+    resolve to the country dimension are kept, and self-loops are dropped.
+    """
+    ids = resolve(od.countries)
+    keep = np.flatnonzero(ids != UNMATCHED)
+    names = load_dimension().set_index("country_id")["name"].reindex(ids[keep]).to_numpy()
+    graphs = {}
+    for year, m in od.matrices.items():
+        W = m[keep][:, keep].T.tocsr()
+        W.setdiag(0)
+        W.eliminate_zeros()
+        graphs[year] = W
+    return names, graphs
+
+
+# === Centrality ===
+def pagerank(graphs, damping=DAMPING, tol=TOLERANCE, max_iter=MAX_ITER):
+    """Weighted PageRank of every year at once.
+
+    The yearly graphs are placed on the diagonal of one block matrix, so a
+    single sparse mat-vec per iteration advances all years together.
+    Rank flows along migration (origin -> destination). Returns {year: ranks}.
+    """
+    years = sorted(graphs)
+    n = graphs[years[0]].shape[0]
+    block = sparse.block_diag([graphs[y] for y in years], format="csr")
+    out = np.asarray(block.sum(axis=1)).ravel()
+    dangling = out == 0
+    inv_out = np.divide(1.0, out, out=np.zeros_like(out), where=~dangling)
+    transition_t = (sparse.diags(inv_out) @ block).T.tocsr()
+    block_id = np.repeat(np.arange(len(years)), n)
+
+    r = np.full(len(years) * n, 1.0 / n)
+    for _ in range(max_iter):
+        # mass of dangling nodes (no emigrants recorded) is spread over their year
+        leaked = np.bincount(block_id, weights=r * dangling, minlength=len(years))
+        r_new = damping * (transition_t @ r) + (damping * leaked[block_id] + 1 - damping) / n
+        if np.abs(r_new - r).sum() < tol * len(years):
+            r = r_new
+            break
+        r = r_new
+    return {y: r[k * n:(k + 1) * n] for k, y in enumerate(years)}
+
+
+# === Reciprocity ===
+def reciprocity(W):
+    """(weighted, binary): share of stock / of corridors matched in the reverse direction."""
+    total = W.sum()
+    weighted = W.minimum(W.T).sum() / total if total else np.nan
+    binary = (W > 0).multiply(W.T > 0).sum() / W.nnz if W.nnz else np.nan
+    return float(weighted), float(binary)
+
+
+# === Communities ===
+def label_propagation(W, max_iter=100, random_state=42):
+    """Weighted label propagation on the undirected graph W + W'.
+
+    Each round every node takes the label with the most neighbouring weight,
+    computed for all nodes at once as S @ one_hot(labels). A self-loop as
+    heavy as the node's strongest tie keeps labels from oscillating.
+    """
+    S = (W + W.T).tocsr()
+    n = S.shape[0]
+    strongest = np.asarray(S.max(axis=1).todense()).ravel()
+    S = S + sparse.diags(strongest)
+    # a tiny per-label jitter breaks ties reproducibly
+    rng = np.random.default_rng(random_state)
+    jitter = sparse.diags(1 + rng.uniform(0, 1e-9, n))
+
+    labels = np.arange(n)
+    for _ in range(max_iter):
+        one_hot = sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        scores = (S @ one_hot @ jitter).tocsr()
+        new = np.asarray(scores.argmax(axis=1)).ravel()
+        new[strongest == 0] = labels[strongest == 0]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    return pd.factorize(labels)[0]
+
+
+# === All years ===
+def network_metrics(od=None):
+    """Per country-year metrics and a per-year summary table."""
+    od = od if od is not None else load_od_matrix()
+    names, graphs = country_graphs(od)
+    years = sorted(graphs)
+    ranks = pagerank(graphs)
+
+    rows, summary, previous = [], [], None
+    for y in years:
+        W = graphs[y]
+        communities = label_propagation(W)
+        rows.append(pd.DataFrame({
+            "Country": names,
+            "Year": y,
+            "In_strength": np.asarray(W.sum(axis=0)).ravel(),
+            "Out_strength": np.asarray(W.sum(axis=1)).ravel(),
+            "PageRank": ranks[y],
+            "Community": communities,
+        }))
+        weighted, binary = reciprocity(W)
+        summary.append({
+            "Year": y,
+            "Corridors": W.nnz,
+            "Total_stock": W.sum(),
+            "Reciprocity": weighted,
+            "Binary_reciprocity": binary,
+            "Communities": len(np.unique(communities)),
+            # how much the community structure moved since the previous snapshot
+            "Community_NMI_prev": (sk_metrics.normalized_mutual_info_score(previous, communities)
+                                   if previous is not None else np.nan),
+        })
+        previous = communities
+
+    metrics = pd.concat(rows, ignore_index=True)
+    metrics = metrics[(metrics["In_strength"] > 0) | (metrics["Out_strength"] > 0)]
+    metrics["PageRank_rank"] = metrics.groupby("Year")["PageRank"].rank(ascending=False, method="min")
+    return metrics.reset_index(drop=True), pd.DataFrame(summary)
+
+
+def centrality_change(metrics, year_from=None, year_to=None):
+    """PageRank and strength change per country between two snapshot years."""
+    years = sorted(metrics["Year"].unique())
+    year_from = year_from or years[0]
+    year_to = year_to or years[-1]
+    cols = ["In_strength", "Out_strength", "PageRank", "PageRank_rank"]
+    a = metrics[metrics["Year"] == year_from].set_index("Country")[cols]
+    b = metrics[metrics["Year"] == year_to].set_index("Country")[cols]
+    change = (b - a).add_suffix("_change").dropna()
+    return change.sort_values("PageRank_change", ascending=False)
+
+
+# === Figures ===
+def plot_pagerank_trend(data):
+    for country, series in data.items():
+        plt.plot(series.index, series.values, marker="o", label=country)
+    plt.title("Migration Network Centrality (PageRank), Top Destinations")
+    plt.xlabel("Year")
+    plt.ylabel("PageRank")
+    plt.legend(fontsize=8)
+    plt.grid(True)
+    plt.tight_layout()
+
+
+def run_network(write_csv=True):
+    start = time.perf_counter()
+    metrics, summary = network_metrics()
+    print(f"Network metrics for {summary['Year'].nunique()} years in {time.perf_counter() - start:.2f}s")
+    print(summary.to_string(index=False))
+
+    change = centrality_change(metrics)
+    print("\nLargest PageRank gains:")
+    print(change.head(10))
+
+    if write_csv:
+        metrics.to_csv(METRICS_PATH, index=False)
+        summary.to_csv(SUMMARY_PATH, index=False)
+        print(f"\nSaved {METRICS_PATH} and {SUMMARY_PATH}")
+
+    latest = metrics[metrics["Year"] == metrics["Year"].max()]
+    top = latest.nlargest(10, "PageRank")["Country"]
+    trend = {c: metrics[metrics["Country"] == c].set_index("Year")["PageRank"] for c in top}
+    render_plots([plot_job("network_pagerank_top10.png", plot_pagerank_trend, trend, figsize=(9,6))])
+    return metrics, summary
+
+
+if __name__ == "__main__":
+    run_network()
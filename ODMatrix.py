@@ -0,0 +1,213 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from Countries import UNMATCHED, country_names, resolve, resolve_one
+
+# === Paths ===
+OUTPUT_DIR = "processed"
+OD_PATH = os.path.join(OUTPUT_DIR, "od_matrix.npz")
+# Bump when the node set changes meaning; older files are rebuilt on load
+OD_VERSION = "2"
+META_KEYS = ("countries", "version", "source")
+
+
+def _top(labels, indices, values, n):
+    if len(values) == 0:
+        return pd.Series(dtype=float)
+    n = min(n, len(values))
+    pick = np.argpartition(-values, n - 1)[:n]
+    pick = pick[np.argsort(-values[pick], kind="stable")]
+    return pd.Series(values[pick], index=labels[indices[pick]])
+
+
+class ODMatrix:
+    """Bilateral migrant stock, one sparse matrix per snapshot year.
+
+    matrices[year][d, o] is the stock born in country o living in country d,
+    over a shared integer country index. Nodes are countries only, under
+    their canonical names; regional totals come from Hierarchy.rollup_od.
+    Rows (destinations) are sliced from the CSR form, columns (origins) from
+    a CSC copy built on first use.
+    """
+
+    def __init__(self, countries, matrices):
+        self.countries = np.asarray(countries, dtype=object)
+        self.matrices = {int(y): sparse.csr_matrix(m) for y, m in matrices.items()}
+        self._index = {name: i for i, name in enumerate(self.countries)}
+        self._csc = {}
+
+    # --- Build / persist ---
+    @classmethod
+    def from_long(cls, df, destination="Country", origin="Origin", year="Year", value="Migration"):
+        df = df.dropna(subset=[destination, origin, value])
+        df = df[df[value] != 0]
+        # "World", regions and development groups repeat the country flows, so
+        # only country-to-country cells are kept; spellings of one country merge
+        d_ids, o_ids = resolve(df[destination]), resolve(df[origin])
+        keep = (d_ids != UNMATCHED) & (o_ids != UNMATCHED)
+        d_ids, o_ids = d_ids[keep], o_ids[keep]
+        countries = np.array(sorted(set(country_names(np.union1d(d_ids, o_ids)))), dtype=object)
+        codes = pd.Index(countries)
+        d = codes.get_indexer(country_names(d_ids)).astype(np.int32)
+        o = codes.get_indexer(country_names(o_ids)).astype(np.int32)
+        years = df[year].to_numpy()[keep]
+        values = df[value].to_numpy(dtype=np.float64)[keep]
+
+        n = len(countries)
+        matrices = {}
+        for y in np.unique(years):
+            mask = years == y
+            # duplicates (same pair listed twice) are summed by the COO -> CSR conversion
+            matrices[int(y)] = sparse.coo_matrix((values[mask], (d[mask], o[mask])), shape=(n, n)).tocsr()
+        return cls(countries, matrices)
+
+    def save(self, path=OD_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {"countries": self.countries.astype(str), "version": np.array(OD_VERSION),
+                  "source": np.array(source_digest())}
+        for y, m in self.matrices.items():
+            arrays[f"{y}_data"] = m.data
+            arrays[f"{y}_indices"] = m.indices
+            arrays[f"{y}_indptr"] = m.indptr
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path=OD_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            countries = npz["countries"].astype(object)
+            n = len(countries)
+            years = sorted({int(k.split("_")[0]) for k in npz.files if k not in META_KEYS})
+            matrices = {
+                y: sparse.csr_matrix((npz[f"{y}_data"], npz[f"{y}_indices"], npz[f"{y}_indptr"]), shape=(n, n))
+                for y in years
+            }
+        return cls(countries, matrices)
+
+    # --- Helpers ---
+    @property
+    def years(self):
+        return sorted(self.matrices)
+
+    def index_of(self, country):
+        if country in self._index:
+            return self._index[country]
+        # any spelling or ISO3 code the country dimension knows
+        cid = resolve_one(country)
+        if cid != UNMATCHED and country_names([cid])[0] in self._index:
+            return self._index[country_names([cid])[0]]
+        raise KeyError(f"Unknown country '{country}'")
+
+    def csc(self, year):
+        if year not in self._csc:
+            self._csc[year] = self.matrices[year].tocsc()
+        return self._csc[year]
+
+    def nbytes(self):
+        total = 0
+        for m in list(self.matrices.values()) + list(self._csc.values()):
+            total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        return total
+
+    # --- Queries ---
+    def top_origins(self, destination, year, n=10):
+        m = self.matrices[year]
+        i = self.index_of(destination)
+        start, end = m.indptr[i], m.indptr[i + 1]
+        return _top(self.countries, m.indices[start:end], m.data[start:end], n)
+
+    def top_destinations(self, origin, year, n=10):
+        m = self.csc(year)
+        j = self.index_of(origin)
+        start, end = m.indptr[j], m.indptr[j + 1]
+        return _top(self.countries, m.indices[start:end], m.data[start:end], n)
+
+    def stock(self, destination, origin, year):
+        return float(self.matrices[year][self.index_of(destination), self.index_of(origin)])
+
+    def immigrant_stock(self, year):
+        return pd.Series(np.asarray(self.matrices[year].sum(axis=1)).ravel(), index=self.countries)
+
+    def emigrant_stock(self, year):
+        return pd.Series(np.asarray(self.matrices[year].sum(axis=0)).ravel(), index=self.countries)
+
+    def net_migration(self, year):
+        """Immigrant minus emigrant stock per country."""
+        return self.immigrant_stock(year) - self.emigrant_stock(year)
+
+    def delta(self, year_from, year_to):
+        """Sparse change in bilateral stock between two snapshot years."""
+        return (self.matrices[year_to] - self.matrices[year_from]).tocsr()
+
+    def year_over_year(self):
+        """Net migration change per country between consecutive snapshots."""
+        years = self.years
+        net = {y: self.net_migration(y) for y in years}
+        return pd.DataFrame({f"{a}-{b}": net[b] - net[a] for a, b in zip(years[:-1], years[1:])})
+
+    def top_corridor_changes(self, year_from, year_to, n=10):
+        """Largest absolute changes in destination/origin stock between two years."""
+        diff = self.delta(year_from, year_to).tocoo()
+        if diff.nnz == 0:
+            return pd.DataFrame(columns=["Destination", "Origin", "Change"])
+        n = min(n, diff.nnz)
+        pick = np.argpartition(-np.abs(diff.data), n - 1)[:n]
+        pick = pick[np.argsort(-np.abs(diff.data[pick]), kind="stable")]
+        return pd.DataFrame({
+            "Destination": self.countries[diff.row[pick]],
+            "Origin": self.countries[diff.col[pick]],
+            "Change": diff.data[pick],
+        })
+
+
+def build_od_matrix(path=OD_PATH):
+    from Sources import load_migration
+
+    od = ODMatrix.from_long(load_migration())
+    od.save(path)
+    return od
+
+
+def source_digest():
+    """Hash of the migration workbook, the country tables and the code the matrices are built from."""
+    from Cache import file_digest, module_digest
+    from Sources import MIGRATION_PATH, COUNTRY_TABLES
+
+    h = hashlib.sha256()
+    for path in [MIGRATION_PATH] + COUNTRY_TABLES:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    h.update(module_digest(build_od_matrix).encode())
+    return h.hexdigest()
+
+
+def _is_current(path):
+    with np.load(path, allow_pickle=False) as npz:
+        return ("version" in npz.files and str(npz["version"]) == OD_VERSION
+                and "source" in npz.files and str(npz["source"]) == source_digest())
+
+
+def load_od_matrix(path=OD_PATH):
+    """Load the persisted matrices, building them from the source cache if
+    missing, written by an older version or built from other raw data."""
+    if os.path.exists(path) and _is_current(path):
+        return ODMatrix.load(path)
+    return build_od_matrix(path)
+
+
+if __name__ == "__main__":
+    od = build_od_matrix()
+    nnz = sum(m.nnz for m in od.matrices.values())
+    print(f"OD matrix: {len(od.countries)} locations x {len(od.years)} years, "
+          f"{nnz} non-zero pairs, {od.nbytes() / 1e6:.2f} MB in memory")
+    print(f"Saved at: {OD_PATH}")
+
+    latest = od.years[-1]
+    top_dest = od.immigrant_stock(latest).sort_values(ascending=False).index[0]
+    print(f"\nTop origins of {top_dest} ({latest}):")
+    print(od.top_origins(top_dest, latest))
+    print("\nNet migration change between snapshots:")
+    print(od.year_over_year().head())
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from Countries import load_dimension, resolve, resolve_one, is_country, UNMATCHED
+
+# === Paths ===
+OUTPUT_DIR = "processed"
+CUBE_PATH = os.path.join(OUTPUT_DIR, "panel_cube.npy")
+
+
+class PanelCube:
+    """Dense indicator x country x year array; NaN marks a missing cell.
+
+    Countries follow the country dimension (axis position == country_id), so
+    a value, a cross-section or a time series is a single array slice.
+    """
+
+    def __init__(self, indicators, years, values):
+        self.indicators = list(indicators)
+        self.years = np.asarray(years, dtype=np.int16)
+        self.values = values
+        dim = load_dimension()
+        self.countries = dim["name"].to_numpy()
+        self.iso3 = dim["iso3"].to_numpy()
+        self._ind = {name: k for k, name in enumerate(self.indicators)}
+        self._first_year = int(self.years[0])
+
+    # --- Axis helpers ---
+    def _k(self, indicator):
+        try:
+            return self._ind[indicator]
+        except KeyError:
+            raise KeyError(f"Unknown indicator '{indicator}'. Available: {self.indicators}") from None
+
+    def _c(self, country):
+        if isinstance(country, (int, np.integer)):
+            return int(country)
+        cid = resolve_one(country)
+        if cid == UNMATCHED:
+            raise KeyError(f"Unknown country '{country}'")
+        return cid
+
+    def _t(self, year):
+        t = int(year) - self._first_year
+        if not 0 <= t < len(self.years):
+            raise KeyError(f"Year {year} outside {self.years[0]}-{self.years[-1]}")
+        return t
+
+    @property
+    def mask(self):
+        """True where a value is present."""
+        return ~np.isnan(self.values)
+
+    # --- Lookups (all O(1) slices) ---
+    def value(self, indicator, country, year):
+        return float(self.values[self._k(indicator), self._c(country), self._t(year)])
+
+    def cross_section(self, indicator, year, dropna=True):
+        """All countries for one indicator and year."""
+        s = pd.Series(self.values[self._k(indicator), :, self._t(year)], index=self.countries, name=indicator)
+        return s.dropna() if dropna else s
+
+    def series(self, indicator, country, dropna=True):
+        """One country's time series for an indicator."""
+        s = pd.Series(self.values[self._k(indicator), self._c(country), :], index=self.years, name=indicator)
+        return s.dropna() if dropna else s
+
+    def panel(self, year):
+        """Countries x indicators table for one year."""
+        df = pd.DataFrame(self.values[:, :, self._t(year)].T, index=self.countries, columns=self.indicators)
+        return df.dropna(how="all")
+
+    def to_long(self, indicators=None, complete=True):
+        """Country-year table with one column per indicator (like Merged.py's output)."""
+        indicators = indicators or self.indicators
+        block = self.values[[self._k(i) for i in indicators]]  # (k, countries, years)
+        keep = ~np.isnan(block).any(axis=0) if complete else ~np.isnan(block).all(axis=0)
+        c, t = np.nonzero(keep)
+        df = pd.DataFrame({"Country": self.countries[c], "Year": self.years[t]})
+        for k, name in enumerate(indicators):
+            df[name] = block[k, c, t]
+        return df
+
+    def coverage(self):
+        """Share of non-missing cells per indicator."""
+        return pd.Series(self.mask.mean(axis=(1, 2)), index=self.indicators)
+
+    # --- Persistence ---
+    def save(self, path=CUBE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(path, self.values)
+        with open(_meta_path(path), "w") as f:
+            json.dump({"indicators": self.indicators, "years": self.years.tolist(),
+                       "iso3": self.iso3.tolist(), "source": source_digest()}, f)
+
+    @classmethod
+    def load(cls, path=CUBE_PATH, mmap=True):
+        """Load a saved cube; with mmap=True the array is paged in on demand."""
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+        if meta["iso3"] != load_dimension()["iso3"].tolist():
+            raise ValueError("Saved cube was built against a different country dimension; rebuild it.")
+        values = np.load(path, mmap_mode="r" if mmap else None)
+        return cls(meta["indicators"], meta["years"], values)
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def source_digest():
+    """Hash of the raw files, the country tables and the code the cube is built from."""
+    from Cache import file_digest, module_digest
+    from Sources import MIGRATION_PATH, GDP_PATH, URB_PATH, HDI_PATH, COUNTRY_TABLES
+
+    h = hashlib.sha256()
+    for path in [MIGRATION_PATH, GDP_PATH, URB_PATH, HDI_PATH] + COUNTRY_TABLES:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    h.update(module_digest(build_cube).encode())
+    return h.hexdigest()
+
+
+def _is_current(path):
+    """True when the saved cube was built from the current raw data and code."""
+    if not os.path.exists(path) or not os.path.exists(_meta_path(path)):
+        return False
+    with open(_meta_path(path)) as f:
+        return json.load(f).get("source") == source_digest()
+
+
+# === Builders (wide tables straight into the cube) ===
+def _fill_wide(cube, years, k, names, wide):
+    """Write a country x year block into cube[k]; unknown names and years are skipped."""
+    ids = resolve(names)
+    col_years = pd.to_numeric(pd.Series(wide.columns).map(str), errors="coerce").to_numpy()
+    ok_cols = ~np.isnan(col_years)
+    t = col_years[ok_cols].astype(int) - years[0]
+    in_range = (t >= 0) & (t < len(years))
+    block = wide.loc[:, ok_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)[:, in_range]
+    rows = ids != UNMATCHED
+    cube[k, ids[rows][:, None], t[in_range][None, :]] = block[rows]
+
+
+def read_world_bank_wide(path):
+    df = pd.read_csv(path, skiprows=4)
+    names = df["Country Name"]
+    years = [c for c in df.columns if str(c).isdigit()]
+    return names, df[years]
+
+
+def build_cube(include_migration=True):
+    from Ingestion import read_sheet
+    from Sources import GDP_PATH, URB_PATH, HDI_PATH, HDI_SHEET, HDI_COLUMNS, HDI_YEARS, EXCEL_ENGINE
+
+    gdp_names, gdp_wide = read_world_bank_wide(GDP_PATH)
+    urb_names, urb_wide = read_world_bank_wide(URB_PATH)
+    hdi_wide, _ = read_sheet(HDI_PATH, HDI_COLUMNS, sheet=HDI_SHEET, optional_columns=HDI_YEARS, engine=EXCEL_ENGINE)
+    hdi_wide = hdi_wide.dropna(subset=["Country"])
+
+    all_years = [int(y) for y in list(gdp_wide.columns) + list(urb_wide.columns) + list(hdi_wide.columns[1:])]
+    years = np.arange(min(all_years), max(all_years) + 1)
+    indicators = ["GDP_per_capita", "HDI", "Urbanization"]
+
+    migration = None
+    if include_migration:
+        from Sources import load_migration
+        migration = load_migration()
+        years = np.arange(min(years[0], migration["Year"].min()), max(years[-1], migration["Year"].max()) + 1)
+        indicators = ["Migration"] + indicators
+
+    n_countries = len(load_dimension())
+    values = np.full((len(indicators), n_countries, len(years)), np.nan)
+    k = {name: i for i, name in enumerate(indicators)}
+
+    _fill_wide(values, years, k["GDP_per_capita"], gdp_names, gdp_wide)
+    _fill_wide(values, years, k["Urbanization"], urb_names, urb_wide)
+    _fill_wide(values, years, k["HDI"], hdi_wide["Country"], hdi_wide.drop(columns=["Country"]))
+
+    if migration is not None:
+        # destination totals: sum over country origins with one scatter-add
+        m = migration.dropna(subset=["Migration"])
+        m = m[is_country(m["Origin"])]
+        ids = resolve(m["Country"])
+        rows = ids != UNMATCHED
+        t = m["Year"].to_numpy()[rows] - years[0]
+        plane = np.zeros((n_countries, len(years)))
+        seen = np.zeros((n_countries, len(years)), dtype=bool)
+        np.add.at(plane, (ids[rows], t), m["Migration"].to_numpy()[rows])
+        seen[ids[rows], t] = True
+        values[k["Migration"]] = np.where(seen, plane, np.nan)
+
+    return PanelCube(indicators, years, values)
+
+
+def load_cube(path=CUBE_PATH, mmap=True):
+    """Memory-map the saved cube, (re)building it first when it is missing or
+    was built from other raw files or cube code."""
+    if not _is_current(path):
+        build_cube().save(path)
+    return PanelCube.load(path, mmap=mmap)
+
+
+if __name__ == "__main__":
+    cube = build_cube()
+    cube.save()
+    print(f"Panel cube: {cube.values.shape} (indicators x countries x years), "
+          f"{cube.values.nbytes / 1e6:.2f} MB -> {CUBE_PATH}")
+    print("\nCoverage:")
+    print(cube.coverage())
+
+    cube = PanelCube.load()
+    print("\nHDI, all countries in 2020 (top 5):")
+    print(cube.cross_section("HDI", 2020).nlargest(5))
+    print("\nGermany, urbanization series (last 5 years):")
+    print(cube.series("Urbanization", "Germany").tail())
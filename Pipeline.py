@@ -0,0 +1,273 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import runpy
+import sys
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from Cache import file_digest, local_modules
+
+# === Paths ===
+# Data and output paths are relative to ROOT; the command line chdirs there
+# so the pipeline can be started from any directory.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = "processed"
+PLOTS_DIR = "plots"
+LOG_DIR = os.path.join(OUTPUT_DIR, "logs")
+STATE_PATH = os.path.join(OUTPUT_DIR, ".pipeline_state.json")
+
+MERGED_CSV = os.path.join(OUTPUT_DIR, "merged_global_migration_data.csv")
+MODEL_CSV = os.path.join(OUTPUT_DIR, "model_results_country_level.csv")
+MERGED_ARROW = os.path.join(OUTPUT_DIR, "merged_global_migration_data.arrow")
+MODEL_ARROW = os.path.join(OUTPUT_DIR, "model_results_country_level.arrow")
+COUNTRY_MEANS_ARROW = os.path.join(OUTPUT_DIR, "country_means.arrow")
+MODELS_LATEST = os.path.join(OUTPUT_DIR, "models", "latest.json")
+
+RAW_MIGRATION = "data/undesa_pd_2024_ims_stock_by_sex_destination_and_origin.xlsx"
+RAW_GDP = "data/API_NY.GDP.PCAP.CD_DS2_en_csv_v2_24794.csv"
+RAW_URB = "data/API_SP.URB.TOTL.IN.ZS_DS2_en_csv_v2_129596.csv"
+RAW_HDI = "data/HDR25_Statistical_Annex_HDI_Trends_Table.xlsx"
+COUNTRY_TABLES = ["data/country_dimension.csv", "data/country_aliases.csv", "data/country_hierarchy.csv"]
+
+
+def _plots(*names):
+    return [os.path.join(PLOTS_DIR, n) for n in names]
+
+
+# === Stage graph ===
+# raw data -> merge -> analyze / model -> compare ; raw data -> eda_*
+Stage = namedtuple("Stage", ["script", "deps", "inputs", "outputs"])
+
+STAGES = {
+    "merge": Stage("Merged.py", [],
+                   [RAW_MIGRATION, RAW_GDP, RAW_URB, RAW_HDI] + COUNTRY_TABLES,
+                   [MERGED_CSV, MERGED_ARROW]),
+    "analyze": Stage("Analysis_Merged.py", ["merge"], [MERGED_ARROW],
+                     _plots("correlation_heatmap.png", "global_trends.png")),
+    # Modeling.py reuses the per-country means Refresh.py writes when they are current
+    "model": Stage("Modeling.py", ["merge"], [MERGED_ARROW, COUNTRY_MEANS_ARROW],
+                   [MODEL_CSV, MODEL_ARROW, MODELS_LATEST] + _plots("hierarchical_dendrogram.png")),
+    # Comparison.py reads the importances and cluster means through latest.json
+    "compare": Stage("Comparison.py", ["analyze", "model"], [MODEL_CSV, MODELS_LATEST],
+                     _plots("comparison_feature_cluster.png")),
+    "eda_gdp": Stage("EDA_GDP.py", [], [RAW_GDP], _plots("global_gdp_trend.png")),
+    "eda_hdi": Stage("EDA_HDI.py", [], [RAW_HDI], _plots("hdi_global_trend.png")),
+    "eda_migration": Stage("EDA_Migration.py", [], [RAW_MIGRATION] + COUNTRY_TABLES,
+                           _plots("migration_global_trend.png")),
+    "eda_urbanization": Stage("EDA_Urbanization.py", [], [RAW_URB], _plots("global_avg_urban.png")),
+}
+
+
+# === Fingerprints ===
+def stage_fingerprint(name):
+    stage = STAGES[name]
+    h = hashlib.sha256()
+    for module in sorted(local_modules(stage.script)):
+        h.update(module.encode())
+        h.update(file_digest(os.path.join(ROOT, module)).encode())
+    for path in stage.inputs:
+        h.update(path.encode())
+        h.update(file_digest(path).encode() if os.path.exists(path) else b"missing")
+    return h.hexdigest()
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+
+def is_up_to_date(name, state):
+    stage = STAGES[name]
+    if not all(os.path.exists(p) for p in stage.outputs):
+        return False
+    return state.get(name) == stage_fingerprint(name)
+
+
+# === Execution ===
+def with_upstream(names):
+    """The requested stages plus everything they depend on."""
+    wanted, stack = set(), list(names)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(STAGES[name].deps)
+    return wanted
+
+
+def run_stage(name):
+    """Run one stage script in this (worker) process; output goes to a log file."""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{name}.log")
+    start = time.perf_counter()
+    ok = True
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            runpy.run_path(os.path.join(ROOT, STAGES[name].script), run_name="__main__")
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc()
+            ok = False
+    return name, ok, time.perf_counter() - start
+
+
+def run_pipeline(targets=None, force=False, jobs=None, dry_run=False):
+    wanted = with_upstream(targets or STAGES)
+    state = load_state()
+    done, failed, results = set(), set(), {}
+
+    # Stages are checked in dependency order: a stage may need to run if its
+    # own fingerprint changed or any upstream stage is going to run. The
+    # latter are re-checked once their inputs have been rebuilt.
+    order = [n for n in STAGES if n in wanted]
+    to_run = set()
+    for name in _topological(order):
+        if force or any(d in to_run for d in STAGES[name].deps) or not is_up_to_date(name, state):
+            to_run.add(name)
+        else:
+            results[name] = "up to date"
+            done.add(name)
+
+    if dry_run:
+        for name in order:
+            print(f"{name:18s} {'run' if name in to_run else 'skip'}")
+        return results
+
+    pending = set(to_run)
+    running = {}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while pending or running:
+            ready = [n for n in order if n in pending and all(d in done for d in STAGES[n].deps)]
+            blocked = [n for n in order if n in pending and any(d in failed for d in STAGES[n].deps)]
+            for name in blocked:
+                pending.discard(name)
+                failed.add(name)
+                results[name] = "skipped (upstream failed)"
+            for name in ready:
+                pending.discard(name)
+                # an upstream rerun that rewrote identical outputs leaves this stage current
+                if not force and is_up_to_date(name, state):
+                    done.add(name)
+                    results[name] = "up to date"
+                    continue
+                running[pool.submit(run_stage, name)] = name
+                print(f"[start] {name}")
+            if not running:
+                if pending:
+                    continue
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, ok, seconds = future.result()
+                del running[future]
+                if ok:
+                    done.add(name)
+                    # fingerprint after the run so downstream outputs are current
+                    state[name] = stage_fingerprint(name)
+                    save_state(state)
+                    results[name] = f"ok ({seconds:.1f}s)"
+                else:
+                    failed.add(name)
+                    state.pop(name, None)
+                    save_state(state)
+                    results[name] = f"FAILED ({seconds:.1f}s, see {os.path.join(LOG_DIR, name + '.log')})"
+                print(f"[{'done' if ok else 'fail'}] {name}: {results[name]}")
+    return results
+
+
+def run_in_process(write_csv=True):
+    """merge -> analyze -> model -> compare in this process, handing the
+    cleaned DataFrame from stage to stage instead of re-reading the CSV."""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    from Merged import build_merged
+    from Analysis_Merged import run_analysis
+    from Modeling import run_modeling
+    from Comparison import run_comparison
+
+    timings = {}
+    start = time.perf_counter()
+    merged_df = build_merged(write_csv=write_csv)
+    timings["merge"] = time.perf_counter() - start
+
+    for name, stage in [("analyze", lambda: run_analysis(merged_df)),
+                        ("model", lambda: run_modeling(merged_df, write_csv=write_csv)),
+                        ("compare", run_comparison)]:
+        start = time.perf_counter()
+        stage()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def _topological(names):
+    ordered, seen = [], set()
+
+    def visit(n):
+        if n in seen:
+            return
+        seen.add(n)
+        for d in STAGES[n].deps:
+            if d in names:
+                visit(d)
+        ordered.append(n)
+
+    for n in names:
+        visit(n)
+    return ordered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the migration analysis pipeline incrementally.")
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"stages to bring up to date (default: all). Choices: {', '.join(STAGES)}")
+    parser.add_argument("--force", action="store_true", help="rerun stages even if up to date")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--dry-run", action="store_true", help="only show what would run")
+    parser.add_argument("--in-process", action="store_true",
+                        help="run merge -> analyze -> model -> compare in one process, passing the DataFrame")
+    parser.add_argument("--no-csv", action="store_true", help="with --in-process, skip writing the CSV outputs")
+    parser.add_argument("--telemetry", action="store_true",
+                        help="have every stage write a time/memory report to processed/telemetry/")
+    args = parser.parse_args()
+    unknown = [s for s in args.stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    os.chdir(ROOT)
+
+    if args.telemetry:
+        # read by Telemetry.py when the stage scripts import it
+        os.environ["GMP_TELEMETRY"] = "1"
+
+    if args.in_process:
+        timings = run_in_process(write_csv=not args.no_csv)
+        print("\n=== In-process summary ===")
+        for name, seconds in timings.items():
+            print(f"{name:18s} {seconds:.1f}s")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    results = run_pipeline(args.stages or None, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    if not args.dry_run:
+        print("\n=== Pipeline summary ===")
+        for name in STAGES:
+            if name in results:
+                print(f"{name:18s} {results[name]}")
+        print(f"Total: {time.perf_counter() - start:.2f}s")
+        sys.exit(1 if any(r.startswith(("FAILED", "skipped")) for r in results.values()) else 0)
@@ -0,0 +1,296 @@
+import hashlib
+import importlib
+import inspect
+import os
+import pickle
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Cache import file_digest
+from Lazy import lazy_import
+
+# pyplot loads when the first stale figure is drawn, not when scripts import this module
+plt = lazy_import("matplotlib.pyplot")
+mcollections = lazy_import("matplotlib.collections")
+mcolors = lazy_import("matplotlib.colors")
+mtransforms = lazy_import("matplotlib.transforms")
+stats = lazy_import("scipy.stats")
+
+# === Settings ===
+PLOTS_DIR = "plots"
+# One small file per figure holding the hash it was last rendered from, so
+# scripts rendering into plots/ at the same time never share a manifest.
+HASH_DIR = os.path.join(PLOTS_DIR, ".hashes")
+PLOT_JOBS = int(os.environ.get("GMP_PLOT_JOBS", "0")) or os.cpu_count() or 1
+FORCE_PLOTS = os.environ.get("GMP_FORCE_PLOTS", "0") == "1"
+# Scatter plots with more points than this are drawn as binned density images
+DENSITY_THRESHOLD = int(os.environ.get("GMP_DENSITY_THRESHOLD", "5000"))
+DENSITY_MODE = os.environ.get("GMP_DENSITY_MODE", "hist2d")  # "hist2d" or "hexbin"
+DENSITY_BINS = 120
+FIT_LEVEL = 0.95   # confidence band around fitted lines
+FIT_POINTS = 100
+
+# filename: output file under plots/
+# func:     module-level function func(data, **params) drawing on the current figure
+# data:     everything the figure depends on (DataFrame, Series, arrays, dicts of them)
+# params:   keyword arguments for func; "figsize" and "dpi" are used by the engine
+PlotJob = namedtuple("PlotJob", ["filename", "func", "data", "params"])
+
+
+def plot_job(filename, func, data=None, **params):
+    return PlotJob(filename, func, data, params)
+
+
+# === Hashing ===
+def _update(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(type(obj).__name__.encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr(list(obj.columns)).encode())
+            h.update(repr(list(obj.dtypes.astype(str))).encode())
+        else:
+            h.update(repr((obj.name, str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=not isinstance(obj, pd.Index)).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else pickle.dumps(obj.tolist()))
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=repr):
+            h.update(repr(key).encode())
+            _update(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update(h, item)
+    else:
+        h.update(repr(obj).encode())
+
+
+def _func_ref(func):
+    """(module, name) that a worker process can import, even for scripts run as __main__."""
+    module = func.__module__
+    if module == "__main__":
+        main_file = getattr(sys.modules["__main__"], "__file__", None)
+        if main_file is None:
+            raise ValueError(f"Cannot render {func.__name__} from an interactive session in parallel")
+        module = os.path.splitext(os.path.basename(main_file))[0]
+    return module, func.__qualname__
+
+
+def _source_files(func):
+    """Source files a figure's drawing depends on: the job function's whole
+    module (helpers and constants it uses) and this module's draw_* code."""
+    module = sys.modules.get(func.__module__)
+    files = {os.path.abspath(__file__)}
+    if getattr(module, "__file__", None):
+        files.add(os.path.abspath(module.__file__))
+    return sorted(files)
+
+
+def job_hash(job):
+    h = hashlib.sha256()
+    h.update(repr(_func_ref(job.func)).encode())
+    try:
+        h.update(inspect.getsource(job.func).encode())
+    except (OSError, TypeError):
+        pass
+    for path in _source_files(job.func):
+        h.update(file_digest(path).encode())
+    _update(h, job.params)
+    _update(h, job.data)
+    return h.hexdigest()
+
+
+def _hash_path(filename):
+    return os.path.join(HASH_DIR, filename + ".sha256")
+
+
+def is_current(job, digest):
+    path = os.path.join(PLOTS_DIR, job.filename)
+    if not os.path.exists(path) or not os.path.exists(_hash_path(job.filename)):
+        return False
+    with open(_hash_path(job.filename)) as f:
+        return f.read().strip() == digest
+
+
+# === Rendering ===
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render(filename, func_ref, data, params, digest):
+    import matplotlib
+    matplotlib.use("Agg")
+
+    module, name = func_ref
+    func = getattr(importlib.import_module(module), name)
+    params = dict(params)
+    figsize = params.pop("figsize", None)
+    dpi = params.pop("dpi", None)
+
+    plt.figure(figsize=figsize)
+    try:
+        func(data, **params)
+        plt.savefig(os.path.join(PLOTS_DIR, filename), dpi=dpi if dpi is not None else "figure")
+    finally:
+        plt.close("all")
+
+    with open(_hash_path(filename), "w") as f:
+        f.write(digest)
+    return filename
+
+
+def render_plots(jobs, processes=None, force=None):
+    """Render the jobs whose data/params changed; returns {filename: status}.
+
+    Stale figures are drawn in parallel worker processes on the Agg backend.
+    """
+    force = FORCE_PLOTS if force is None else force
+    processes = processes or PLOT_JOBS
+    os.makedirs(HASH_DIR, exist_ok=True)
+
+    status, todo = {}, []
+    for job in jobs:
+        digest = job_hash(job)
+        if not force and is_current(job, digest):
+            status[job.filename] = "unchanged"
+        else:
+            todo.append((job.filename, _func_ref(job.func), job.data, job.params, digest))
+
+    if len(todo) <= 1 or processes == 1:
+        for args in todo:
+            status[_render(*args)] = "rendered"
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(todo)), initializer=_init_worker) as pool:
+            for filename in pool.map(_render, *zip(*todo)):
+                status[filename] = "rendered"
+
+    rendered = sum(s == "rendered" for s in status.values())
+    print(f"Plots: {rendered} rendered, {len(status) - rendered} unchanged")
+    return status
+
+
+# === Large-N scatter plots ===
+# The heavy part (binning, fitting) runs in the calling process with numpy, so a
+# plot job carries a few hundred bins instead of every row: hashing, pickling
+# to the worker and drawing all stay flat as the table grows.
+def linear_fit(x, y):
+    """Closed-form least-squares line y = intercept + slope * x, with the
+    sums needed for a confidence band of the mean; None when x is constant."""
+    n = len(x)
+    if n < 3:
+        return None
+    xm, ym = x.mean(), y.mean()
+    dx = x - xm
+    sxx = dx @ dx
+    if sxx == 0:
+        return None
+    slope = (dx @ (y - ym)) / sxx
+    intercept = ym - slope * xm
+    resid = y - (intercept + slope * x)
+    return {"slope": slope, "intercept": intercept, "n": n, "x_mean": xm, "sxx": sxx,
+            "s2": (resid @ resid) / (n - 2), "x_min": x.min(), "x_max": x.max()}
+
+
+def _hex_bins(x, y, gridsize, extent):
+    # Two offset rectangular lattices; each point goes to the nearer centre
+    # (the same construction as matplotlib's hexbin, done once here)
+    xmin, xmax, ymin, ymax = extent
+    nx = gridsize
+    ny = max(int(nx / np.sqrt(3)), 1)
+    sx = (xmax - xmin) / nx or 1.0
+    sy = (ymax - ymin) / ny or 1.0
+    ix, iy = (x - xmin) / sx, (y - ymin) / sy
+    ix1, iy1 = np.round(ix).astype(np.int64), np.round(iy).astype(np.int64)
+    ix2, iy2 = np.floor(ix).astype(np.int64), np.floor(iy).astype(np.int64)
+    first = (ix - ix1) ** 2 + 3 * (iy - iy1) ** 2 < (ix - ix2 - 0.5) ** 2 + 3 * (iy - iy2 - 0.5) ** 2
+
+    n1 = (nx + 1) * (ny + 1)
+    index = np.where(first, ix1 * (ny + 1) + iy1, n1 + np.clip(ix2, 0, nx - 1) * ny + np.clip(iy2, 0, ny - 1))
+    counts = np.bincount(index, minlength=n1 + nx * ny)
+    i1, j1 = np.divmod(np.arange(n1), ny + 1)
+    i2, j2 = np.divmod(np.arange(nx * ny), ny)
+    centres = np.column_stack([np.concatenate([xmin + i1 * sx, xmin + (i2 + 0.5) * sx]),
+                               np.concatenate([ymin + j1 * sy, ymin + (j2 + 0.5) * sy])])
+    keep = counts > 0
+    return {"mode": "hexbin", "centres": centres[keep], "counts": counts[keep], "size": (sx, sy),
+            "extent": (xmin, xmax, ymin, ymax)}
+
+
+def bin_points(x, y, mode=None, bins=DENSITY_BINS):
+    """Point counts on a rectangular (hist2d) or hexagonal (hexbin) grid."""
+    mode = mode or DENSITY_MODE
+    if mode == "hexbin":
+        return _hex_bins(x, y, bins, (x.min(), x.max(), y.min(), y.max()))
+    if mode != "hist2d":
+        raise ValueError(f"Unknown density mode '{mode}'. Choose 'hist2d' or 'hexbin'")
+    counts, xedges, yedges = np.histogram2d(x, y, bins=bins)
+    return {"mode": "hist2d", "counts": counts, "xedges": xedges, "yedges": yedges}
+
+
+def scatter_data(df, x, y, fit=False, threshold=None, mode=None, bins=DENSITY_BINS):
+    """Everything draw_scatter() needs for a y-vs-x figure of df.
+
+    Up to `threshold` rows the points themselves are kept; above it only
+    their binned counts. With fit=True the closed-form regression line is
+    added (in place of seaborn's bootstrapped one).
+    """
+    threshold = DENSITY_THRESHOLD if threshold is None else threshold
+    xs = df[x].to_numpy(dtype=np.float64)
+    ys = df[y].to_numpy(dtype=np.float64)
+    keep = np.isfinite(xs) & np.isfinite(ys)
+    xs, ys = xs[keep], ys[keep]
+    data = {"x": x, "y": y, "rows": len(xs)}
+    if len(xs) > threshold:
+        data["density"] = bin_points(xs, ys, mode=mode, bins=bins)
+    else:
+        data["points"] = np.column_stack([xs, ys])
+    if fit:
+        data["fit"] = linear_fit(xs, ys)
+    return data
+
+
+def _draw_density(density):
+    ax = plt.gca()
+    norm = mcolors.LogNorm(vmin=1, vmax=max(density["counts"].max(), 2))
+    if density["mode"] == "hexbin":
+        sx, sy = density["size"]
+        hexagon = np.array([[0.5, -0.5], [0.5, 0.5], [0, 1], [-0.5, 0.5], [-0.5, -0.5], [0, -1]]) * [sx, sy / 3]
+        # hexagon vertices in data units around each centre, as Axes.hexbin builds them
+        image = mcollections.PolyCollection([hexagon], offsets=density["centres"],
+                                            offset_transform=mtransforms.AffineDeltaTransform(ax.transData),
+                                            array=density["counts"], cmap="viridis", norm=norm, edgecolors="face")
+        xmin, xmax, ymin, ymax = density["extent"]
+        ax.update_datalim([(xmin, ymin), (xmax, ymax)])
+        ax.add_collection(image, autolim=False)
+        ax.autoscale_view(tight=True)
+    else:
+        counts = np.ma.masked_equal(density["counts"].T, 0)
+        image = ax.pcolormesh(density["xedges"], density["yedges"], counts, cmap="viridis", norm=norm)
+    plt.colorbar(image, ax=ax, label="Rows per bin")
+
+
+def _draw_fit(fit):
+    grid = np.linspace(fit["x_min"], fit["x_max"], FIT_POINTS)
+    line = fit["intercept"] + fit["slope"] * grid
+    se = np.sqrt(fit["s2"] * (1 / fit["n"] + (grid - fit["x_mean"]) ** 2 / fit["sxx"]))
+    t = stats.t.ppf((1 + FIT_LEVEL) / 2, fit["n"] - 2)
+    plt.fill_between(grid, line - t * se, line + t * se, color="C1", alpha=0.2, linewidth=0)
+    plt.plot(grid, line, color="C1", linewidth=2)
+
+
+def draw_scatter(data, alpha=0.6):
+    """Points or density image from scatter_data(), plus the fitted line."""
+    if "density" in data:
+        _draw_density(data["density"])
+    else:
+        plt.scatter(data["points"][:, 0], data["points"][:, 1], alpha=alpha, edgecolors="white", linewidths=0.5)
+    if data.get("fit") is not None:
+        _draw_fit(data["fit"])
+    plt.xlabel(data["x"])
+    plt.ylabel(data["y"])
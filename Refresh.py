@@ -0,0 +1,290 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from Cache import file_digest
+from Countries import ALIASES_PATH, DIMENSION_PATH, UNMATCHED, is_country, load_dimension, resolve
+from Merged import (COUNTRY_MEANS_ARROW, MERGED_ARROW, MERGED_PATH, OUTPUT_DIR, VALUE_COLUMNS,
+                    build_merged, to_keys)
+from Modeling import country_means
+from Sources import (GDP_PATH, HDI_PATH, MIGRATION_PATH, URB_PATH, load_gdp, load_hdi, load_migration,
+                     load_urbanization)
+from Storage import read_table, write_table
+from Telemetry import run, stage
+
+# === Paths ===
+# Keyed copy of every source as last ingested, and the raw-file digests it came from
+SNAPSHOT_DIR = os.path.join(OUTPUT_DIR, "snapshots")
+SNAPSHOT_META = os.path.join(SNAPSHOT_DIR, "meta.json")
+CHANGELOG_PATH = os.path.join(OUTPUT_DIR, "changelog.csv")
+
+KEYS = ["country_id", "Year"]
+MIGRATION_KEYS = ["country_id", "origin_id", "Year"]
+CHANGELOG_COLUMNS = ["Refreshed", "Table", "Change", "Country", "Year", "Column", "Old", "New"]
+
+
+# === Sources in keyed form ===
+def _keyed_migration():
+    # country-to-country cells only, as summed by build_merged(); two
+    # spellings of one origin under a destination become one cell
+    df = load_migration().dropna(subset=["Migration"])
+    df = df[is_country(df["Origin"])]
+    keyed = pd.DataFrame({"country_id": resolve(df["Country"]), "origin_id": resolve(df["Origin"]),
+                          "Year": df["Year"].to_numpy(), "Migration": df["Migration"].to_numpy()})
+    keyed = keyed[keyed["country_id"] != UNMATCHED]
+    return keyed.groupby(MIGRATION_KEYS, as_index=False)["Migration"].sum()
+
+
+def _keyed(load, value):
+    return lambda: to_keys(load(), value)[KEYS + [value]].reset_index(drop=True)
+
+
+# source: (raw file, keyed loader, key columns, value column)
+SOURCES = {
+    "migration": (MIGRATION_PATH, _keyed_migration, MIGRATION_KEYS, "Migration"),
+    "gdp": (GDP_PATH, _keyed(load_gdp, "GDP_per_capita"), KEYS, "GDP_per_capita"),
+    "hdi": (HDI_PATH, _keyed(load_hdi, "HDI"), KEYS, "HDI"),
+    "urbanization": (URB_PATH, _keyed(load_urbanization, "Urbanization"), KEYS, "Urbanization"),
+}
+
+
+def _snapshot_path(source):
+    return os.path.join(SNAPSHOT_DIR, f"{source}.parquet")
+
+
+def load_snapshot(source):
+    return pd.read_parquet(_snapshot_path(source))
+
+
+def save_snapshot(source, df):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp = _snapshot_path(source) + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, _snapshot_path(source))
+
+
+def load_meta():
+    if os.path.exists(SNAPSHOT_META):
+        with open(SNAPSHOT_META) as f:
+            return json.load(f)
+    return {}
+
+
+def save_meta(meta):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp = SNAPSHOT_META + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+    os.replace(tmp, SNAPSHOT_META)
+
+
+def _country_tables_digest():
+    return "-".join(file_digest(p) for p in (DIMENSION_PATH, ALIASES_PATH))
+
+
+# === Diff ===
+def diff_source(old, new, keys, value):
+    """Cells added, removed and revised between two keyed versions of a source.
+
+    Returns one frame with the keys, Old, New and Change columns; unchanged
+    cells are left out.
+    """
+    both = old.merge(new, on=keys, how="outer", suffixes=("_old", "_new"), indicator=True)
+    both = both.rename(columns={f"{value}_old": "Old", f"{value}_new": "New"})
+    change = np.select([both["_merge"] == "right_only", both["_merge"] == "left_only", both["Old"] != both["New"]],
+                       ["added", "removed", "revised"], default="")
+    both["Change"] = change
+    return both.loc[change != "", keys + ["Old", "New", "Change"]].reset_index(drop=True)
+
+
+def migration_totals(origin_cells, keys):
+    """Destination-year totals over country origins, for the given keys only."""
+    cells = origin_cells.merge(keys, on=KEYS, how="inner")
+    return cells.groupby(KEYS, as_index=False)["Migration"].sum(min_count=1)
+
+
+def merged_rows(keys, tables):
+    """Merged-table rows for the given (country_id, Year) keys, exactly as
+    build_merged() would produce them."""
+    rows = migration_totals(tables["migration"], keys)
+    for source in ("gdp", "hdi", "urbanization"):
+        rows = rows.merge(tables[source].merge(keys, on=KEYS, how="inner"), on=KEYS, how="inner")
+    rows = rows.dropna(subset=VALUE_COLUMNS)
+    dimension = load_dimension().set_index("country_id")
+    rows.insert(0, "Country", dimension["name"].reindex(rows["country_id"]).to_numpy())
+    rows.insert(4, "Country Code", dimension["iso3"].reindex(rows["country_id"]).to_numpy())
+    return rows
+
+
+# === Changelog ===
+def _changes(table, df, country, column):
+    """Changelog rows from a frame with Year, Old, New and Change columns."""
+    return pd.DataFrame({"Table": table, "Change": df["Change"].to_numpy(), "Country": country,
+                         "Year": df["Year"].to_numpy(), "Column": column,
+                         "Old": df["Old"].to_numpy(), "New": df["New"].to_numpy()})
+
+
+def _wide_changes(table, old, new, key, columns, rtol=0.0):
+    """Changelog rows between two versions of a table keyed on `key`, one row
+    per changed value (added / removed rows list every column)."""
+    both = old.merge(new, on=key, how="outer", suffixes=("_old", "_new"), indicator=True)
+    frames = []
+    for col in columns:
+        o, n = both[f"{col}_old"], both[f"{col}_new"]
+        change = np.select([both["_merge"] == "right_only", both["_merge"] == "left_only",
+                            ~np.isclose(o, n, rtol=rtol, atol=0.0)],
+                           ["added", "removed", "revised"], default="")
+        picked = both[change != ""]
+        frames.append(pd.DataFrame({"Table": table, "Change": change[change != ""],
+                                    "Country": picked["Country"].to_numpy(),
+                                    "Year": picked["Year"].to_numpy() if "Year" in key else np.nan,
+                                    "Column": col, "Old": o[change != ""].to_numpy(),
+                                    "New": n[change != ""].to_numpy()}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def append_changelog(changes, stamp):
+    changes = changes.assign(Refreshed=stamp, Year=changes["Year"].astype("Int64"))[CHANGELOG_COLUMNS]
+    changes.to_csv(CHANGELOG_PATH, mode="a", index=False, header=not os.path.exists(CHANGELOG_PATH))
+
+
+# === Outputs ===
+def _write_merged(merged):
+    merged.to_csv(MERGED_PATH, index=False)
+    write_table(merged, MERGED_ARROW)
+    print(f"Merged dataset saved at: {MERGED_PATH} and {MERGED_ARROW}")
+
+
+def _write_means(means):
+    write_table(means, COUNTRY_MEANS_ARROW)
+    print(f"Country means saved at: {COUNTRY_MEANS_ARROW}")
+
+
+def full_refresh(stamp, reason):
+    """Rebuild everything and record every source as the new baseline."""
+    print(f"Full rebuild ({reason})...")
+    merged = build_merged(write_csv=True)
+    means = country_means(merged)
+    _write_means(means)
+    meta = {"country_tables": _country_tables_digest()}
+    for source, (path, keyed, _, _) in SOURCES.items():
+        save_snapshot(source, keyed())
+        meta[source] = file_digest(path)
+    save_meta(meta)
+    append_changelog(pd.DataFrame({"Table": ["merged"], "Change": ["rebuilt"], "Country": [None],
+                                   "Year": [None], "Column": [None], "Old": [None],
+                                   "New": [len(merged)]}), stamp)
+    return merged
+
+
+# === Incremental refresh ===
+def refresh(full=False):
+    """Bring the merged table and the country means up to date with data/.
+
+    Only sources whose raw file changed since the last refresh are re-read
+    and diffed against their snapshot by (country, year) (and origin, for
+    migration). The merged rows at the changed keys and the means of the
+    countries they belong to are recomputed; everything else is kept.
+    Every change is appended to processed/changelog.csv.
+    """
+    stamp = datetime.now().isoformat(timespec="seconds")
+    meta = load_meta()
+    if full or not meta:
+        return full_refresh(stamp, "requested" if full else "no snapshot yet")
+    if meta.get("country_tables") != _country_tables_digest():
+        # a new alias or country can move rows between keys anywhere
+        return full_refresh(stamp, "country tables changed")
+    if not (os.path.exists(MERGED_PATH) and os.path.exists(COUNTRY_MEANS_ARROW)):
+        return full_refresh(stamp, "outputs missing")
+
+    # --- Diff changed sources against their snapshots ---
+    tables, diffs = {}, {}
+    for source, (path, keyed, keys, value) in SOURCES.items():
+        digest = file_digest(path)
+        if meta.get(source) == digest:
+            tables[source] = load_snapshot(source)
+            continue
+        with stage(f"diff_{source}") as s:
+            old, new = load_snapshot(source), keyed()
+            diffs[source] = (old, diff_source(old, new, keys, value))
+            tables[source] = new
+            meta[source] = digest
+            s["rows_out"] = len(diffs[source][1])
+        d = diffs[source][1]
+        new_years = sorted(set(new["Year"]) - set(old["Year"]))
+        counts = d["Change"].value_counts()
+        print(f"{source}: {counts.get('added', 0)} added, {counts.get('revised', 0)} revised, "
+              f"{counts.get('removed', 0)} removed cells"
+              + (f"; new years: {', '.join(map(str, new_years))}" if new_years else ""))
+
+    if not diffs:
+        print("No source changed since the last refresh.")
+        return None
+
+    names = load_dimension()["name"].to_numpy()
+    changes = []
+    with stage("affected_keys") as s:
+        affected = pd.concat([d[KEYS] for _, d in diffs.values()], ignore_index=True).drop_duplicates()
+        s["rows_out"] = len(affected)
+    for source, (old, d) in diffs.items():
+        if source == "migration":
+            # logged as destination-year totals, the level the merged table uses
+            keys = d[KEYS].drop_duplicates()
+            totals = migration_totals(old, keys).merge(migration_totals(tables["migration"], keys),
+                                                       on=KEYS, how="outer", suffixes=("_old", "_new"))
+            totals = totals.rename(columns={"Migration_old": "Old", "Migration_new": "New"})
+            totals["Change"] = np.select([totals["Old"].isna(), totals["New"].isna()], ["added", "removed"],
+                                         default="revised")
+            d = totals[totals["Old"].ne(totals["New"])]
+        changes.append(_changes(source, d, names[d["country_id"].to_numpy()], SOURCES[source][3]))
+
+    # --- Merged table: replace the rows at the affected keys ---
+    with stage("merge_affected", rows_in=len(affected)) as s:
+        merged = pd.read_csv(MERGED_PATH, keep_default_na=False, na_values=[""])
+        merged_ids = resolve(merged["Country Code"])
+        hit = pd.MultiIndex.from_arrays([merged_ids, merged["Year"]]).isin(
+            pd.MultiIndex.from_frame(affected[KEYS]))
+        old_rows = merged[hit]
+        new_rows = merged_rows(affected, tables).drop(columns=["country_id"])
+        merged = (pd.concat([merged[~hit], new_rows], ignore_index=True)
+                  .sort_values(["Country", "Year"], ignore_index=True))
+        s["rows_out"] = len(new_rows)
+    changes.append(_wide_changes("merged", old_rows, new_rows, ["Country", "Year"], VALUE_COLUMNS))
+    print(f"Merged table: {hit.sum()} rows replaced by {len(new_rows)} ({len(merged)} rows)")
+
+    # --- Country means: recompute the affected countries only ---
+    with stage("country_means", rows_in=len(merged)) as s:
+        # keys without a merged row (a GDP year with no migration data) change no mean
+        countries = set(old_rows["Country"]) | set(new_rows["Country"])
+        means = read_table(COUNTRY_MEANS_ARROW, memory_map=False)
+        means["Country"] = means["Country"].astype(str)
+        touched = means["Country"].isin(countries)
+        updated = country_means(merged[merged["Country"].isin(countries)])
+        # HDI and urbanization are stored as float32, so only differences beyond float32 precision count
+        changes.append(_wide_changes("country_means", means[touched], updated, ["Country"],
+                                     [c for c in updated.columns if c != "Country"], rtol=1e-6))
+        means = pd.concat([means[~touched], updated], ignore_index=True).sort_values("Country", ignore_index=True)
+        s["rows_out"] = len(updated)
+    print(f"Country means: {len(updated)} of {len(means)} countries recomputed")
+
+    _write_merged(merged)
+    _write_means(means)
+    for source in diffs:
+        save_snapshot(source, tables[source])
+    save_meta(meta)
+
+    changes = pd.concat(changes, ignore_index=True)
+    append_changelog(changes, stamp)
+    print(f"{len(changes)} changes logged in {CHANGELOG_PATH}")
+    return merged
+
+
+if __name__ == "__main__":
+    # Pass --full to rebuild everything and take new snapshots
+    # Pass --telemetry (or set GMP_TELEMETRY=1) for a per-stage time/memory report
+    with run("refresh"):
+        refresh(full="--full" in sys.argv)
@@ -0,0 +1,460 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from Countries import UNMATCHED, load_dimension, resolve, resolve_one
+
+# === Settings ===
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 4096      # encoded responses kept by the LRU cache
+DEFAULT_TOP = 10
+MAX_TOP = 1000
+
+# indicator: description (units in brackets)
+INDICATORS = {
+    "migration": "International migrant stock by destination (persons)",
+    "emigration": "International migrant stock by origin (persons)",
+    "gdp": "GDP per capita (current US$)",
+    "hdi": "Human Development Index (0-1)",
+    "urbanization": "Urban population (% of total)",
+}
+
+# Countries of one indicator and year, sorted by value (ascending), plus each
+# country's position in that order (-1 when it has no value that year)
+Ranking = namedtuple("Ranking", ["ids", "values", "position"])
+Series = namedtuple("Series", ["years", "values"])
+
+
+class QueryError(ValueError):
+    """A request the service cannot answer; carries the HTTP status."""
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+# === Loading ===
+def _country_rows(names, years, values):
+    ids = resolve(names)
+    values = np.asarray(values, dtype=np.float64)
+    keep = (ids != UNMATCHED) & ~np.isnan(values)
+    df = pd.DataFrame({"country_id": ids[keep], "Year": np.asarray(years)[keep].astype(np.int64),
+                       "Value": values[keep]})
+    # two spellings of one country in a source (old and new names) -> first wins
+    return df.drop_duplicates(["country_id", "Year"])
+
+
+def load_indicators():
+    """Long table (Indicator, country_id, Year, Value) of every indicator,
+    countries only, from the source cache and the migration rollup."""
+    from Hierarchy import migration_rollup
+    from Sources import load_gdp, load_hdi, load_urbanization
+
+    frames = {}
+    rollup = migration_rollup()
+    rollup = rollup[rollup["Level"] == "Country"]
+    for indicator, side in [("migration", "Destination"), ("emigration", "Origin")]:
+        r = rollup[rollup["Side"] == side]
+        frames[indicator] = _country_rows(r["Location"], r["Year"], r["Migration"])
+    for indicator, load, column in [("gdp", load_gdp, "GDP_per_capita"), ("hdi", load_hdi, "HDI"),
+                                    ("urbanization", load_urbanization, "Urbanization")]:
+        df = load()
+        frames[indicator] = _country_rows(df["Country"], df["Year"], df[column])
+    return pd.concat(frames, names=["Indicator"]).reset_index(level=0).reset_index(drop=True)
+
+
+# === Indexes ===
+def _splits(keys):
+    """(key, start, end) for each run of equal values in a sorted array."""
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [len(keys)]])
+    return [(keys[s].item(), s, e) for s, e in zip(starts, ends)]
+
+
+def build_indexes(long, n_countries):
+    """Rank index per (indicator, year) and series index per (indicator, country).
+
+    Both come from one sort of each indicator's rows; afterwards every query
+    is a slice, a position lookup or a binary search.
+    """
+    rankings, series, years = {}, {}, {}
+    for indicator, df in long.groupby("Indicator", sort=False):
+        ids = df["country_id"].to_numpy()
+        year = df["Year"].to_numpy()
+        value = df["Value"].to_numpy()
+
+        order = np.lexsort((ids, value, year))  # by year, then value (ties by id)
+        ids_o, year_o, value_o = ids[order], year[order], value[order]
+        for y, start, end in _splits(year_o):
+            position = np.full(n_countries, -1, dtype=np.int32)
+            position[ids_o[start:end]] = np.arange(end - start, dtype=np.int32)
+            rankings[indicator, y] = Ranking(ids_o[start:end], value_o[start:end], position)
+        years[indicator] = [y for y, _, _ in _splits(year_o)]
+
+        order = np.lexsort((year, ids))  # by country, then year
+        ids_o, year_o, value_o = ids[order], year[order], value[order]
+        for cid, start, end in _splits(ids_o):
+            series[indicator, cid] = Series(year_o[start:end], value_o[start:end])
+    return rankings, series, years
+
+
+# === Service ===
+class QueryService:
+    """Top-N, percentile and time-series answers from in-memory indexes.
+
+    Responses are cached as encoded JSON bytes in an LRU keyed on the path and
+    the sorted query parameters, so a repeated query costs one dict lookup.
+    """
+
+    def __init__(self, long=None, cache_size=CACHE_SIZE):
+        start = time.perf_counter()
+        dim = load_dimension()
+        self.names = dim["name"].to_numpy()
+        self.iso3 = dim["iso3"].to_numpy()
+        long = load_indicators() if long is None else long
+        loaded = time.perf_counter()
+        self.rankings, self.series, self.years = build_indexes(long, len(dim))
+        self.startup = {"load_s": loaded - start, "index_s": time.perf_counter() - loaded,
+                        "rows": int(len(long))}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.stats = {"requests": 0, "cache_hits": 0}
+        self.routes = {"/top": self.top, "/percentile": self.percentile, "/series": self.time_series,
+                       "/indicators": self.indicators, "/stats": self.service_stats}
+
+    # --- Parameters ---
+    def _indicator(self, params, required=True):
+        name = params.get("indicator")
+        if name is None and not required:
+            return None
+        if name not in self.years:
+            raise QueryError(f"Unknown indicator '{name}'. Choose from {', '.join(self.years)}")
+        return name
+
+    def _year(self, params, indicator):
+        if "year" not in params:
+            return self.years[indicator][-1]  # latest year with data
+        try:
+            year = int(params["year"])
+        except ValueError:
+            raise QueryError(f"Year must be an integer, got '{params['year']}'") from None
+        if (indicator, year) not in self.rankings:
+            raise QueryError(f"No {indicator} data for {year}. Years: {self.years[indicator]}",
+                             HTTPStatus.NOT_FOUND)
+        return year
+
+    def _country(self, params):
+        if "country" not in params:
+            raise QueryError("Missing parameter 'country' (name or ISO3 code)")
+        cid = resolve_one(params["country"])
+        if cid == UNMATCHED:
+            raise QueryError(f"Unknown country '{params['country']}'", HTTPStatus.NOT_FOUND)
+        return cid
+
+    def _number(self, params, key, default=None):
+        if key not in params:
+            return default
+        try:
+            value = float(params[key])
+        except ValueError:
+            value = None
+        if value is None or not np.isfinite(value):
+            raise QueryError(f"'{key}' must be a finite number, got '{params[key]}'")
+        return value
+
+    def _integer(self, params, key, default=None):
+        value = self._number(params, key, default)
+        if value is not None and value != int(value):
+            raise QueryError(f"'{key}' must be a whole number, got '{params[key]}'")
+        return None if value is None else int(value)
+
+    def _rank(self, ranking, values):
+        # 1 = highest; countries with equal values share the best rank
+        return len(ranking.values) - np.searchsorted(ranking.values, values, side="right") + 1
+
+    def _country_json(self, cid):
+        return {"country": self.names[cid], "iso3": self.iso3[cid]}
+
+    # --- Queries ---
+    def top(self, params):
+        """/top?indicator=migration&year=2024&n=10&order=desc|asc"""
+        indicator = self._indicator(params)
+        year = self._year(params, indicator)
+        n = self._integer(params, "n", DEFAULT_TOP)
+        if not 1 <= n <= MAX_TOP:
+            raise QueryError(f"n must be between 1 and {MAX_TOP}")
+        order = params.get("order", "desc")
+        if order not in ("desc", "asc"):
+            raise QueryError("order must be 'desc' or 'asc'")
+        r = self.rankings[indicator, year]
+        count = len(r.ids)
+        # values are stored ascending, so "desc" walks the index from the end
+        picked = np.arange(count - 1, max(count - n, 0) - 1, -1) if order == "desc" else np.arange(min(n, count))
+        rows = [dict(self._country_json(cid), rank=rank, value=value)
+                for cid, rank, value in zip(r.ids[picked].tolist(), self._rank(r, r.values[picked]).tolist(),
+                                            r.values[picked].tolist())]
+        return {"indicator": indicator, "year": year, "order": order, "countries": len(r.ids), "results": rows}
+
+    def percentile(self, params):
+        """/percentile?indicator=hdi&year=2023 with country=, value= or p=.
+
+        country / value: share of countries at or below that value (and the
+        country's rank, 1 = highest). p: the value at that percentile, with
+        the same linear interpolation as numpy.percentile.
+        """
+        indicator = self._indicator(params)
+        year = self._year(params, indicator)
+        r = self.rankings[indicator, year]
+        n = len(r.values)
+        out = {"indicator": indicator, "year": year, "countries": n}
+
+        if "p" in params:
+            p = self._number(params, "p")
+            if not 0 <= p <= 100:
+                raise QueryError("p must be between 0 and 100")
+            h = (n - 1) * p / 100
+            lo = int(h)
+            hi = min(lo + 1, n - 1)
+            out.update(p=p, value=float(r.values[lo] + (h - lo) * (r.values[hi] - r.values[lo])))
+            return out
+
+        if "country" in params:
+            cid = self._country(params)
+            pos = int(r.position[cid])
+            if pos < 0:
+                raise QueryError(f"No {indicator} value for {self.names[cid]} in {year}", HTTPStatus.NOT_FOUND)
+            value = float(r.values[pos])
+        elif "value" in params:
+            value = self._number(params, "value")
+        else:
+            raise QueryError("Give one of 'country', 'value' or 'p'")
+        at_or_below = int(np.searchsorted(r.values, value, side="right"))
+        out.update(value=value, percentile=100.0 * at_or_below / n)
+        if "country" in params:
+            out.update(self._country_json(cid), rank=int(self._rank(r, value)))
+        return out
+
+    def time_series(self, params):
+        """/series?country=Germany[&indicator=urbanization]"""
+        cid = self._country(params)
+        indicator = self._indicator(params, required=False)
+        wanted = [indicator] if indicator else list(self.years)
+        out = dict(self._country_json(cid), series={})
+        for name in wanted:
+            s = self.series.get((name, cid))
+            out["series"][name] = ({"years": s.years.tolist(), "values": s.values.tolist()}
+                                   if s is not None else {"years": [], "values": []})
+        return out
+
+    def indicators(self, params):
+        """/indicators: names, descriptions and years with data."""
+        return {name: {"description": INDICATORS[name], "years": years} for name, years in self.years.items()}
+
+    def service_stats(self, params):
+        return dict(self.stats, cached=len(self.cache), startup=self.startup)
+
+    # --- Dispatch ---
+    def respond(self, target):
+        """(status, JSON body) for a request target such as "/top?indicator=hdi"."""
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        params = tuple(sorted(parse_qsl(url.query)))
+        key = (url.path, params)
+        hit = self.cache.get(key)
+        if hit is not None:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return hit
+
+        handler = self.routes.get(url.path)
+        try:
+            if handler is None:
+                raise QueryError(f"Unknown path '{url.path}'. Paths: {', '.join(self.routes)}", HTTPStatus.NOT_FOUND)
+            status, payload = HTTPStatus.OK, handler(dict(params))
+        except QueryError as e:
+            status, payload = e.status, {"error": str(e)}
+        result = (status, json.dumps(payload).encode())
+        if url.path != "/stats":
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+
+# === HTTP ===
+def _response(status, body, keep_alive, head=False):
+    header = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+              f"Content-Type: application/json\r\n"
+              f"Content-Length: {len(body)}\r\n"
+              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1")
+    return header if head else header + body
+
+
+async def _handle_connection(service, reader, writer):
+    # HTTP/1.1 with keep-alive: one connection serves many requests in turn
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            parts = lines[0].split()
+            if len(parts) != 3:
+                writer.write(_response(HTTPStatus.BAD_REQUEST, b'{"error": "Malformed request line"}', False))
+                break
+            method, target, version = parts
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip().lower()
+            length = headers.get("content-length", "0")
+            if not length.isdigit():
+                writer.write(_response(HTTPStatus.BAD_REQUEST, b'{"error": "Malformed Content-Length"}', False))
+                break
+            if length != "0":
+                await reader.readexactly(int(length))  # body is ignored
+            connection = headers.get("connection", "")
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            if method in ("GET", "HEAD"):
+                status, body = service.respond(target)
+            else:
+                status, body = HTTPStatus.METHOD_NOT_ALLOWED, b'{"error": "Only GET and HEAD are supported"}'
+            writer.write(_response(status, body, keep_alive, head=method == "HEAD"))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve_forever(service, host=HOST, port=PORT):
+    server = await asyncio.start_server(lambda r, w: _handle_connection(service, r, w), host, port,
+                                        reuse_address=True)
+    print(f"Serving on http://{host}:{port} "
+          f"(loaded {service.startup['rows']} rows in {service.startup['load_s']:.2f}s, "
+          f"indexed in {service.startup['index_s']:.2f}s)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(host=HOST, port=PORT, cache_size=CACHE_SIZE):
+    service = QueryService(cache_size=cache_size)
+    try:
+        asyncio.run(serve_forever(service, host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+# === Load test ===
+def _sample_targets(service, count, seed=0):
+    """A mix of top-N, percentile and series queries over real indicators,
+    years and countries."""
+    rng = random.Random(seed)
+    keys = list(service.rankings)
+    countries = sorted({cid for _, cid in service.series})
+    targets = []
+    for _ in range(count):
+        indicator, year = rng.choice(keys)
+        kind = rng.random()
+        if kind < 0.4:
+            targets.append(f"/top?indicator={indicator}&year={year}&n={rng.choice([5, 10, 20])}"
+                           f"&order={rng.choice(['desc', 'asc'])}")
+        elif kind < 0.7:
+            targets.append(f"/percentile?indicator={indicator}&year={year}&country={service.iso3[rng.choice(countries)]}")
+        else:
+            targets.append(f"/series?country={service.iso3[rng.choice(countries)]}&indicator={indicator}")
+    return targets
+
+
+async def _client(host, port, targets, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for target in targets:
+        start = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def _load(host, port, targets, concurrency):
+    latencies = []
+    chunks = [targets[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, chunk, latencies) for chunk in chunks))
+    return time.perf_counter() - start, latencies
+
+
+async def _wait_for_port(host, port, timeout=120.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+def bench(requests=20000, concurrency=32, distinct=2000, host=HOST, port=PORT + 1):
+    """Start the service in a child process and fire keep-alive clients at it.
+
+    Clients and server share the machine, so this is a lower bound on what
+    the service alone sustains.
+    """
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve",
+                               "--host", host, "--port", str(port)])
+    try:
+        asyncio.run(_wait_for_port(host, port))
+        # indexes are built in the child; this copy only picks realistic targets
+        service = QueryService(cache_size=0)
+        pool = _sample_targets(service, distinct)
+        targets = [pool[i % len(pool)] for i in range(requests)]
+        random.Random(1).shuffle(targets)
+        seconds, latencies = asyncio.run(_load(host, port, targets, concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = np.sort(np.array(latencies)) * 1e3
+    print(f"\n{requests} requests ({distinct} distinct), {concurrency} connections: "
+          f"{requests / seconds:,.0f} requests/s")
+    print(f"latency ms: p50 {np.percentile(latencies, 50):.2f}  p95 {np.percentile(latencies, 95):.2f}  "
+          f"p99 {np.percentile(latencies, 99):.2f}  max {latencies[-1]:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON query service over the processed indicators.")
+    sub = parser.add_subparsers(dest="command")
+    s = sub.add_parser("serve", help="serve queries (default)")
+    s.add_argument("--host", default=HOST)
+    s.add_argument("--port", type=int, default=PORT)
+    s.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    b = sub.add_parser("bench", help="load-test a fresh service")
+    b.add_argument("--requests", type=int, default=20000)
+    b.add_argument("--concurrency", type=int, default=32)
+    b.add_argument("--distinct", type=int, default=2000, help="distinct queries in the mix")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        bench(args.requests, args.concurrency, args.distinct)
+    else:
+        serve(getattr(args, "host", HOST), getattr(args, "port", PORT), getattr(args, "cache_size", CACHE_SIZE))
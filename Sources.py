@@ -0,0 +1,142 @@
+import os
+
+import pandas as pd
+
+from Cache import cached_table
+from Countries import ALIASES_PATH, DIMENSION_PATH
+from Ingestion import read_sheet, format_report
+
+# === Paths ===
+DATA_DIR = "data"
+MIGRATION_PATH = os.path.join(DATA_DIR, "undesa_pd_2024_ims_stock_by_sex_destination_and_origin.xlsx")
+GDP_PATH = os.path.join(DATA_DIR, "API_NY.GDP.PCAP.CD_DS2_en_csv_v2_24794.csv")
+URB_PATH = os.path.join(DATA_DIR, "API_SP.URB.TOTL.IN.ZS_DS2_en_csv_v2_129596.csv")
+HDI_PATH = os.path.join(DATA_DIR, "HDR25_Statistical_Annex_HDI_Trends_Table.xlsx")
+
+# Download locations of the workbooks (the World Bank CSVs ship in the repo)
+RAW_URLS = {
+    MIGRATION_PATH: "https://www.un.org/development/desa/pd/sites/www.un.org.development.desa.pd/files/"
+                    "undesa_pd_2024_ims_stock_by_sex_destination_and_origin.xlsx",
+    HDI_PATH: "https://hdr.undp.org/sites/default/files/2025_HDR/HDR25_Statistical_Annex_HDI_Trends_Table.xlsx",
+}
+
+# The cache key covers this file and the repo modules it imports (Ingestion,
+# Countries) together with the country tables below. Bump when the cleaning
+# rules change in a way those hashes would miss (e.g. a pandas upgrade that
+# changes parsing).
+CLEANING_VERSION = "1"
+COUNTRY_TABLES = [DIMENSION_PATH, ALIASES_PATH]
+
+MIGRATION_YEARS = [1990, 1995, 2000, 2005, 2010, 2015, 2020, 2024]
+
+
+# === Clean Country Names ===
+def clean_country_name(name):
+    if isinstance(name, str):
+        return name.strip().replace("*", "").replace("...", "")
+    return name
+
+
+# === Workbook layouts ===
+MIGRATION_SHEET = "Table 1"
+MIGRATION_COLUMNS = ['Region, development group, country or area of destination',
+                     'Region, development group, country or area of origin'] + [str(y) for y in MIGRATION_YEARS]
+# Year columns a later vintage may add; read when present (Refresh.py reports them)
+MIGRATION_NEW_YEARS = [str(y) for y in range(MIGRATION_YEARS[-1] + 1, 2051)]
+
+HDI_SHEET = lambda name: "HDI" in name or "Table 2" in name  # noqa: E731
+HDI_COLUMNS = ["Country"]
+HDI_YEARS = [str(y) for y in range(1990, 2051)]  # optional: only those in the sheet are read
+
+# Excel engine for the workbook readers ("auto", "openpyxl" or "calamine")
+EXCEL_ENGINE = os.environ.get("GMP_EXCEL_ENGINE", "auto")
+
+
+# === Builders (raw file -> cleaned long table) ===
+def _build_migration():
+    # Streams "Table 1" once, keeping only destination, origin and the
+    # both-sexes year columns (the first of the three repeated year blocks)
+    df, report = read_sheet(MIGRATION_PATH, MIGRATION_COLUMNS, sheet=MIGRATION_SHEET,
+                            optional_columns=MIGRATION_NEW_YEARS, engine=EXCEL_ENGINE)
+    print(format_report(report))
+    df.columns = ['Country', 'Origin'] + list(df.columns[2:])
+
+    df = df.melt(id_vars=['Country', 'Origin'], var_name='Year', value_name='Migration')
+    df['Year'] = pd.to_numeric(df['Year']).astype("int64")
+    df['Migration'] = pd.to_numeric(df['Migration'], errors="coerce")
+    df['Country'] = df['Country'].map(clean_country_name)
+    df['Origin'] = df['Origin'].map(clean_country_name)
+    return df
+
+
+def _read_world_bank(path, value_name):
+    df = pd.read_csv(path, skiprows=4)
+    df = df.drop(columns=["Indicator Name", "Indicator Code"], errors="ignore")
+    df = df.melt(id_vars=["Country Name", "Country Code"], var_name="Year", value_name=value_name)
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    df = df.dropna(subset=[value_name, "Year"])
+    df["Year"] = df["Year"].astype("int64")
+    df[value_name] = df[value_name].astype(float)
+    df = df.rename(columns={"Country Name": "Country"})
+    df["Country"] = df["Country"].map(clean_country_name)
+    return df.reset_index(drop=True)
+
+
+def _build_gdp():
+    return _read_world_bank(GDP_PATH, "GDP_per_capita")
+
+
+def _build_urbanization():
+    return _read_world_bank(URB_PATH, "Urbanization")
+
+
+def _build_hdi():
+    # Header row is detected while streaming, so the workbook is read once
+    df, report = read_sheet(HDI_PATH, HDI_COLUMNS, sheet=HDI_SHEET,
+                            optional_columns=HDI_YEARS, engine=EXCEL_ENGINE)
+    print(format_report(report))
+
+    df = df.melt(id_vars=["Country"], var_name="Year", value_name="HDI")
+    df["Year"] = pd.to_numeric(df["Year"]).astype("int64")
+    # ".." marks a missing value in the HDR tables
+    df["HDI"] = pd.to_numeric(df["HDI"], errors="coerce")
+    df = df.dropna(subset=["Country", "HDI"])
+    df["Country"] = df["Country"].map(clean_country_name)
+    return df.reset_index(drop=True)
+
+
+# === Download ===
+def fetch_raw(force=False):
+    """Download the raw workbooks missing from data/ (all of them with force=True)."""
+    from urllib.request import urlretrieve
+
+    for path, url in RAW_URLS.items():
+        if os.path.exists(path) and not force:
+            print(f"Present: {path}")
+            continue
+        print(f"Downloading {url} ...")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        urlretrieve(url, tmp_path)
+        os.replace(tmp_path, path)
+        print(f"Saved: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+# === Cached loaders ===
+def load_migration():
+    """Destination/origin migrant stock: Country, Origin, Year, Migration."""
+    return cached_table("migration_long", [MIGRATION_PATH] + COUNTRY_TABLES, _build_migration, CLEANING_VERSION)
+
+
+def load_gdp():
+    """World Bank GDP per capita: Country, Country Code, Year, GDP_per_capita."""
+    return cached_table("gdp_df", [GDP_PATH] + COUNTRY_TABLES, _build_gdp, CLEANING_VERSION)
+
+
+def load_urbanization():
+    """World Bank urban population %: Country, Country Code, Year, Urbanization."""
+    return cached_table("urb_df", [URB_PATH] + COUNTRY_TABLES, _build_urbanization, CLEANING_VERSION)
+
+
+def load_hdi():
+    """UNDP HDI trends: Country, Year, HDI."""
+    return cached_table("hdi_df", [HDI_PATH] + COUNTRY_TABLES, _build_hdi, CLEANING_VERSION)
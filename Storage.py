@@ -0,0 +1,160 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# === Layout ===
+# Arrow IPC file (uncompressed, so it can be memory-mapped):
+#   - string columns dictionary-encoded (Country is stored once per country)
+#   - Year as int16, the bounded ratio indicators (FLOAT32_COLUMNS) as
+#     float32, every other float column (migrant stock, GDP) as float64
+#   - rows sorted by (Year, Country), one record batch per Year; the years of
+#     each batch are kept in the schema metadata so a Year filter skips
+#     whole batches without touching them
+YEAR_COLUMN = "Year"
+COUNTRY_COLUMN = "Country"
+# HDI (0-1) and urbanization (%) need far fewer than float32's 7 digits;
+# migrant stocks do not fit (float32 is exact only up to 2**24, ~16.7M).
+FLOAT32_COLUMNS = {"HDI", "Urbanization"}
+
+
+def _to_arrow(df):
+    arrays = {}
+    for col in df.columns:
+        s = df[col]
+        if col == YEAR_COLUMN:
+            arrays[col] = pa.array(s.to_numpy(dtype=np.int16))
+        elif pd.api.types.is_float_dtype(s):
+            dtype = np.float32 if col in FLOAT32_COLUMNS else np.float64
+            arrays[col] = pa.array(s.to_numpy(dtype=dtype), from_pandas=True)
+        elif pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            arrays[col] = pa.array(s, from_pandas=True)
+        else:
+            arrays[col] = pa.array(s.astype(object), type=pa.string(), from_pandas=True).dictionary_encode()
+    return pa.table(arrays)
+
+
+def write_table(df, path):
+    """Write df as a dictionary-encoded, year-batched Arrow IPC file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    sort_cols = [c for c in (YEAR_COLUMN, COUNTRY_COLUMN) if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind="stable", ignore_index=True)
+    table = _to_arrow(df)
+    # one shared dictionary per column across batches (IPC files cannot replace it)
+    table = table.unify_dictionaries().combine_chunks()
+
+    batches, batch_years = [], []
+    if YEAR_COLUMN in df.columns and len(df):
+        years = df[YEAR_COLUMN].to_numpy()
+        bounds = np.flatnonzero(np.diff(years)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(df)]])
+        for start, end in zip(starts, ends):
+            batches.extend(table.slice(start, end - start).to_batches())
+            batch_years.append(int(years[start]))
+    else:
+        batches = table.to_batches()
+
+    schema = table.schema.with_metadata({"batch_years": json.dumps(batch_years)})
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    os.replace(tmp, path)
+
+
+def _as_list(values):
+    if values is None:
+        return None
+    if isinstance(values, (str, int, np.integer)):
+        return [values]
+    return list(values)
+
+
+def read_arrow(path, columns=None, years=None, countries=None, memory_map=True):
+    """Arrow table with column projection and Year / Country predicates.
+
+    Batches whose year is not requested are never read; the remaining rows
+    are filtered on the Arrow side before anything is converted.
+    """
+    years, countries = _as_list(years), _as_list(countries)
+    source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+    reader = pa.ipc.open_file(source)
+    meta = reader.schema.metadata or {}
+    batch_years = json.loads(meta.get(b"batch_years", b"[]"))
+
+    if years is not None and len(batch_years) == reader.num_record_batches:
+        wanted = set(int(y) for y in years)
+        picked = [i for i, y in enumerate(batch_years) if y in wanted]
+    else:
+        picked = range(reader.num_record_batches)
+    table = pa.Table.from_batches([reader.get_batch(i) for i in picked], schema=reader.schema)
+
+    if years is not None and len(batch_years) != reader.num_record_batches:
+        table = table.filter(pc.is_in(table[YEAR_COLUMN], value_set=pa.array(years, pa.int16())))
+    if countries is not None:
+        country = table[COUNTRY_COLUMN]
+        if pa.types.is_dictionary(country.type):
+            country = country.cast(pa.string())
+        table = table.filter(pc.is_in(country, value_set=pa.array(countries, pa.string())))
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+def read_table(path, columns=None, years=None, countries=None, memory_map=True):
+    """DataFrame view of read_arrow(); dictionary columns become categoricals.
+
+    Numeric columns without missing values are handed over without a copy,
+    so with memory_map=True they stay backed by the page cache. float32
+    columns are widened to float64 so results match the CSV path.
+    """
+    table = read_arrow(path, columns=columns, years=years, countries=countries, memory_map=memory_map)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    narrow = [c for c in df.columns if df[c].dtype == np.float32]
+    if narrow:
+        df[narrow] = df[narrow].astype(np.float64)
+    return df
+
+
+def arrow_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".arrow"
+
+
+# === CSV vs Arrow comparison ===
+def _measure(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = load()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, seconds, peak, df.memory_usage(deep=True).sum()
+
+
+if __name__ == "__main__":
+    # python Storage.py [csv ...]: convert CSV outputs and compare loading them
+    paths = sys.argv[1:] or ["processed/merged_global_migration_data.csv",
+                             "processed/model_results_country_level.csv"]
+    for csv_path in paths:
+        if not os.path.exists(csv_path):
+            print(f"Skipping {csv_path} (not found)")
+            continue
+        path = arrow_path(csv_path)
+        write_table(pd.read_csv(csv_path), path)
+        pa.memory_map(path).close()  # warm the page cache so both reads are from memory
+
+        df_csv, t_csv, peak_csv, mem_csv = _measure(lambda: pd.read_csv(csv_path))
+        df_arrow, t_arrow, peak_arrow, mem_arrow = _measure(lambda: read_table(path))
+        print(f"\n{csv_path} -> {path}")
+        print(f"  size:   {os.path.getsize(csv_path) / 1e3:9.1f} kB CSV  {os.path.getsize(path) / 1e3:9.1f} kB Arrow")
+        print(f"  load:   {t_csv * 1e3:9.2f} ms CSV  {t_arrow * 1e3:9.2f} ms Arrow")
+        print(f"  peak:   {peak_csv / 1e6:9.2f} MB CSV  {peak_arrow / 1e6:9.2f} MB Arrow")
+        print(f"  frame:  {mem_csv / 1e6:9.2f} MB CSV  {mem_arrow / 1e6:9.2f} MB Arrow")
@@ -0,0 +1,125 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from Lazy import lazy_import
+from Merged import load_merged
+from Modeling import ENSEMBLES, FEATURES, CLUSTER_COLUMNS, country_means, make_estimator
+
+sk_cluster = lazy_import("sklearn.cluster")
+sk_metrics = lazy_import("sklearn.metrics")
+sk_model_selection = lazy_import("sklearn.model_selection")
+sk_preprocessing = lazy_import("sklearn.preprocessing")
+
+# === Paths ===
+SWEEP_PATH = "processed/sweep_results.csv"
+
+CV_FOLDS = 5
+COLUMNS = ["Model", "Params", "Silhouette", "Inertia", "CV_R2", "CV_R2_std", "CV_RMSE", "Seconds"]
+
+# === Default grid (46 points) ===
+K_VALUES = range(2, 11)
+TREE_GRID = {
+    "random_forest": {"n_estimators": [100, 300], "max_depth": [None, 3, 5, 8]},
+    "extra_trees": {"n_estimators": [100, 300], "max_depth": [None, 3, 5, 8]},
+    "gradient_boosting": {"n_estimators": [100, 300], "max_depth": [2, 3, 4], "learning_rate": [0.05, 0.1]},
+}
+
+
+def grid_points(k_values=K_VALUES, tree_grid=TREE_GRID):
+    """(model, params) for every point of the grid."""
+    points = [(method, {"k": k}) for method in ("kmeans", "hierarchical") for k in k_values]
+    for name, grid in tree_grid.items():
+        keys = list(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            points.append((name, dict(zip(keys, values))))
+    return points
+
+
+# === Worker side ===
+# Scaled features, X/y and the CV folds are computed once in the parent and
+# handed to each worker when it starts, not re-sent with every grid point.
+_shared = {}
+
+
+def _init_worker(scaled, X, y, folds):
+    _shared.update(scaled=scaled, X=X, y=y, folds=folds)
+
+
+def _evaluate(model, params):
+    start = time.perf_counter()
+    row = {"Model": model, "Params": json.dumps(params, sort_keys=True)}
+
+    if model in ("kmeans", "hierarchical"):
+        scaled = _shared["scaled"]
+        if model == "kmeans":
+            fitted = sk_cluster.KMeans(n_clusters=params["k"], random_state=42).fit(scaled)
+            labels = fitted.labels_
+            row["Inertia"] = fitted.inertia_
+        else:
+            labels = sk_cluster.AgglomerativeClustering(n_clusters=params["k"], linkage="ward").fit_predict(scaled)
+        row["Silhouette"] = sk_metrics.silhouette_score(scaled, labels)
+    else:
+        # one core per grid point: the pool already keeps every core busy
+        kwargs = dict(params)
+        if "n_jobs" in ENSEMBLES[model][1]:
+            kwargs["n_jobs"] = 1
+        cv = sk_model_selection.cross_validate(make_estimator(model, **kwargs), _shared["X"], _shared["y"], cv=_shared["folds"],
+                            scoring=("r2", "neg_root_mean_squared_error"))
+        row["CV_R2"] = cv["test_r2"].mean()
+        row["CV_R2_std"] = cv["test_r2"].std()
+        row["CV_RMSE"] = -cv["test_neg_root_mean_squared_error"].mean()
+
+    row["Seconds"] = time.perf_counter() - start
+    return row
+
+
+# === Sweep ===
+def run_sweep(df=None, points=None, jobs=None, write_csv=True):
+    """Evaluate every grid point across a process pool; returns the results table."""
+    if df is None:
+        df = load_merged()
+    df_country = country_means(df)
+    points = points or grid_points()
+
+    scaled = sk_preprocessing.StandardScaler().fit_transform(df_country[CLUSTER_COLUMNS])
+    X = df_country[FEATURES].to_numpy()
+    y = df_country["Migration"].to_numpy()
+    folds = list(sk_model_selection.KFold(n_splits=CV_FOLDS, shuffle=True, random_state=42).split(X))
+
+    jobs = jobs or os.cpu_count() or 1
+    print(f"Sweeping {len(points)} grid points on {len(df_country)} countries with {jobs} worker(s)...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(scaled, X, y, folds)) as pool:
+        rows = list(pool.map(_evaluate, *zip(*points)))
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s")
+
+    results = pd.DataFrame(rows, columns=COLUMNS)
+    if write_csv:
+        results.to_csv(SWEEP_PATH, index=False)
+        print(f"Sweep results saved in {SWEEP_PATH}")
+    return results
+
+
+def best_points(results):
+    """Best grid point per model: highest silhouette for clustering, highest CV R² for trees."""
+    score = results["Silhouette"].fillna(results["CV_R2"])
+    best = results.assign(Score=score).sort_values("Score", ascending=False)
+    return best.groupby("Model", sort=False).head(1).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid sweep over cluster counts and tree hyperparameters.")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--k", type=int, nargs="+", default=list(K_VALUES), help="cluster counts to try")
+    args = parser.parse_args()
+
+    results = run_sweep(points=grid_points(k_values=args.k), jobs=args.jobs)
+    print("\nBest per model:")
+    print(best_points(results)[["Model", "Params", "Silhouette", "Inertia", "CV_R2", "CV_RMSE"]].to_string(index=False))
@@ -0,0 +1,221 @@
+import contextlib
+import cProfile
+import functools
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# === Paths ===
+TELEMETRY_DIR = os.path.join("processed", "telemetry")
+
+# === Settings ===
+# Off unless asked for: tracemalloc slows allocation-heavy pandas code down
+ENABLED = os.environ.get("GMP_TELEMETRY", "") not in ("", "0") or "--telemetry" in sys.argv
+PROFILE_STAGE = os.environ.get("GMP_PROFILE", "")
+# A stage regresses when it is this much slower / larger than in the baseline
+# run, and by more than the absolute floor (tiny stages are noisy)
+REGRESSION_RATIO = 1.2
+WALL_FLOOR = 0.05      # seconds
+MEMORY_FLOOR = 1.0     # MB
+
+_records = []
+_stack = []
+
+
+def _cpu():
+    # includes finished child processes (plot and model workers)
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _rows(obj):
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+# === Stages ===
+@contextlib.contextmanager
+def stage(name, rows_in=None):
+    """Time one step; yields a dict where the caller can set "rows_out".
+
+        with stage("merge", rows_in=len(df)) as s:
+            df = df.merge(...)
+            s["rows_out"] = len(df)
+
+    Records wall and CPU seconds and the tracemalloc peak above the memory
+    in use when the stage started. Stages nest; a child's peak counts
+    towards its parent. Does nothing when telemetry is disabled.
+    """
+    rec = {"stage": name, "rows_in": rows_in, "rows_out": None}
+    if not ENABLED:
+        yield rec
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    current, peak = tracemalloc.get_traced_memory()
+    if _stack:
+        _stack[-1]["_peak"] = max(_stack[-1]["_peak"], peak)
+    tracemalloc.reset_peak()
+    rec.update(parent=_stack[-1]["stage"] if _stack else None, depth=len(_stack),
+               start=time.perf_counter(), _start_mem=current, _peak=current)
+    _stack.append(rec)
+
+    profiler = cProfile.Profile() if name == PROFILE_STAGE else None
+    wall, cpu = time.perf_counter(), _cpu()
+    if profiler:
+        profiler.enable()
+    try:
+        yield rec
+    finally:
+        if profiler:
+            profiler.disable()
+        rec["wall_s"] = time.perf_counter() - wall
+        rec["cpu_s"] = _cpu() - cpu
+        peak = max(rec.pop("_peak"), tracemalloc.get_traced_memory()[1])
+        rec["peak_mb"] = (peak - rec.pop("_start_mem")) / 1e6
+        _stack.pop()
+        if _stack:
+            _stack[-1]["_peak"] = max(_stack[-1]["_peak"], peak)
+        tracemalloc.reset_peak()
+        if profiler:
+            os.makedirs(TELEMETRY_DIR, exist_ok=True)
+            prefix = f"{_stack[0]['stage']}-" if _stack else ""
+            path = os.path.join(TELEMETRY_DIR, f"{prefix}{name}.prof")
+            profiler.dump_stats(path)
+            rec["profile"] = path
+        _records.append(rec)
+
+
+def timed(name=None):
+    """Decorator form of stage(); rows in/out come from the first argument
+    and the return value when they have a shape."""
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with stage(name or func.__name__, rows_in=_rows(args[0]) if args else None) as s:
+                result = func(*args, **kwargs)
+                s["rows_out"] = _rows(result[0] if isinstance(result, tuple) and result else result)
+                return result
+        return inner
+    return wrap
+
+
+# === Reports ===
+def reset():
+    """Forget the stages recorded so far."""
+    _records.clear()
+
+
+def report(run_name):
+    """The stages recorded so far, in start order, as a JSON-serializable dict."""
+    stages = sorted((dict(r) for r in _records), key=lambda r: r["start"])
+    t0 = stages[0]["start"] if stages else 0.0
+    for r in stages:
+        r["start"] -= t0
+    return {
+        "run": run_name,
+        "finished": datetime.now().isoformat(timespec="seconds"),
+        "argv": sys.argv,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "stages": stages,
+    }
+
+
+def previous_report(run_name, before=None):
+    """Path of the newest saved report of run_name (older than `before`)."""
+    paths = sorted(glob.glob(os.path.join(TELEMETRY_DIR, f"{run_name}-*.json")))
+    if before is not None:
+        paths = [p for p in paths if p < before]
+    return paths[-1] if paths else None
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline):
+    """Per stage change against the baseline report; flags regressions."""
+    # nested stages may share a name ("merge" inside "merge"), so key on the parent too
+    old = {(r.get("parent"), r["stage"]): r for r in baseline["stages"]}
+    rows = []
+    for r in current["stages"]:
+        b = old.get((r.get("parent"), r["stage"]))
+        if b is None:
+            continue
+        slower = r["wall_s"] > b["wall_s"] * REGRESSION_RATIO and r["wall_s"] - b["wall_s"] > WALL_FLOOR
+        larger = r["peak_mb"] > b["peak_mb"] * REGRESSION_RATIO and r["peak_mb"] - b["peak_mb"] > MEMORY_FLOOR
+        rows.append({"stage": r["stage"], "wall_s": r["wall_s"], "base_wall_s": b["wall_s"],
+                     "peak_mb": r["peak_mb"], "base_peak_mb": b["peak_mb"],
+                     "regression": ", ".join(k for k, v in [("time", slower), ("memory", larger)] if v)})
+    return rows
+
+
+def format_report(rep):
+    lines = [f"{'stage':32s} {'wall s':>8s} {'cpu s':>8s} {'peak MB':>9s} {'rows in':>9s} {'rows out':>9s}"]
+    for r in rep["stages"]:
+        label = "  " * r.get("depth", 0) + r["stage"]
+        rows_in = "" if r["rows_in"] is None else r["rows_in"]
+        rows_out = "" if r["rows_out"] is None else r["rows_out"]
+        lines.append(f"{label:32s} {r['wall_s']:8.3f} {r['cpu_s']:8.3f} {r['peak_mb']:9.2f} {rows_in:>9} {rows_out:>9}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows):
+    lines = [f"{'stage':28s} {'wall s':>8s} {'was':>8s} {'peak MB':>9s} {'was':>9s}  flag"]
+    for r in rows:
+        lines.append(f"{r['stage']:28s} {r['wall_s']:8.3f} {r['base_wall_s']:8.3f} "
+                     f"{r['peak_mb']:9.2f} {r['base_peak_mb']:9.2f}  {r['regression'] and 'REGRESSION: ' + r['regression']}")
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def run(run_name):
+    """Wrap a script's main work: every stage inside is recorded under one
+    top-level stage, then the report is saved as
+    processed/telemetry/<run>-<timestamp>.json and compared with the
+    previous report of the same run."""
+    if not ENABLED:
+        yield
+        return
+    reset()
+    with stage(run_name):
+        yield
+    rep = report(run_name)
+    os.makedirs(TELEMETRY_DIR, exist_ok=True)
+    path = os.path.join(TELEMETRY_DIR, f"{run_name}-{datetime.now():%Y%m%d-%H%M%S-%f}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rep, f, indent=2)
+
+    print(f"\n=== Telemetry ({run_name}) ===")
+    print(format_report(rep))
+    print(f"Report saved at: {path}")
+    baseline = previous_report(run_name, before=path)
+    if baseline:
+        rows = compare(rep, load_report(baseline))
+        print(f"\nCompared with {baseline}:")
+        print(format_comparison(rows))
+        flagged = [r["stage"] for r in rows if r["regression"]]
+        if flagged:
+            print(f"Regressions: {', '.join(flagged)}")
+
+
+if __name__ == "__main__":
+    # python Telemetry.py report.json [baseline.json]: print a report and compare
+    if len(sys.argv) < 2:
+        sys.exit("usage: python Telemetry.py report.json [baseline.json]")
+    current = load_report(sys.argv[1])
+    print(format_report(current))
+    baseline = sys.argv[2] if len(sys.argv) > 2 else previous_report(current["run"], before=sys.argv[1])
+    if baseline:
+        print(f"\nCompared with {baseline}:")
+        print(format_comparison(compare(current, load_report(baseline))))